@@ -0,0 +1,158 @@
+"""Per-tool argument validators compiled from the spec's parameter schemas.
+
+compile_validator() runs once per tool at registration and turns the tool's parameter
+table into a flat list of checks (required, type, enum, minimum/maximum), so a bad
+call is rejected locally in microseconds instead of after an upstream round trip.
+
+Query, path and header values travel as text, so they also accept strings that
+parse as the declared type ("10" for an integer, "true" for a boolean). Body values
+are checked against their JSON type. Unknown argument names are not errors: the
+request plan ignores them.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# schema keywords copied into a tool's parameter info and enforced here
+CONSTRAINT_KEYS = ("enum", "minimum", "maximum")
+
+_INT_RE = re.compile(r"^[+-]?\d+$")
+_BOOL_TEXT = ("true", "false")
+_TEXT_LOCATIONS = ("query", "path", "header")
+
+# (value, text) -> parsed value, or _BAD when the value does not have the type
+_BAD = object()
+
+
+def _integer(value: Any, text: bool) -> Any:
+    if isinstance(value, bool):
+        return _BAD
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if text and isinstance(value, str) and _INT_RE.match(value.strip()):
+        return int(value)
+    return _BAD
+
+
+def _number(value: Any, text: bool) -> Any:
+    if isinstance(value, bool):
+        return _BAD
+    if isinstance(value, (int, float)):
+        return value
+    if text and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return _BAD
+    return _BAD
+
+
+def _boolean(value: Any, text: bool) -> Any:
+    if isinstance(value, bool):
+        return value
+    if text and isinstance(value, str) and value.strip().lower() in _BOOL_TEXT:
+        return value.strip().lower() == "true"
+    return _BAD
+
+
+def _string(value: Any, text: bool) -> Any:
+    if isinstance(value, str):
+        return value
+    if text and isinstance(value, (int, float)):  # bool is an int: "true"/"false" in a query is fine
+        return value
+    return _BAD
+
+
+def _array(value: Any, text: bool) -> Any:
+    if isinstance(value, (list, tuple)) or (text and isinstance(value, str)):
+        return value
+    return _BAD
+
+
+def _object(value: Any, text: bool) -> Any:
+    return value if isinstance(value, dict) else _BAD
+
+
+_PARSERS: Dict[str, Callable[[Any, bool], Any]] = {
+    "integer": _integer, "number": _number, "boolean": _boolean,
+    "string": _string, "array": _array, "object": _object,
+}
+
+
+def _got(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+@dataclass(frozen=True)
+class _ParamCheck:
+    name: str
+    location: str
+    type: str
+    parse: Optional[Callable[[Any, bool], Any]]
+    enum: Optional[Tuple[Any, ...]]
+    enum_text: frozenset
+    minimum: Optional[float]
+    maximum: Optional[float]
+
+    def errors(self, value: Any) -> List[Dict[str, Any]]:
+        text = self.location in _TEXT_LOCATIONS
+        parsed = value
+        if self.parse is not None:
+            parsed = self.parse(value, text)
+            if parsed is _BAD:
+                return [{"param": self.name, "code": "type", "expected": self.type, "got": _got(value),
+                         "message": f"{self.name} must be {self.type}, got {_got(value)}"}]
+        if self.enum is not None and value not in self.enum and not (text and str(value) in self.enum_text):
+            return [{"param": self.name, "code": "enum", "allowed": list(self.enum), "got": value,
+                     "message": f"{self.name} must be one of {list(self.enum)}, got {value!r}"}]
+        out = []
+        if isinstance(parsed, (int, float)) and not isinstance(parsed, bool):
+            if self.minimum is not None and parsed < self.minimum:
+                out.append({"param": self.name, "code": "minimum", "limit": self.minimum, "got": value,
+                            "message": f"{self.name} must be >= {self.minimum}, got {value!r}"})
+            if self.maximum is not None and parsed > self.maximum:
+                out.append({"param": self.name, "code": "maximum", "limit": self.maximum, "got": value,
+                            "message": f"{self.name} must be <= {self.maximum}, got {value!r}"})
+        return out
+
+
+@dataclass(frozen=True)
+class ArgumentValidator:
+    required: Tuple[str, ...]
+    checks: Dict[str, _ParamCheck]
+
+    def __call__(self, arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Validation errors for one call ([] when the arguments are acceptable)."""
+        errors = [{"param": name, "code": "missing", "message": f"{name} is required"}
+                  for name in self.required if arguments.get(name) is None]
+        checks = self.checks
+        for name, value in arguments.items():
+            check = checks.get(name)
+            if check is not None and value is not None:
+                errors.extend(check.errors(value))
+        return errors
+
+
+def compile_validator(parameters: Dict[str, Dict[str, Any]]) -> ArgumentValidator:
+    """Build the validator for a tool's parameter table (see _compile_spec_tools)."""
+    required: List[str] = []
+    checks: Dict[str, _ParamCheck] = {}
+    for name, info in parameters.items():
+        info = info or {}
+        location = info.get("location", "query")
+        if location == "projection":
+            continue  # select/where are compiled (and rejected) by projection.py
+        if info.get("required"):
+            required.append(name)
+        ptype = info.get("type") or "string"
+        enum = info.get("enum")
+        check = _ParamCheck(
+            name=name, location=location, type=ptype, parse=_PARSERS.get(ptype),
+            enum=tuple(enum) if isinstance(enum, list) and enum else None,
+            enum_text=frozenset(str(v) for v in enum) if isinstance(enum, list) else frozenset(),
+            minimum=info.get("minimum"), maximum=info.get("maximum"))
+        if check.parse is not None or check.enum is not None:
+            checks[name] = check
+    return ArgumentValidator(tuple(required), checks)
@@ -1,9 +1,16 @@
 """Assistant core utilities (scoring, parsing, selection, synthesis).
-Groq-only summarization with a simple fallback; no OpenAI/HF dependencies.
+Groq-only summarization (via llm_client) with a simple fallback; no OpenAI/HF dependencies.
 """
 from __future__ import annotations
+import time
 from typing import Dict, Any, List, Tuple, Set
 
+from llm_client import LLMError, get_llm_client
+from metrics import REGISTRY
+
+LLM_SUMMARY_LATENCY = REGISTRY.histogram("llm_summarization_duration_seconds", "LLM summarization call latency",
+                                         ("outcome",))
+
 def tokenize(message: str) -> List[str]:
     return [t.lower().strip(',.!?') for t in message.split() if t]
 
@@ -41,17 +48,15 @@ def select_tools(scored: List[Dict[str, Any]], max_tools: int, message_tokens: S
     limit = max_tools if want_multi else 1
     return [c['tool'] for c in scored[: max(1, limit)]]
 
-def synthesize_answer(executions: List[Dict[str, Any]]) -> str:
-    """Summarize tool executions using Groq (if configured) or a concise heuristic fallback.
+async def synthesize_answer(executions: List[Dict[str, Any]]) -> str:
+    """Summarize tool executions with the shared LLM client (if configured) or a concise heuristic fallback.
 
-    Env vars:
-        GROQ_API_KEY   - required to enable Groq summaries
-        GROQ_MODEL     - optional, default 'llama-3.1-8b-instant'
+    Env vars: see llm_client (GROQ_API_KEY / LLM_BASE_URL, GROQ_MODEL, LLM_TIMEOUT).
     """
     if not executions:
         return "No tool executions were performed."
 
-    import os, json as _json, requests
+    import json as _json
 
     tool_blocks: List[str] = []
     fallback_lines: List[str] = []
@@ -77,31 +82,23 @@ def synthesize_answer(executions: List[Dict[str, Any]]) -> str:
         "Produce a concise (<=120 words) factual summary highlighting balances, counts, statuses, totals. "
         "Do not invent fields. Merge overlapping info.\n\n" + "\n\n".join(tool_blocks)
     )
-    # Groq path (OpenAI-compatible Chat Completions API)
-    groq_key = os.environ.get('GROQ_API_KEY')
-    if not groq_key:
+    client = get_llm_client()
+    if not client.configured:
         return "\n".join(fallback_lines)
-    model = os.environ.get('GROQ_MODEL', 'llama-3.1-8b-instant')
-    url = 'https://api.groq.com/openai/v1/chat/completions'
-    headers = {
-        'Authorization': f'Bearer {groq_key}',
-        'Content-Type': 'application/json'
-    }
-    body = {
-        'model': model,
-        'messages': [
-            {"role": "system", "content": "You convert raw JSON tool outputs into a factual concise summary."},
-            {"role": "user", "content": prompt}
-        ],
-        'temperature': 0.2,
-        'max_tokens': 300
-    }
+    messages = [
+        {"role": "system", "content": "You convert raw JSON tool outputs into a factual concise summary."},
+        {"role": "user", "content": prompt}
+    ]
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        r = requests.post(url, headers=headers, json=body, timeout=60)
-        if r.status_code != 200:
-            return "\n".join(fallback_lines + [f"(Groq summarization error {r.status_code})"])
-        data = r.json()
-        text = (data.get('choices') or [{}])[0].get('message', {}).get('content', '').strip()
+        text = await client.chat(messages, temperature=0.2, max_tokens=300, purpose="summarization")
+        outcome = "success"
         return text or "\n".join(fallback_lines)
-    except Exception:
+    except LLMError as e:
+        if e.status_code:
+            outcome = f"http_{e.status_code}"
+            return "\n".join(fallback_lines + [f"(Groq summarization error {e.status_code})"])
         return "\n".join(fallback_lines)
+    finally:
+        LLM_SUMMARY_LATENCY.observe(time.perf_counter() - started, outcome=outcome)
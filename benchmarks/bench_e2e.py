@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""End-to-end latency/throughput benchmark.
+
+Starts mock_api_server.py and openapi_mcp_server.py --transport http (and, with
+--chatbot, chatbot_app.py) as local processes, drives the HTTP routes at each
+requested concurrency and reports throughput, p50/p95/p99 latency and errors.
+Servers already answering on the chosen ports are reused instead of spawned.
+
+Scenarios:
+  tools          POST /mcp/tools/{tool}        (round-robin over --tools)
+  agent_dry_run  POST /llm/agent dry_run=true  (planning only)
+  agent_rule     POST /llm/agent               (rule-based plan + execution; GROQ_API_KEY is blanked)
+  assistant      POST /assistant/chat          (needs --chatbot; MCP server must be on port 8000)
+
+Run:     python benchmarks/bench_e2e.py --concurrency 1,8,32 --requests 200 --output before.json
+Compare: python benchmarks/bench_e2e.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("tools", "agent_dry_run", "agent_rule", "assistant")
+DEFAULT_TOOLS = "cash_api_getCashSummary,cash_api_getPayments,cash_api_getTransactions"
+DEFAULT_MESSAGES = "cash summary,pending payments,show transactions"
+
+
+# ---------------------- processes ----------------------
+def _up(url: str) -> bool:
+    try:
+        return httpx.get(url, timeout=1.0).status_code < 500
+    except httpx.HTTPError:
+        return False
+
+
+class Service:
+    def __init__(self, name: str, cmd: List[str], ready_url: str, env: Dict[str, str]):
+        self.name, self.cmd, self.ready_url, self.env = name, cmd, ready_url, env
+        self.proc: Optional[subprocess.Popen] = None
+        self.log_path: Optional[str] = None
+
+    def start(self, timeout: float = 60.0):
+        if _up(self.ready_url):
+            print(f"[bench] reusing running {self.name} at {self.ready_url}")
+            return
+        fd, self.log_path = tempfile.mkstemp(prefix=f"bench_{self.name}_", suffix=".log")
+        self.proc = subprocess.Popen(self.cmd, cwd=ROOT, env={**os.environ, **self.env},
+                                     stdout=fd, stderr=subprocess.STDOUT)
+        os.close(fd)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"{self.name} exited with {self.proc.returncode}; see {self.log_path}")
+            if _up(self.ready_url):
+                print(f"[bench] started {self.name} (pid {self.proc.pid}, log {self.log_path})")
+                return
+            time.sleep(0.25)
+        raise RuntimeError(f"{self.name} not ready after {timeout}s; see {self.log_path}")
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+# ---------------------- load ----------------------
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _app_error(resp: httpx.Response) -> Optional[str]:
+    if resp.status_code >= 400:
+        return f"http_{resp.status_code}"
+    try:
+        body = resp.json()
+    except ValueError:
+        return "bad_json"
+    if isinstance(body, dict) and body.get("status") == "error":
+        return "app_error"
+    return None
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            method, url, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                resp = await client.request(method, url, json=body)
+                error = _app_error(resp)
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    ordered = sorted(latencies)
+    n_err = sum(errors.values())
+    return {
+        "requests": len(latencies),
+        "ok": len(latencies) - n_err,
+        "errors": n_err,
+        "error_kinds": errors,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def request_factory(scenario: str, args) -> Any:
+    mcp = f"http://{args.host}:{args.mcp_port}"
+    tools = [t for t in args.tools.split(",") if t]
+    messages = [m for m in args.messages.split(",") if m]
+    if scenario == "tools":
+        return lambda i: ("POST", f"{mcp}/mcp/tools/{tools[i % len(tools)]}", {"arguments": {}})
+    if scenario == "agent_dry_run":
+        return lambda i: ("POST", f"{mcp}/llm/agent", {"message": messages[i % len(messages)], "dry_run": True})
+    if scenario == "agent_rule":
+        return lambda i: ("POST", f"{mcp}/llm/agent", {"message": messages[i % len(messages)], "max_steps": 3})
+    if scenario == "assistant":
+        chat = f"http://{args.host}:{args.chatbot_port}"
+        return lambda i: ("POST", f"{chat}/assistant/chat",
+                          {"message": messages[i % len(messages)], "session_id": f"bench-{i % 16}"})
+    raise ValueError(scenario)
+
+
+async def drive(args, scenarios: List[str], levels: List[int]) -> List[Dict[str, Any]]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        for scenario in scenarios:
+            make = request_factory(scenario, args)
+            if args.warmup:
+                await run_scenario(client, make, args.warmup, min(levels))
+            for level in levels:
+                stats = await run_scenario(client, make, args.requests, level)
+                row = {"scenario": scenario, "concurrency": level, **stats}
+                results.append(row)
+                print(f"{scenario:<14} c={level:<4} rps={row['throughput_rps']:>9.1f}  p50={row['p50_ms']:>8.2f}ms  "
+                      f"p95={row['p95_ms']:>8.2f}ms  p99={row['p99_ms']:>8.2f}ms  errors={row['errors']}")
+    return results
+
+
+# ---------------------- reporting ----------------------
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    print(f"\nvs {baseline_path} ({baseline.get('meta', {}).get('git_rev')})")
+    print(f"{'scenario':<14} {'c':>4} {'rps':>16} {'p50 ms':>18} {'p99 ms':>18} {'errors':>9}")
+
+    def delta(old, new):
+        if not old:
+            return f"{new:>8.1f}"
+        return f"{new:>8.1f} ({(new - old) / old * 100:+5.1f}%)"
+
+    matched = 0
+    for r in current:
+        old = before.get((r["scenario"], r["concurrency"]))
+        if old is None:
+            continue
+        matched += 1
+        print(f"{r['scenario']:<14} {r['concurrency']:>4} {delta(old['throughput_rps'], r['throughput_rps']):>16} "
+              f"{delta(old['p50_ms'], r['p50_ms']):>18} {delta(old['p99_ms'], r['p99_ms']):>18} "
+              f"{old['errors']:>4}->{r['errors']:<4}")
+    if not matched:
+        print("(no scenario/concurrency pairs in common with the baseline)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="tools,agent_dry_run,agent_rule",
+                        help=f"comma list from {','.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma list of concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests before each scenario")
+    parser.add_argument("--tools", default=DEFAULT_TOOLS)
+    parser.add_argument("--messages", default=DEFAULT_MESSAGES)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--mock-port", type=int, default=9001)
+    parser.add_argument("--mcp-port", type=int, default=8000)
+    parser.add_argument("--chatbot", action="store_true", help="also start chatbot_app.py (port 8080)")
+    parser.add_argument("--chatbot-port", type=int, default=8080)
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra env for the MCP server, e.g. RESPONSE_CACHE=0 (repeatable)")
+    parser.add_argument("--keep-llm", action="store_true", help="keep GROQ_API_KEY (agent_rule then uses the LLM)")
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {sorted(unknown)}")
+    if "assistant" in scenarios and not args.chatbot:
+        parser.error("the assistant scenario needs --chatbot")
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+
+    mock_url = f"http://{args.host}:{args.mock_port}"
+    server_env = {"FORCE_BASE_URL": mock_url, "LOG_LEVEL": "WARNING"}
+    if not args.keep_llm:
+        server_env["GROQ_API_KEY"] = ""  # rule-based planning; dotenv does not override set vars
+    server_env.update(kv.split("=", 1) for kv in args.server_env)
+
+    services = [
+        Service("mock", [sys.executable, "mock_api_server.py", "--host", args.host, "--port", str(args.mock_port)],
+                f"{mock_url}/summary", {}),
+        Service("mcp", [sys.executable, "openapi_mcp_server.py", "--transport", "http",
+                        "--host", args.host, "--port", str(args.mcp_port)],
+                f"http://{args.host}:{args.mcp_port}/mcp/tools", server_env),
+    ]
+    if args.chatbot:
+        services.append(Service("chatbot", [sys.executable, "-m", "uvicorn", "chatbot_app:app", "--host", args.host,
+                                            "--port", str(args.chatbot_port), "--log-level", "warning"],
+                                f"http://{args.host}:{args.chatbot_port}/status", server_env))
+    try:
+        for svc in services:
+            svc.start()
+        results = asyncio.run(drive(args, scenarios, levels))
+    finally:
+        for svc in reversed(services):
+            svc.stop()
+
+    payload = {
+        "meta": {
+            "git_rev": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"[bench] wrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-call request building, legacy loop vs precompiled RequestPlan.
+
+Builds a synthetic operation with a large parameter list and measures only the
+client-side request construction (no network).
+
+Run: python benchmarks/bench_request_plan.py --params 200 --number 20000
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from request_plan import compile_request_plan  # noqa: E402
+
+
+def make_tool(n_params: int):
+    """Synthetic tool: 5 path params, then query/header/body params in a 6:1:3 mix."""
+    path_names = [f"p{i}" for i in range(5)]
+    path = "/v1/" + "/".join(f"seg{i}/{{{n}}}" for i, n in enumerate(path_names))
+    parameters = {n: {"type": "string", "location": "path"} for n in path_names}
+    for i in range(max(0, n_params - len(path_names))):
+        loc = ("query",) * 6 + ("header",) + ("body",) * 3
+        parameters[f"f{i}"] = {"type": "string", "location": loc[i % len(loc)]}
+    tool = SimpleNamespace(name="bench_tool", method="POST", path=path, parameters=parameters)
+    args = {name: f"value-{name}" for name in parameters}
+    return tool, args
+
+
+def legacy_build(tool, base_url, parameters):
+    """The per-call loop execute_endpoint used before request plans (plus the json= encode requests did)."""
+    url = f"{base_url.rstrip('/')}{tool.path}"
+    query_params, header_params, body_data = {}, {}, {}
+    for name, value in parameters.items():
+        param_info = tool.parameters.get(name)
+        if not param_info:
+            continue
+        location = param_info.get("location")
+        if location == "path":
+            url = url.replace(f"{{{name}}}", str(value))
+        elif location == "query":
+            query_params[name] = value
+        elif location == "header":
+            header_params[name] = str(value)
+        elif location == "body":
+            body_data[name] = value
+    body = json.dumps(body_data).encode("utf-8") if body_data else None
+    return url, query_params, header_params, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--params", type=int, default=200, help="parameters on the synthetic operation")
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tool, call_args = make_tool(args.params)
+    base_url = "https://api.example.com/base/"
+    plan = compile_request_plan(tool)
+    plan_base = base_url.rstrip("/")  # specs store base_url normalised at load time
+
+    legacy = legacy_build(tool, base_url, call_args)
+    bound = plan.bind(plan_base, call_args)
+    assert legacy[0] == bound.url and legacy[1] == bound.params, "plan and legacy builds disagree"
+
+    compile_us = min(timeit.repeat(lambda: compile_request_plan(tool), number=200, repeat=3)) / 200 * 1e6
+    legacy_t = min(timeit.repeat(lambda: legacy_build(tool, base_url, call_args), number=args.number, repeat=args.repeat))
+    plan_t = min(timeit.repeat(lambda: plan.bind(plan_base, call_args), number=args.number, repeat=args.repeat))
+    legacy_us = legacy_t / args.number * 1e6
+    plan_us = plan_t / args.number * 1e6
+
+    print(f"parameters per call : {len(call_args)}")
+    print(f"plan compile (once) : {compile_us:8.2f} us")
+    print(f"legacy build / call : {legacy_us:8.2f} us")
+    print(f"plan bind / call    : {plan_us:8.2f} us")
+    print(f"speedup             : {legacy_us / plan_us:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Planner shortlist quality: recall@K of the BM25 tool ranker on a fixture query set.
+
+Loads the specs in OPENAPI_DIR (default ./openapi_specs) the way the server does,
+optionally pads the registry with synthetic distractor tools to emulate many
+loaded specs, and reports for each K: recall@K (share of expected tools in the
+shortlist), queries fully covered, shortlist prompt tokens vs. listing every tool
+name, and ranking time per query.
+
+Run: python benchmarks/bench_tool_recall.py --k 1,3,5,10 --distractors 2000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "tool_recall.json"
+
+_NOUNS = ("account", "invoice", "order", "customer", "shipment", "ticket", "user", "report", "ledger",
+          "position", "trade", "quote", "portfolio", "document", "vendor", "contract", "asset", "alert")
+_VERBS = ("list", "get", "create", "update", "delete", "search", "export", "cancel", "close", "sync")
+_PARAMS = ("id", "status", "date_from", "date_to", "limit", "offset", "owner", "region", "currency", "type")
+
+
+def distractors(n: int, seed: int = 7):
+    """Synthetic tools from other 'specs' that share generic vocabulary with real ones."""
+    rng = random.Random(seed)
+    tools = []
+    for i in range(n):
+        verb, noun = rng.choice(_VERBS), rng.choice(_NOUNS)
+        spec = f"spec{i % 40}"
+        params = {p: {"type": "string", "location": "query"} for p in rng.sample(_PARAMS, 3)}
+        tools.append(SimpleNamespace(
+            name=f"{spec}_{verb}{noun.title()}s_{i}", operation_id=f"{verb}{noun.title()}s",
+            spec_name=spec, tags=[noun], parameters=params,
+            summary=f"{verb.title()} {noun}s", description=f"{verb.title()} {noun} records by {' and '.join(params)}"))
+    return tools
+
+
+def load_tools():
+    logging.disable(logging.CRITICAL)
+    os.chdir(ROOT)
+    from openapi_mcp_server import server  # noqa: E402  (loads OPENAPI_DIR)
+    return list(server.api_tools.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    parser.add_argument("--k", default="1,3,5,10", help="comma list of shortlist sizes")
+    parser.add_argument("--distractors", type=int, default=0, help="synthetic tools added to the registry")
+    parser.add_argument("--token-budget", type=int, default=int(os.getenv("PLANNER_TOOL_TOKEN_BUDGET", "1500")))
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    from tool_ranker import ToolRanker, estimate_tokens  # noqa: E402
+
+    fixture = json.loads(Path(args.fixture).read_text())
+    queries = fixture["queries"]
+    tools = load_tools() + distractors(args.distractors)
+    started = time.perf_counter()
+    ranker = ToolRanker(tools)
+    build_ms = (time.perf_counter() - started) * 1000
+    all_names_tokens = estimate_tokens("\n".join(t.name for t in tools))
+    print(f"{len(tools)} tools ({args.distractors} distractors), index built in {build_ms:.1f} ms; "
+          f"listing every tool name costs ~{all_names_tokens} prompt tokens")
+
+    results = []
+    print(f"{'K':>4} {'recall':>7} {'covered':>8} {'tokens':>7} {'rank_ms':>8}")
+    for k in [int(x) for x in args.k.split(",") if x.strip()]:
+        found = expected = covered = tokens = 0
+        rank_s = 0.0
+        misses = []
+        for q in queries:
+            t0 = time.perf_counter()
+            lines = ranker.shortlist(q["query"], k, args.token_budget)
+            rank_s += time.perf_counter() - t0
+            shortlisted = {line.split("(", 1)[0] for line in lines}
+            hit = [e for e in q["expected"] if e in shortlisted]
+            found += len(hit)
+            expected += len(q["expected"])
+            covered += len(hit) == len(q["expected"])
+            tokens += estimate_tokens("\n".join(lines))
+            if len(hit) < len(q["expected"]):
+                misses.append(q["query"])
+        row = {"k": k, "recall": round(found / expected, 3), "covered": f"{covered}/{len(queries)}",
+               "avg_tokens": round(tokens / len(queries)), "rank_ms": round(rank_s / len(queries) * 1000, 3),
+               "misses": misses}
+        results.append(row)
+        print(f"{k:>4} {row['recall']:>7} {row['covered']:>8} {row['avg_tokens']:>7} {row['rank_ms']:>8}")
+        for m in misses:
+            print(f"       miss: {m}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"tools": len(tools), "distractors": args.distractors,
+                                                 "all_names_tokens": all_names_tokens, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,13 @@ FastAPI-based Chatbot Application (frontend)
 import json
 import logging
 import os
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, Set
 from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
 import uvicorn
 import asyncio
@@ -28,8 +29,10 @@ else:
 
 from fastmcp_client import ChatbotFastMCPClient
 from assistant_core import synthesize_answer
+from llm_client import get_llm_client
+from metrics import CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_LATENCY, REGISTRY, route_template
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO))
 logger = logging.getLogger("chatbot_app")
 
 app = FastAPI(title="Financial API Chatbot", version="1.0")
@@ -38,11 +41,19 @@ app = FastAPI(title="Financial API Chatbot", version="1.0")
 @app.middleware("http")
 async def access_log(request: Request, call_next):
     logger.info("HTTP %s %s", request.method, request.url.path)
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
     try:
         response = await call_next(request)
+        status = response.status_code
     except Exception as e:
         logger.exception("Request failed: %s %s -> %s", request.method, request.url.path, e)
         raise
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method,
+                             route=route_template(request), status=status)
     logger.info("HTTP %s %s -> %s", request.method, request.url.path, getattr(response, 'status_code', '?'))
     return response
 
@@ -92,6 +103,7 @@ class AssistantRequest(BaseModel):
     session_id: Optional[str] = None
     auto_execute: bool = True
     max_tools: int = 1
+    speculate: Optional[bool] = None  # passed to /llm/agent (default: server's LLM_SPECULATE)
 
 class AssistantResponse(BaseModel):
     mode: str = "assistant"
@@ -132,6 +144,7 @@ async def shutdown_event():
     if mcp_client:
         await mcp_client.close()
         logger.info("MCP client closed.")
+    await get_llm_client().aclose()
  
  
 from pydantic import BaseModel
@@ -478,6 +491,8 @@ async def assistant_chat(req: AssistantRequest):
                 'max_steps': max(1, int(req.max_tools or 1)),
                 'dry_run': False
             }
+            if req.speculate is not None:
+                payload['speculate'] = req.speculate
             async with mcp_client._session.post(f"{base_url}/llm/agent", json=payload) as resp:  # type: ignore
                 if resp.status == 200:
                     agent = await resp.json()
@@ -518,22 +533,37 @@ async def assistant_chat(req: AssistantRequest):
             plan_steps = [{'tool': chosen, 'arguments': args}]
     # If executions are not provided (dry_run), execute selected plan here
     if req.auto_execute and not executions:
-        for step in plan_steps[: max(1, int(req.max_tools or 1))]:
-            t = step.get('tool'); args = step.get('arguments') or {}
-            try:
-                result = await mcp_client.call_tool(t, **args)
-                executions.append({'tool': t, 'status': 'success', 'result': result})
-            except Exception as e:
-                executions.append({'tool': t, 'status': 'error', 'error': str(e)})
+        # one round trip for all steps; the server runs them concurrently
+        steps = plan_steps[: max(1, int(req.max_tools or 1))]
+        batch = await mcp_client.call_tools_batch(
+            [{'tool': s.get('tool'), 'arguments': s.get('arguments') or {}} for s in steps])
+        items = batch.get('results') or []
+        if not items:
+            executions.extend({'tool': s.get('tool'), 'status': 'error', 'error': batch.get('message', 'batch failed')}
+                              for s in steps)
+        for item in items:
+            # per-item status from /mcp/batch: an upstream 4xx/5xx still carries a result body
+            result = item.get('result')
+            if item.get('status') == 'success':
+                executions.append({'tool': item['tool'], 'status': 'success', 'result': result,
+                                   'elapsed_ms': item.get('elapsed_ms')})
+                continue
+            error = (result.get('message') or result.get('error')) if isinstance(result, dict) else None
+            if not error and item.get('status_code'):
+                error = f"HTTP {item['status_code']}"
+            executions.append({'tool': item['tool'], 'status': 'error', 'error': error or item.get('status'),
+                               'hint': result.get('hint') if isinstance(result, dict) else None,
+                               'result': result, 'elapsed_ms': item.get('elapsed_ms')})
 
     plan = {
         'agent_note': (agent.get('notes') if isinstance(agent, dict) else None),
         'selected': [s.get('tool') for s in plan_steps],
         'arguments': {s.get('tool'): s.get('arguments') for s in plan_steps},
-        'executed': bool(executions)
+        'executed': bool(executions),
+        'speculation': (agent.get('speculation') if isinstance(agent, dict) else None)
     }
 
-    answer = synthesize_answer(executions) if executions else None
+    answer = await synthesize_answer(executions) if executions else None
     if answer:
         session['conversation_history'].append({'role': 'assistant', 'content': answer, 'timestamp': datetime.now().isoformat()})
     session['conversation_history'].append({'role': 'assistant', 'content': plan, 'timestamp': datetime.now().isoformat()})
@@ -541,6 +571,10 @@ async def assistant_chat(req: AssistantRequest):
     return AssistantResponse(message=req.message, session_id=session_id, plan=plan, executions=executions, answer=answer, response=answer)
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/status")
 async def get_status():
     global mcp_client
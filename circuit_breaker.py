@@ -0,0 +1,183 @@
+"""Circuit breakers and latency-derived timeouts for upstream calls.
+
+Every call is admitted by two breakers, one per spec (whole upstream) and one per
+operation (tool). A breaker opens after `failure_threshold` consecutive failures
+(connection errors, timeouts, 5xx) and rejects calls immediately. After `reset_timeout`
+seconds it lets `half_open_probes` calls through; a success closes it, a failure
+re-opens it.
+
+Read timeouts follow observed latency: once an operation has `min_samples` samples,
+its timeout is p99 * factor, clamped to [min_timeout, configured read timeout].
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.trips = 0
+
+    # callers hold BreakerRegistry._lock
+    def allow(self, now: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state, self.probes = HALF_OPEN, 0
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self.probes < self.half_open_probes:
+            self.probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self):
+        """Give back a half-open probe slot taken by a call that never reported."""
+        if self.state == HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def record(self, ok: bool, now: float):
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state, self.opened_at = OPEN, now
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        out = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "trips": self.trips,
+        }
+        if self.state != CLOSED:
+            out["retry_in_s"] = round(max(0.0, self.opened_at + self.reset_timeout - now), 3)
+        return out
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self.samples: deque = deque(maxlen=window)
+        self._p99: Optional[float] = None
+        self._dirty = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self._dirty += 1
+
+    def p99(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        # re-sorting the window on every call would dominate hot paths; refresh every 16 samples
+        if self._p99 is None or self._dirty >= 16:
+            ordered = sorted(self.samples)
+            self._p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            self._dirty = 0
+        return self._p99
+
+
+class BreakerRegistry:
+    def __init__(self):
+        self.failure_threshold = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+        self.reset_timeout = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+        self.half_open_probes = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+        self.timeout_factor = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+        self.min_timeout = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "0.5"))
+        self.min_samples = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+        self.window = int(os.getenv("ADAPTIVE_TIMEOUT_WINDOW", "200"))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        b = self._breakers.get(key)
+        if b is None:
+            b = self._breakers[key] = CircuitBreaker(key, self.failure_threshold, self.reset_timeout,
+                                                    self.half_open_probes)
+        return b
+
+    def admit(self, spec_name: str, operation: str) -> Optional[str]:
+        """None if the call may proceed, else the name of the open breaker."""
+        now = time.monotonic()
+        with self._lock:
+            spec_b = self._breaker(spec_name)
+            if not spec_b.allow(now):
+                return spec_name
+            op_b = self._breaker(operation)
+            if not op_b.allow(now):
+                spec_b.release()  # give back the spec probe we may have taken
+                return operation
+            return None
+
+    def release(self, spec_name: str, operation: str):
+        """An admitted call ended without a result (e.g. it was cancelled): free its probes.
+
+        Without this a cancelled half-open probe would hold its slot forever and the
+        breaker would keep failing fast.
+        """
+        with self._lock:
+            self._breaker(spec_name).release()
+            self._breaker(operation).release()
+
+    def record(self, spec_name: str, operation: str, ok: bool, elapsed: float):
+        now = time.monotonic()
+        with self._lock:
+            self._breaker(spec_name).record(ok, now)
+            self._breaker(operation).record(ok, now)
+            tracker = self._latency.get(operation)
+            if tracker is None:
+                tracker = self._latency[operation] = LatencyTracker(self.window)
+            tracker.add(elapsed)
+
+    def timeout_for(self, operation: str, configured: float) -> float:
+        """Adaptive read timeout for an operation (the configured one until enough samples)."""
+        with self._lock:
+            tracker = self._latency.get(operation)
+            if tracker is None or len(tracker.samples) < self.min_samples:
+                return configured
+            p99 = tracker.p99()
+        return min(configured, max(self.min_timeout, p99 * self.timeout_factor))
+
+    def forget(self, name: str):
+        with self._lock:
+            self._breakers.pop(name, None)
+            self._latency.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for name, b in sorted(self._breakers.items()):
+                entry = b.stats(now)
+                tracker = self._latency.get(name)
+                if tracker is not None and tracker.samples:
+                    entry["samples"] = len(tracker.samples)
+                    entry["p99_ms"] = round(tracker.p99() * 1000, 3)
+                out[name] = entry
+            return out
@@ -114,6 +114,40 @@ class DirectHTTPMCPClient:
             logger.exception("call_tool failed")
             return {"status": "error", "message": str(e)}
 
+    async def call_tools_batch(self, calls: List[Dict[str, Any]], max_concurrency: Optional[int] = None,
+                               fail_fast: bool = False, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Execute several tool calls in one request via POST /batch.
+
+        `calls` is a list of {"tool": name, "arguments": {...}}. Results come back in the
+        same order, each with its own status and timing. Servers without /batch get the
+        calls one by one through call_tool.
+        """
+        payload: Dict[str, Any] = {"calls": calls, "fail_fast": fail_fast}
+        if max_concurrency:
+            payload["max_concurrency"] = max_concurrency
+        if deadline:
+            payload["deadline"] = deadline
+        try:
+            await self._ensure_session()
+            async with self._session.post(f"{self.server_url}/batch", json=payload) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                if resp.status not in (404, 405):
+                    text = await resp.text()
+                    return {"status": "error", "message": f"HTTP {resp.status}: {text}", "results": []}
+        except Exception as e:
+            logger.exception("call_tools_batch failed")
+            return {"status": "error", "message": str(e), "results": []}
+
+        results = []
+        for i, call in enumerate(calls):
+            result = await self.call_tool(call["tool"], **(call.get("arguments") or {}))
+            ok = isinstance(result, dict) and result.get("status", "success") == "success"
+            results.append({"index": i, "tool": call["tool"], "status": "success" if ok else "error", "result": result})
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        status = "success" if succeeded == len(results) else ("error" if not succeeded else "partial")
+        return {"status": status, "results": results}
+
     async def __aenter__(self):
         """
         Enter the asynchronous context manager.
@@ -0,0 +1,245 @@
+"""Shared async client for OpenAI-compatible chat completions (Groq by default).
+
+One long-lived httpx.AsyncClient per process keeps TLS connections to the LLM
+endpoint alive across planning and summarization calls. Calls are bounded by a
+semaphore (LLM_MAX_CONCURRENCY) and a per-call deadline that covers both the wait
+for a slot and the request itself.
+
+Env vars:
+    LLM_BASE_URL         - default https://api.groq.com/openai/v1; any OpenAI-compatible
+                           server (e.g. a local stand-in) works
+    LLM_API_KEY          - falls back to GROQ_API_KEY; optional when LLM_BASE_URL is set
+    GROQ_MODEL           - default model, 'llama-3.1-8b-instant'
+    LLM_TIMEOUT          - default per-call deadline in seconds (60)
+    LLM_MAX_CONCURRENCY  - concurrent LLM calls per process (8)
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from metrics import REGISTRY
+
+logger = logging.getLogger("llm_client")
+
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+LLM_LATENCY = REGISTRY.histogram("llm_request_duration_seconds", "LLM chat completion latency (incl. slot wait)",
+                                 ("purpose", "outcome"))
+LLM_IN_FLIGHT = REGISTRY.gauge("llm_requests_in_flight", "LLM chat completions holding a slot")
+LLM_SLOT_WAIT = REGISTRY.histogram("llm_slot_wait_seconds", "Time spent waiting for an LLM concurrency slot")
+
+
+class LLMError(RuntimeError):
+    """An LLM call failed; status_code is set for non-2xx responses."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class LLMClient:
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: Optional[str] = None,
+                 model: str = DEFAULT_MODEL, timeout: float = 60.0, max_concurrency: int = 8):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        return cls(base_url=os.getenv("LLM_BASE_URL") or DEFAULT_BASE_URL,
+                   api_key=os.getenv("LLM_API_KEY") or os.getenv("GROQ_API_KEY") or None,
+                   model=os.getenv("GROQ_MODEL") or DEFAULT_MODEL,
+                   timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+                   max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+    @property
+    def configured(self) -> bool:
+        """True when calls can be made: an API key, or a non-default (local) base URL."""
+        return bool(self.api_key) or self.base_url != DEFAULT_BASE_URL
+
+    def _http(self) -> httpx.AsyncClient:
+        """Client for the running loop (recreated if the loop changed or it was closed)."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            headers = {"Content-Type": "application/json"}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            self._client = httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=limits,
+                                             timeout=self.timeout)
+            self._client_loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            logger.info("LLM client -> %s (max_concurrency=%d)", self.base_url, self.max_concurrency)
+        return self._client
+
+    async def chat(self, messages: List[Dict[str, str]], *, model: Optional[str] = None,
+                   temperature: float = 0, max_tokens: Optional[int] = None,
+                   deadline: Optional[float] = None, purpose: str = "chat") -> str:
+        """Assistant text of one chat completion; raises LLMError / LLMTimeout."""
+        if not self.configured:
+            raise LLMError("GROQ_API_KEY is not set")
+        body: Dict[str, Any] = {"model": model or self.model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+        client = self._http()
+        slots = self._slots
+        started = time.perf_counter()
+        outcome = "error"
+        with self._lock:
+            self.requests += 1
+        try:
+            text = await asyncio.wait_for(self._post(client, slots, body, started),
+                                          deadline if deadline is not None else self.timeout)
+            outcome = "success"
+            return text
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            with self._lock:
+                self.timeouts += 1
+            raise LLMTimeout(f"LLM call exceeded {deadline if deadline is not None else self.timeout}s") from None
+        except LLMError as e:
+            outcome = f"http_{e.status_code}" if e.status_code else "error"
+            raise
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM request failed: {e}") from e
+        finally:
+            if outcome != "success":
+                with self._lock:
+                    self.failures += 1
+            LLM_LATENCY.observe(time.perf_counter() - started, purpose=purpose, outcome=outcome)
+
+    async def _post(self, client: httpx.AsyncClient, slots: asyncio.Semaphore, body: Dict[str, Any],
+                    started: float) -> str:
+        async with slots:
+            LLM_SLOT_WAIT.observe(time.perf_counter() - started)
+            with LLM_IN_FLIGHT.track():
+                resp = await client.post("/chat/completions", json=body)
+        if resp.status_code != 200:
+            raise LLMError(f"LLM returned HTTP {resp.status_code}: {resp.text[:200]}", resp.status_code)
+        try:
+            data = resp.json()
+        except ValueError as e:
+            raise LLMError(f"LLM returned invalid JSON: {e}") from e
+        return ((data.get("choices") or [{}])[0].get("message") or {}).get("content", "").strip()
+
+    async def chat_stream(self, messages: List[Dict[str, str]], *, model: Optional[str] = None,
+                          temperature: float = 0, max_tokens: Optional[int] = None,
+                          deadline: Optional[float] = None, purpose: str = "chat") -> AsyncIterator[str]:
+        """Content deltas of a streamed (SSE) chat completion, with the same slots, deadline and
+        metrics as chat(); the deadline covers the whole stream."""
+        if not self.configured:
+            raise LLMError("GROQ_API_KEY is not set")
+        body: Dict[str, Any] = {"model": model or self.model, "messages": messages, "temperature": temperature,
+                                "stream": True}
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+        client = self._http()
+        slots = self._slots
+        limit = deadline if deadline is not None else self.timeout
+        started = time.perf_counter()
+        outcome = "error"
+        with self._lock:
+            self.requests += 1
+
+        def remaining() -> float:
+            left = started + limit - time.perf_counter()
+            if left <= 0:
+                raise asyncio.TimeoutError
+            return left
+
+        try:
+            await asyncio.wait_for(slots.acquire(), remaining())
+            try:
+                LLM_SLOT_WAIT.observe(time.perf_counter() - started)
+                with LLM_IN_FLIGHT.track():
+                    request = client.build_request("POST", "/chat/completions", json=body)
+                    resp = await asyncio.wait_for(client.send(request, stream=True), remaining())
+                    try:
+                        if resp.status_code != 200:
+                            text = (await resp.aread()).decode("utf-8", "replace")
+                            raise LLMError(f"LLM returned HTTP {resp.status_code}: {text[:200]}", resp.status_code)
+                        lines = resp.aiter_lines()
+                        while True:
+                            try:
+                                line = await asyncio.wait_for(lines.__anext__(), remaining())
+                            except StopAsyncIteration:
+                                break
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            try:
+                                chunk = json.loads(data)
+                            except ValueError:
+                                continue
+                            delta = ((chunk.get("choices") or [{}])[0].get("delta") or {}).get("content")
+                            if delta:
+                                yield delta
+                    finally:
+                        await resp.aclose()
+            finally:
+                slots.release()
+            outcome = "success"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            with self._lock:
+                self.timeouts += 1
+            raise LLMTimeout(f"LLM stream exceeded {limit}s") from None
+        except LLMError as e:
+            outcome = f"http_{e.status_code}" if e.status_code else "error"
+            raise
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM request failed: {e}") from e
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            if outcome not in ("success", "cancelled"):
+                with self._lock:
+                    self.failures += 1
+            LLM_LATENCY.observe(time.perf_counter() - started, purpose=purpose, outcome=outcome)
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"base_url": self.base_url, "model": self.model, "configured": self.configured,
+                    "max_concurrency": self.max_concurrency, "timeout": self.timeout,
+                    "requests": self.requests, "failures": self.failures, "timeouts": self.timeouts}
+
+
+_shared: Optional[LLMClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """The process-wide client, built from the environment on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LLMClient.from_env()
+        return _shared
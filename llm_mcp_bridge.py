@@ -13,11 +13,19 @@ allow a generic LLM orchestrator to call a single /llm/route endpoint with a JSO
 Extend this with auth (API keys / JWT) and rate limiting before production use.
 """
 from fastapi import APIRouter, HTTPException
+import asyncio
 import logging
+import time
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 import os
 from openapi_mcp_server import server  # reuse existing singleton
+from metrics import REGISTRY
+from llm_client import get_llm_client
+from plan_cache import PlanCache
+from tool_ranker import ToolRanker, estimate_tokens
+from plan_stream import StepStreamParser
+from speculation import Prefetcher, SpeculationStats
 
 logger = logging.getLogger("llm_mcp_bridge")
 if not logger.handlers:
@@ -26,9 +34,52 @@ if not logger.handlers:
 router = APIRouter(prefix="/llm", tags=["llm"])
 logger.info("LLM bridge module imported; router ready at prefix /llm")
 
+LLM_PLANNING_LATENCY = REGISTRY.histogram("llm_planning_duration_seconds", "LLM planning call latency",
+                                          ("outcome",))
+
 # Debug snapshot of last agent invocation
 LAST_LLM_DEBUG: Optional[dict] = None
 
+# Plans for repeated questions skip the planner LLM; PLAN_CACHE=0 disables
+PLAN_CACHE: Optional[PlanCache] = None
+if os.getenv("PLAN_CACHE", "1") != "0":
+    PLAN_CACHE = PlanCache(int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "256")), float(os.getenv("PLAN_CACHE_TTL", "300")))
+    server.on_reload.append(lambda summary: PLAN_CACHE.clear())
+
+
+def _plan_cache_metric_families():
+    if PLAN_CACHE is None:
+        return
+    c = PLAN_CACHE.stats()
+    yield ("llm_plan_cache_entries", "gauge", "Cached LLM plans", [({}, c["entries"])])
+    for key in ("hits", "misses", "rejected", "evictions"):
+        yield (f"llm_plan_cache_{key}_total", "counter", f"LLM plan cache {key}", [({}, c[key])])
+
+
+REGISTRY.register_collector(_plan_cache_metric_families)
+
+# Predicted GET calls started while the planner runs (LLM_SPECULATE=1 or per request)
+SPECULATION = SpeculationStats()
+
+
+def _speculation_metric_families():
+    s = SPECULATION.stats()
+    for key in ("started", "hits", "wasted", "cancelled"):
+        yield (f"llm_speculative_calls_{key}_total", "counter", f"Speculative tool calls {key}", [({}, s[key])])
+
+
+REGISTRY.register_collector(_speculation_metric_families)
+
+# BM25 index over the live tools, rebuilt when the registry version changes
+_ranker_cache: Dict[str, Any] = {"version": None, "ranker": None}
+
+
+def _ranker() -> ToolRanker:
+    registry = server.registry
+    if _ranker_cache["version"] != registry.version:
+        _ranker_cache.update(version=registry.version, ranker=ToolRanker(list(registry.tools.values())))
+    return _ranker_cache["ranker"]
+
 class LLMToolCall(BaseModel):
     tool: str
     arguments: Dict[str, Any] = {}
@@ -47,6 +98,8 @@ class LLMAgentRequest(BaseModel):
     max_steps: int = 3
     dry_run: bool = False
     model: Optional[str] = None  # optional override
+    max_concurrency: Optional[int] = None  # cap on steps running at once (default LLM_AGENT_MAX_CONCURRENCY)
+    speculate: Optional[bool] = None  # prefetch predicted GET calls while planning (default LLM_SPECULATE)
 
 class LLMAgentResponse(BaseModel):
     status: str
@@ -59,6 +112,8 @@ class LLMAgentResponse(BaseModel):
     arguments: Optional[Dict[str, Dict[str, Any]]] = None
     executed: Optional[bool] = None
     results: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
+    speculation: Optional[Dict[str, Any]] = None
 
 def _get_value_at_path(obj: Any, path: str) -> Any:
     """Walk obj by dot-path; supports dict keys and list indices."""
@@ -77,23 +132,149 @@ def _get_value_at_path(obj: Any, path: str) -> Any:
                 return None
     return cur
 
+def _parse_placeholder(value: str) -> Optional[Tuple[str, str]]:
+    """Split '${TOOL.key.path}' into (TOOL, 'key.path'); None if not a placeholder."""
+    if value.startswith('${') and value.endswith('}'):
+        inner = value[2:-1].strip()
+        if '.' in inner:
+            tool, path = inner.split('.', 1)
+            return tool, path
+    return None
+
 def _resolve_placeholders(value: Any, ctx: Dict[str, Any]) -> Any:
     """Replace strings like ${TOOL.key.path} with values from ctx[TOOL]."""
     if isinstance(value, str):
-        if value.startswith('${') and value.endswith('}'):
-            inner = value[2:-1].strip()
-            if '.' in inner:
-                tool, path = inner.split('.', 1)
-                base = ctx.get(tool)
-                if base is not None:
-                    got = _get_value_at_path(base, path)
-                    return got if got is not None else value
+        ref = _parse_placeholder(value)
+        if ref:
+            tool, path = ref
+            base = ctx.get(tool)
+            if base is not None:
+                got = _get_value_at_path(base, path)
+                return got if got is not None else value
     elif isinstance(value, dict):
         return {k: _resolve_placeholders(v, ctx) for k, v in value.items()}
     elif isinstance(value, list):
         return [_resolve_placeholders(v, ctx) for v in value]
     return value
 
+def _placeholder_tools(value: Any) -> Set[str]:
+    """Collect the TOOL names referenced by ${TOOL.path} placeholders inside value."""
+    found: Set[str] = set()
+    if isinstance(value, str):
+        ref = _parse_placeholder(value)
+        if ref:
+            found.add(ref[0])
+    elif isinstance(value, dict):
+        for v in value.values():
+            found |= _placeholder_tools(v)
+    elif isinstance(value, list):
+        for v in value:
+            found |= _placeholder_tools(v)
+    return found
+
+
+def _plan_still_valid(steps: List[Dict[str, Any]]) -> bool:
+    """A cached plan is reused only if its tools exist and its arguments still validate."""
+    tools = server.api_tools
+    for step in steps:
+        tool = tools.get(step.get("tool"))
+        if tool is None:
+            return False
+        if server.validate_arguments:
+            args = step.get("arguments") or {}
+            # placeholder values are only known at run time
+            deferred = {k for k, v in args.items() if _placeholder_tools(v)}
+            if any(e["param"] not in deferred for e in tool.validator(args)):
+                return False
+    return True
+
+
+class _PlanExecutor:
+    """Run plan steps as a DAG instead of strictly in order.
+
+    A step depends on the most recent earlier step for every TOOL its placeholders
+    reference; everything else starts immediately, bounded by a semaphore. Steps can be
+    submitted one at a time, and results are still reported in plan order.
+    """
+
+    def __init__(self, max_concurrency: int, prefetch: Optional[Prefetcher] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self._prefetch = prefetch
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._steps: List[LLMPlanStep] = []
+        self._deps: List[List[int]] = []
+        self._tasks: List[asyncio.Task] = []
+        self._latest: Dict[str, int] = {}  # tool name -> index of its latest submitted step
+        self._t0 = time.perf_counter()
+
+    def _ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 2)
+
+    @property
+    def submitted(self) -> int:
+        return len(self._steps)
+
+    def submit(self, step: LLMPlanStep) -> int:
+        idx = len(self._steps)
+        refs = _placeholder_tools(step.arguments or {})
+        deps = sorted({self._latest[t] for t in refs if t in self._latest})
+        # a speculative call made for exactly these arguments replaces the upstream call
+        pending = self._prefetch.claim(step.tool, step.arguments) if self._prefetch is not None and not refs else None
+        self._steps.append(step)
+        self._deps.append(deps)
+        self._latest[step.tool] = idx
+        self._tasks.append(asyncio.create_task(self._run(idx, step, deps, pending)))
+        return idx
+
+    async def _run(self, idx: int, step: LLMPlanStep, deps: List[int],
+                   pending: Optional[asyncio.Task] = None) -> Dict[str, Any]:
+        submitted = self._ms()
+        ctx: Dict[str, Any] = {}
+        for d in deps:
+            dep_record = await self._tasks[d]
+            ctx[self._steps[d].tool] = dep_record['value']
+        async with self._sem:
+            started = self._ms()
+            try:
+                resolved_args = _resolve_placeholders(step.arguments or {}, ctx)
+                if pending is not None:
+                    result = await pending
+                else:
+                    result = await server.execute_endpoint_async(step.tool, resolved_args)
+                execution = {'tool': step.tool, 'status': 'success', 'result': result}
+                value = result['response'] if isinstance(result, dict) and 'response' in result else result
+            except Exception as e:
+                execution = {'tool': step.tool, 'status': 'error', 'error': str(e)}
+                value = {'status': 'error', 'error': str(e)}
+            finished = self._ms()
+        timing = {
+            'step': idx,
+            'tool': step.tool,
+            'depends_on': deps,
+            'submitted_ms': submitted,
+            'start_ms': started,
+            'end_ms': finished,
+            'wait_ms': round(started - submitted, 2),
+            'elapsed_ms': round(finished - started, 2),
+            'prefetched': pending is not None,
+        }
+        execution['timing'] = timing
+        return {'execution': execution, 'value': value, 'timing': timing}
+
+    async def finish(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        """Wait for all submitted steps; return (executions, results_map, timings) in plan order."""
+        records = await asyncio.gather(*self._tasks)
+        executions = [r['execution'] for r in records]
+        results_map: Dict[str, Any] = {}
+        for step, r in zip(self._steps, records):
+            results_map[step.tool] = r['value']
+        timings = {
+            'total_ms': self._ms(),
+            'max_concurrency': self.max_concurrency,
+            'steps': [r['timing'] for r in records],
+        }
+        return executions, results_map, timings
+
 
 def _strip_code_fences(text: str) -> str:
     """Remove common markdown code fences like ```json ... ``` or ``` ... ```."""
@@ -162,34 +343,23 @@ def _coerce_args_to_dict(args: Any) -> Dict[str, Any]:
     # fallback empty if nothing parsed
     return out
 
-def _groq_chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
-    """Single place to call Groq chat completions and return the assistant text."""
-    from groq import Groq
-    api_key = os.environ.get('GROQ_API_KEY')
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY is not set")
-    client = Groq(api_key=api_key)
-    selected_model = model or os.environ.get('GROQ_MODEL') or 'llama-3.1-8b-instant'
-    resp = client.chat.completions.create(model=selected_model, messages=messages, temperature=0)
-    content = (resp.choices[0].message.content or '').strip()
-    return content
+async def _groq_chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
+    """Single place to call the planner LLM (shared pooled client) and return the assistant text."""
+    return await get_llm_client().chat(messages, model=model, temperature=0, purpose="planning")
 
 @router.post("/route")
-def llm_route(body: LLMRouteRequest):
+async def llm_route(body: LLMRouteRequest):
     logger.info("/llm/route called message_empty=%s call=%s", not bool(body.message), bool(body.call))
     # If explicit tool call provided, execute directly
     if body.call:
         t = body.call.tool
         args = body.call.arguments or {}
-        # mimic /mcp/tools/{tool}
-        if t in server.api_tools:
-            res = server.execute_endpoint(t, args)
-            logger.info("/llm/route exec %s -> %s", t, res.get('status'))
+        # mimic /mcp/tools/{tool}: exact name, un-prefixed alias or operationId
+        resolved = server.resolve_tool(t)
+        if resolved:
+            res = await server.execute_endpoint_async(resolved, args)
+            logger.info("/llm/route exec %s -> %s", resolved, res.get('status'))
             return {"status": "success", "result": res}
-        # suffix alias
-        for name in server.api_tools:
-            if name.endswith(f"_{t}"):
-                return {"status": "success", "result": server.execute_endpoint(name, args)}
         raise HTTPException(404, f"Tool {t} not found")
 
     # If natural language message: naive heuristic -> list endpoints if user asks
@@ -205,7 +375,7 @@ def llm_route(body: LLMRouteRequest):
     return {"status": "echo", "message": body.message}
 
 
-def _basic_intent_parse(message: str, tool_names: List[str]) -> List[LLMPlanStep]:
+def _basic_intent_parse(message: str, tool_names: List[str], default_fallback: bool = True) -> List[LLMPlanStep]:
     """Fallback rule-based intent to tool mapping (no external LLM)."""
     m = message.lower()
     steps: List[LLMPlanStep] = []
@@ -232,72 +402,179 @@ def _basic_intent_parse(message: str, tool_names: List[str]) -> List[LLMPlanStep
                         args['status'] = 'pending'
                     steps.append(LLMPlanStep(tool=tn, arguments=args, reason=f"Matched phrase '{phrase}'"))
                     break
-    if not steps and tool_names:
+    if not steps and tool_names and default_fallback:
         # default fallback: first tool
         steps.append(LLMPlanStep(tool=tool_names[0], reason="Default first tool fallback"))
     # Return all matched steps in order; caller will cap to max_steps
     return steps
 
+def _start_prefetch(message: str, registry: Any, limit: int) -> Prefetcher:
+    """Start the rule-based prediction's read-only calls; the plan claims or settle() cancels them."""
+    prefetch = Prefetcher(server.execute_endpoint_async, SPECULATION)
+    for step in _basic_intent_parse(message, list(registry.tools.keys()), default_fallback=False)[:limit]:
+        tool = registry.tools.get(step.tool)
+        if tool is not None and tool.method in ("GET", "HEAD"):
+            prefetch.start(step.tool, step.arguments)
+    return prefetch
+
+def _plan_step(item: Any, known: Set[str]) -> Optional[LLMPlanStep]:
+    """A planner JSON item as a step, or None if it does not name a known tool."""
+    if not isinstance(item, dict) or item.get('tool') not in known:
+        return None
+    args = _coerce_args_to_dict(item.get('arguments', {}))
+    return LLMPlanStep(tool=item['tool'], arguments=args, reason=item.get('reason'))
+
+async def _llm_plan(message: str, tool_names: List[str], model: Optional[str] = None,
+                    debug: Optional[dict] = None,
+                    on_step: Optional[Callable[[LLMPlanStep], None]] = None) -> List[LLMPlanStep]:
+    """Ask the planner LLM for steps; only tools in tool_names are kept (may be empty).
+
+    The prompt lists the PLANNER_TOP_K tools most relevant to the message (0: all tool
+    names), as signatures capped at PLANNER_TOOL_TOKEN_BUDGET tokens. The reply is
+    streamed (PLANNER_STREAM=0 waits for the whole completion) and on_step is called
+    for each step as soon as its JSON object is complete.
+    """
+    top_k = int(os.environ.get('PLANNER_TOP_K', '20'))
+    if top_k > 0:
+        budget = int(os.environ.get('PLANNER_TOOL_TOKEN_BUDGET', '1500'))
+        tool_lines = _ranker().shortlist(message, top_k, budget)
+    else:
+        tool_lines = tool_names
+    tool_list_text = "\n".join(tool_lines)
+    if debug is not None:
+        debug["planner_tools"] = len(tool_lines)
+        debug["planner_tool_tokens"] = estimate_tokens(tool_list_text)
+    system_prompt = (
+        "You are a tool planner. Given user request and tool list, respond with JSON array of steps. "
+        "Tools are listed as name(param: type, optional?: type) - summary; use the exact tool name. "
+        "Each step: {tool, arguments, reason}. Only include tools that exist. Keep arguments simple. "
+        "If a later step needs a value from an earlier step, set the argument to a placeholder like "
+        "${TOOL.key.path} where TOOL is the earlier tool name and key.path navigates its JSON. "
+        "Every tool also accepts optional 'select' (JMESPath projection, e.g. payments[*].{id: id, amount: amount}) "
+        "and 'where' (row filter, e.g. status=='pending') arguments; use them to fetch only the fields you need."
+    )
+    content = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Tools:\n{tool_list_text}\n\nUser: {message}"}
+    ]
+    known = set(tool_names)
+    plan: List[LLMPlanStep] = []
+    started = time.perf_counter()
+
+    def accept(item: Any):
+        step = _plan_step(item, known)
+        if step is None:
+            return
+        if debug is not None and not plan:
+            debug["first_step_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        plan.append(step)
+        if on_step is not None:
+            on_step(step)
+
+    if os.environ.get('PLANNER_STREAM', '1') != '0':
+        parser = StepStreamParser()
+        chunks: List[str] = []
+        with LLM_PLANNING_LATENCY.time(outcome="error") as labels:
+            async for delta in get_llm_client().chat_stream(content, model=model, temperature=0, purpose="planning"):
+                chunks.append(delta)
+                for item in parser.feed(delta):
+                    accept(item)
+            labels["outcome"] = "success"
+        if debug is not None:
+            debug["completion_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if parser.items:
+            return plan
+        raw = "".join(chunks)  # no JSON array/object found incrementally; try the lenient extraction
+    else:
+        with LLM_PLANNING_LATENCY.time(outcome="error") as labels:
+            raw = await _groq_chat(content, model)
+            labels["outcome"] = "success"
+    parsed = _extract_json_payload(raw)
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    for item in parsed:
+        accept(item)
+    return plan
+
 @router.post('/agent', response_model=LLMAgentResponse)
-def llm_agent(req: LLMAgentRequest):
+async def llm_agent(req: LLMAgentRequest):
     """Experimental agent endpoint using Groq only for planning (fallback to rule-based)."""
     try:
-        tool_names = list(server.api_tools.keys())
+        registry = server.registry  # tool names and version from one snapshot
+        tool_names = list(registry.tools.keys())
         executions: List[Dict[str, Any]] = []
         used_llm = False
         debug: dict = {"message": req.message, "provider": "groq", "used_llm": False, "error": None}
+        cache_key = None
+        cached = None
+        if PLAN_CACHE is not None:
+            cache_key = PlanCache.make_key(req.message, registry.version, req.model or get_llm_client().model)
+            cached = PLAN_CACHE.get(cache_key)
+            if cached is not None and not _plan_still_valid(cached):
+                PLAN_CACHE.reject(cache_key)
+                cached = None
+                debug["plan_cache"] = "rejected"
+            else:
+                debug["plan_cache"] = "hit" if cached is not None else "miss"
 
-        system_prompt = (
-            "You are a tool planner. Given user request and tool list, respond with JSON array of steps. "
-            "Each step: {tool, arguments, reason}. Only include tools that exist. Keep arguments simple. "
-            "If a later step needs a value from an earlier step, set the argument to a placeholder like "
-            "${TOOL.key.path} where TOOL is the earlier tool name and key.path navigates its JSON."
-        )
-        tool_list_text = "\n".join(tool_names)
-        content = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Tools:\n{tool_list_text}\n\nUser: {req.message}"}
-        ]
+        executor: Optional[_PlanExecutor] = None
+        prefetch: Optional[Prefetcher] = None
+        if not req.dry_run:
+            speculate = req.speculate if req.speculate is not None else os.environ.get('LLM_SPECULATE', '0') == '1'
+            if speculate and cached is None:
+                prefetch = _start_prefetch(req.message, registry, req.max_steps)
+            # Independent steps run concurrently; placeholder references order the rest
+            concurrency = req.max_concurrency or int(os.environ.get('LLM_AGENT_MAX_CONCURRENCY', '4'))
+            executor = _PlanExecutor(concurrency, prefetch)
+        streamed: List[LLMPlanStep] = []
 
-        try:
-            raw = _groq_chat(content, model=req.model)
-            parsed = _extract_json_payload(raw)
-            if isinstance(parsed, dict):
-                parsed = [parsed]
-            plan: List[LLMPlanStep] = []
-            for item in parsed:
-                t = item.get('tool')
-                if t in tool_names:
-                    args = _coerce_args_to_dict(item.get('arguments', {}))
-                    plan.append(LLMPlanStep(tool=t, arguments=args, reason=item.get('reason')))
-            if not plan:
-                plan = _basic_intent_parse(req.message, tool_names)
-            used_llm = True
-            logger.info("[LLM] Groq planning steps=%d", len(plan))
+        def dispatch(step: LLMPlanStep):
+            # streamed steps start while the LLM is still writing the rest of the plan
+            streamed.append(step)
+            if executor is not None and executor.submitted < req.max_steps:
+                executor.submit(step)
+
+        if cached is not None:
+            plan = [LLMPlanStep(**step) for step in cached]
+            used_llm = True  # the plan came from the LLM earlier; no call now
+            logger.info("[LLM] plan cache hit steps=%d", len(plan))
             debug["plan_len"] = len(plan)
-        except Exception as e:
-            logger.warning("Groq planning error: %s -- falling back to rule-based", e)
-            debug["error"] = str(e)
-            plan = _basic_intent_parse(req.message, tool_names)
+        else:
+            try:
+                plan = await _llm_plan(req.message, tool_names, req.model, debug, on_step=dispatch)
+                if plan and cache_key is not None:
+                    PLAN_CACHE.put(cache_key, [{"tool": step.tool, "arguments": step.arguments, "reason": step.reason}
+                                               for step in plan])
+                if not plan:
+                    plan = _basic_intent_parse(req.message, tool_names)
+                used_llm = True
+                logger.info("[LLM] Groq planning steps=%d", len(plan))
+                debug["plan_len"] = len(plan)
+            except Exception as e:
+                debug["error"] = str(e)
+                if streamed:
+                    # steps already dispatched stay the plan; nothing is planned twice
+                    logger.warning("Groq planning stream failed after %d steps: %s", len(streamed), e)
+                    plan = streamed
+                    used_llm = True
+                else:
+                    logger.warning("Groq planning error: %s -- falling back to rule-based", e)
+                    plan = _basic_intent_parse(req.message, tool_names)
 
         selected = [s.tool for s in plan]
         argmap: Dict[str, Dict[str, Any]] = {s.tool: s.arguments for s in plan}
         results_map: Dict[str, Any] = {}
 
-        if not req.dry_run:
-            for idx, step in enumerate(plan[: req.max_steps]):
-                try:
-                    # Resolve placeholders from previously collected results_map
-                    resolved_args = _resolve_placeholders(step.arguments or {}, results_map)
-                    result = server.execute_endpoint(step.tool, resolved_args)
-                    executions.append({'tool': step.tool, 'status': 'success', 'result': result})
-                    if isinstance(result, dict) and 'response' in result:
-                        results_map[step.tool] = result['response']
-                    else:
-                        results_map[step.tool] = result
-                except Exception as e:
-                    executions.append({'tool': step.tool, 'status': 'error', 'error': str(e)})
-                    results_map[step.tool] = {'status': 'error', 'error': str(e)}
+        timings: Optional[Dict[str, Any]] = None
+        speculation: Optional[Dict[str, Any]] = None
+
+        if executor is not None:
+            # cached / rule-based plans (and anything not streamed) are submitted here
+            for step in plan[executor.submitted: req.max_steps]:
+                executor.submit(step)
+            if prefetch is not None:
+                speculation = debug["speculation"] = prefetch.settle()
+            executions, results_map, timings = await executor.finish()
 
         note = 'llm_plan' if used_llm else 'rule_based_plan'
         debug["used_llm"] = used_llm
@@ -305,6 +582,7 @@ def llm_agent(req: LLMAgentRequest):
         debug["note"] = note
         if not req.dry_run:
             debug["executions"] = [{"tool": e.get("tool"), "status": e.get("status")} for e in executions]
+            debug["timings"] = timings
         global LAST_LLM_DEBUG
         LAST_LLM_DEBUG = debug
         logger.info("/llm/agent selected=%s executed=%s", selected, not req.dry_run)
@@ -318,12 +596,18 @@ def llm_agent(req: LLMAgentRequest):
             arguments=argmap,
             executed=(not req.dry_run),
             results=None if req.dry_run else results_map,
+            timings=timings,
+            speculation=speculation,
         )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(500, str(e))
 
+@router.on_event("shutdown")
+async def close_llm_client():
+    await get_llm_client().aclose()
+
 @router.get('/status')
 def llm_status():
     """Report Groq availability, selected model, and tool count."""
@@ -334,6 +618,9 @@ def llm_status():
         'groq_api_key_present': groq_present,
         'model': model,
         'tool_count': len(server.api_tools),
+        'client': get_llm_client().stats(),
+        'plan_cache': PLAN_CACHE.stats() if PLAN_CACHE is not None else None,
+        'speculation': SPECULATION.stats(),
         'note': 'Set GROQ_API_KEY and optionally GROQ_MODEL. Agent uses Groq only; OpenAI is ignored.'
     }
 
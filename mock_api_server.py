@@ -127,11 +127,14 @@ def reject_payment(payment_id: str, rejector_id: str, reason: str | None = None)
     return p
 
 @app.get("/transactions")
-def get_transactions(type: str | None = None):
+def get_transactions(type: str | None = None, limit: int | None = None, offset: int = 0):
     data = list(transactions_store)
     if type:
         data = [t for t in data if t.type == type]
-    return {"transactions": data, "total_count": len(data)}
+    total = len(data)
+    if limit is not None:
+        data = data[offset:offset + limit]
+    return {"transactions": data, "total_count": total}
 
 @app.get("/summary")
 def cash_summary(date_range: str | None = None, include_pending: bool = True):
@@ -15,21 +15,58 @@ import base64
 import re
 import logging
 import argparse
+import asyncio
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, List, NamedTuple, Optional
+from contextlib import AsyncExitStack
 from inspect import Signature, Parameter
 import requests
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from tool_index import ToolIndex
+from request_plan import BoundRequest, RequestPlan, compile_request_plan
+from spec_cache import SpecCache, SpecFile
+from response_cache import CacheEntry, ResponseCache, upstream_ttl
+from singleflight import SingleFlight
+from upstream_pool import PoolSettings, UpstreamPool
+from circuit_breaker import BreakerRegistry
+from token_manager import Token, TokenManager
+from registry_snapshot import SNAPSHOT_ENV, load_snapshot, write_snapshot
+from projection import PROJECTION_PARAMS, Projection, ProjectionError, compile_projection
+from pagination import SKIP, Pagination, detect_pagination, iterate_records
+from ref_resolver import RefResolver
+from arg_validation import CONSTRAINT_KEYS, ArgumentValidator, compile_validator
+from metrics import CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_LATENCY, REGISTRY, route_template
 # from openapi_spec_validator import validate_v3_spec, validate_v2_spec
-from pydantic import BaseModel, Field
-from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field, PrivateAttr
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+if __name__ in ("__main__", "__mp_main__"):
+    # run as a script (or a spawned worker): make `import openapi_mcp_server` (llm_mcp_bridge,
+    # uvicorn workers) resolve to this module instead of building a second server
+    sys.modules.setdefault("openapi_mcp_server", sys.modules[__name__])
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL (default INFO) also sets uvicorn's level; WARNING drops the per-request access log
+LOG_LEVEL = logging.getLevelName(getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO))
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger("openapi_mcp_server")
 
+TOOL_LATENCY = REGISTRY.histogram("mcp_tool_duration_seconds", "Tool call latency as seen by callers",
+                                  ("tool", "spec", "outcome"))
+TOOLS_IN_FLIGHT = REGISTRY.gauge("mcp_tools_in_flight", "Tool calls in progress", ("spec",))
+UPSTREAM_LATENCY = REGISTRY.histogram("mcp_upstream_duration_seconds", "Upstream HTTP latency per operation",
+                                      ("spec", "operation"))
+UPSTREAM_RESPONSES = REGISTRY.counter("mcp_upstream_responses_total", "Upstream responses by status code",
+                                      ("spec", "status"))
+ARGS_REJECTED = REGISTRY.counter("mcp_tool_rejected_total", "Calls rejected by argument validation before going upstream",
+                                 ("tool", "spec"))
+
 
 @dataclass
 class APISpec:
@@ -49,15 +86,119 @@ class APITool(BaseModel):
     tags: List[str] = Field(default_factory=list)
     summary: Optional[str] = None
     operation_id: Optional[str] = None
+    cache_ttl: Optional[float] = None  # x-cache-ttl (operation, else spec level)
+    pagination: Optional[Pagination] = None  # x-pagination or detected from parameters
+    _plan: Optional[RequestPlan] = PrivateAttr(default=None)
+    _validator: Optional[ArgumentValidator] = PrivateAttr(default=None)
+
+    @property
+    def request_plan(self) -> RequestPlan:
+        """Request template compiled at registration (compiled lazily if missing)."""
+        if self._plan is None:
+            self._plan = compile_request_plan(self)
+        return self._plan
+
+    @property
+    def validator(self) -> ArgumentValidator:
+        """Argument validator compiled at registration (compiled lazily if missing)."""
+        if self._validator is None:
+            self._validator = compile_validator(self.parameters)
+        return self._validator
+
+
+class UpstreamStream(NamedTuple):
+    """An upstream response whose body has not been read yet (see open_endpoint_stream)."""
+    tool: str
+    status_code: int
+    url: str
+    headers: Dict[str, str]
+    body: AsyncIterator[bytes]
+
+
+def _tool_to_dict(tool: APITool) -> Dict[str, Any]:
+    dump = getattr(tool, "model_dump", None) or tool.dict  # pydantic v2 / v1
+    return dump()
+
+
+@dataclass
+class SpecFileState:
+    """What one spec file contributed to a registry, and the stat it was loaded from."""
+    path: str
+    spec_name: str
+    size: int
+    mtime_ns: int
+    spec: Dict[str, Any]
+    declared_base_url: str
+    tools: List[APITool] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ToolRegistry:
+    """Immutable snapshot of loaded specs and tools.
+
+    Reloads build a new registry off to the side and publish it by swapping the
+    server's reference, so readers never lock and never observe a partial state.
+    Readers that need several lookups should grab `server.registry` once.
+    """
+    specs: Dict[str, APISpec]
+    tools: Dict[str, APITool]
+    index: ToolIndex
+    files: Dict[str, SpecFileState]
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    @classmethod
+    def empty(cls) -> "ToolRegistry":
+        return cls(specs={}, tools={}, index=ToolIndex({}), files={})
 
 
 class OpenAPIMCPServer:
     def __init__(self, openapi_dir: str = "./openapi_specs"):
-        self.mcp = FastMCP(name="OpenAPI MCP Server")
+        # reloads re-register changed tools under the same name
+        self.mcp = FastMCP(name="OpenAPI MCP Server", on_duplicate_tools="replace")
         self.openapi_dir = openapi_dir
-        self.api_specs: Dict[str, APISpec] = {}
-        self.api_tools: Dict[str, APITool] = {}
-        self.sessions: Dict[str, requests.Session] = {}
+        self.registry = ToolRegistry.empty()
+        self._reload_lock = threading.Lock()  # serializes writers only
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        # Called with the reload summary after every registry swap (e.g. to drop cached LLM plans)
+        self.on_reload: List[Callable[[Dict[str, Any]], None]] = []
+        # Per-spec connection pools live outside the registry so they survive reloads. They are
+        # swapped on the serving event loop (bind_loop); replaced pools close once drained.
+        self.pools: Dict[str, UpstreamPool] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pool_retire_grace = float(os.getenv("POOL_RETIRE_GRACE", "30"))
+        # Per-spec/per-operation circuit breakers and adaptive timeouts; CIRCUIT_BREAKER=0 disables
+        self.breakers: Optional[BreakerRegistry] = BreakerRegistry() if os.getenv("CIRCUIT_BREAKER", "1") != "0" else None
+        # SPEC_CACHE=0 disables the compiled-spec cache
+        cache_file = os.getenv("SPEC_CACHE_FILE", ".spec_cache.pkl") if os.getenv("SPEC_CACHE", "1") != "0" else None
+        self.spec_cache = SpecCache(cache_file)
+        # GET response cache; RESPONSE_CACHE=0 disables it. RESPONSE_CACHE_TTL is the default
+        # TTL for tools without x-cache-ttl (unset: only cache what upstream marks max-age)
+        self.response_cache: Optional[ResponseCache] = None
+        if os.getenv("RESPONSE_CACHE", "1") != "0":
+            self.response_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")))
+        default_ttl = os.getenv("RESPONSE_CACHE_TTL")
+        self.default_cache_ttl: Optional[float] = float(default_ttl) if default_ttl else None
+        # Concurrent identical calls share one upstream request for these methods ("" disables)
+        self.singleflight = SingleFlight()
+        self.pagination_limits = {
+            "max_records": int(os.getenv("PAGINATION_MAX_RECORDS", "10000")),
+            "max_bytes":   int(os.getenv("PAGINATION_MAX_BYTES", str(16 * 1024 * 1024))),
+            "max_pages":   int(os.getenv("PAGINATION_MAX_PAGES", "100")),
+        }
+        # Arguments are checked against the spec before going upstream; ARG_VALIDATION=0 disables
+        self.validate_arguments = os.getenv("ARG_VALIDATION", "1") != "0"
+        self.rejected_calls: Dict[str, int] = {}
+        self._rejected_lock = threading.Lock()
+        self.singleflight_methods = {m.strip().upper() for m in os.getenv("SINGLEFLIGHT_METHODS", "GET").split(",") if m.strip()}
+        # Session tokens per (spec, principal); the spec's active principal's token is in its pool cookies
+        self.tokens = TokenManager.from_env(on_token=self._apply_token)
+        self.active_principals: Dict[str, str] = {}
+        # Worker processes start from the parent's compiled registry (see --workers)
+        self._snapshot = load_snapshot(os.getenv(SNAPSHOT_ENV))
 
         os.makedirs(self.openapi_dir, exist_ok=True)
 
@@ -65,19 +206,22 @@ class OpenAPIMCPServer:
         self._register_core_tools()
 
         # Auto-load specs
-        self._auto_load_openapi_specs()
+        self.reload_specs()
 
-    # ---------------------- LOGIN / SESSION ----------------------
-    def _save_token(self, token: str):
-        with open("token_cache.txt", "w") as f:
-            f.write(token)
-
-    def _load_token(self) -> Optional[str]:
-        if os.path.exists("token_cache.txt"):
-            with open("token_cache.txt", "r") as f:
-                return f.read().strip()
-        return None
+    # Read-only views of the current registry snapshot
+    @property
+    def api_specs(self) -> Dict[str, APISpec]:
+        return self.registry.specs
+
+    @property
+    def api_tools(self) -> Dict[str, APITool]:
+        return self.registry.tools
 
+    @property
+    def tool_index(self) -> ToolIndex:
+        return self.registry.index
+
+    # ---------------------- LOGIN / SESSION ----------------------
     def _get_basic_auth_header(self, username: str, password: str):
         credentials = f"{username}:{password}"
         encoded = base64.b64encode(credentials.encode()).decode()
@@ -86,47 +230,78 @@ class OpenAPIMCPServer:
     def login_and_get_session(self, spec_name: str, username: str, password: str,
                               api_key_name: Optional[str] = None,
                               api_key_value: Optional[str] = None) -> requests.Session:
-        spec = self.api_specs[spec_name]
-        session = requests.Session()
-
-        cached_token = self._load_token()
-        if cached_token:
-            logger.info("Using cached JSESSIONID...")
-            session.cookies.set("JSESSIONID", cached_token)
-            self.sessions[spec_name] = session
-            return session
+        """Log in as `username` (reusing a valid held token) and make it the spec's session."""
+        session = self._pool(spec_name).session
+        self.active_principals[spec_name] = username
+        token = self.tokens.acquire(
+            spec_name, username,
+            lambda: self._perform_login(spec_name, username, password, api_key_name, api_key_value))
+        logger.info("Session for %s as %s (expires_at=%s)", spec_name, username, token.expires_at)
+        return session
 
+    def _perform_login(self, spec_name: str, username: str, password: str,
+                       api_key_name: Optional[str] = None,
+                       api_key_value: Optional[str] = None):
+        """Basic Auth login on a throwaway session; returns (JSESSIONID, expires_at or None)."""
+        spec = self.api_specs[spec_name]
         login_url = os.getenv("LOGIN_URL", spec.base_url + "/login")
         logger.info(f"Performing Basic Auth login to {login_url}")
 
-        # Preflight
-        preflight_resp = session.get(login_url, verify=False)
-        preflight_resp.raise_for_status()
-
-        headers = {
-            "Authorization": self._get_basic_auth_header(username, password),
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        if api_key_name and api_key_value:
-            headers[api_key_name] = api_key_value
-
-        resp = session.post(login_url, headers=headers, cookies=session.cookies, verify=False)
-        resp.raise_for_status()
-
-        token = None
-        if "set-cookie" in resp.headers:
-            match = re.search(r'JSESSIONID=([^;]+)', resp.headers["set-cookie"])
-            if match:
-                token = match.group(1)
-
-        if not token:
+        with requests.Session() as session:
+            session.verify = False
+            # Preflight
+            preflight_resp = session.get(login_url)
+            preflight_resp.raise_for_status()
+
+            headers = {
+                "Authorization": self._get_basic_auth_header(username, password),
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            }
+            if api_key_name and api_key_value:
+                headers[api_key_name] = api_key_value
+
+            resp = session.post(login_url, headers=headers)
+            resp.raise_for_status()
+
+        cookie = next((c for c in resp.cookies if c.name == "JSESSIONID"), None)
+        if cookie is not None:
+            return cookie.value, (float(cookie.expires) if cookie.expires else None)
+        match = re.search(r'JSESSIONID=([^;]+)', resp.headers.get("set-cookie", ""))
+        if not match:
             raise RuntimeError("No JSESSIONID found in login response.")
+        return match.group(1), None
 
-        self._save_token(token)
-        logger.info(f"JSESSIONID obtained: {token}")
-        self.sessions[spec_name] = session
-        return session
+    def _apply_token(self, token: Token):
+        """Put a (re)issued token into the spec's pool cookies if its principal is active."""
+        if self.active_principals.get(token.spec_name) != token.principal:
+            return
+        pool = self._pool(token.spec_name)
+        pool.session.cookies.set("JSESSIONID", token.value)
+        logger.info("JSESSIONID updated for %s as %s", token.spec_name, token.principal)
+
+    def _session_token(self, spec_name: str) -> Optional[Token]:
+        principal = self.active_principals.get(spec_name)
+        if principal is not None:
+            return self.tokens.current(spec_name, principal)
+        if self.tokens.store_file:
+            # another worker logged in: use its session from the shared token store
+            shared = self.tokens.latest(spec_name)
+            if shared is None:
+                return None
+            self.active_principals[spec_name] = shared.principal
+            self._apply_token(shared)
+            return shared
+        return None
+
+    def _relogin(self, spec_name: str, sent: Optional[Token]) -> bool:
+        """After a 401: coalesced re-login for the token that was sent; True if a new one is in place."""
+        principal = sent.principal if sent is not None else self.active_principals.get(spec_name)
+        if principal is None:
+            return False
+        stale = sent.value if sent is not None else None
+        fresh = self.tokens.relogin(spec_name, principal, stale)
+        return fresh is not None and fresh.value != stale
 
     # ---------------------- SPEC LOADING ----------------------
     def _validate_openapi_spec(self, spec: dict):
@@ -144,116 +319,695 @@ class OpenAPIMCPServer:
             return f"{scheme}://{spec['host']}{base_path}"
         return "http://localhost:8080"
 
-    def _auto_load_openapi_specs(self):
-        logger.info("Scanning for OpenAPI specs in %s", self.openapi_dir)
-        patterns = ["*.yaml", "*.yml", "*.json"]
-        openapi_files = []
-        for pattern in patterns:
-            openapi_files.extend(glob.glob(os.path.join(self.openapi_dir, pattern)))
-            openapi_files.extend(glob.glob(os.path.join(self.openapi_dir, "**", pattern), recursive=True))
-
-        if not openapi_files:
-            logger.warning("No OpenAPI files found.")
-            return
+    def _resolve_base_url(self, spec_name: str, base_url: str) -> str:
+        # Allow environment variable override for local mock usage.
+        # FORCE_BASE_URL overrides all specs. FORCE_BASE_URL_<SPECNAME_UPPER> overrides by spec.
+        override_global = os.getenv("FORCE_BASE_URL")
+        override_spec = os.getenv(f"FORCE_BASE_URL_{spec_name.upper()}")
+        mock_all = os.getenv("MOCK_ALL")
+        mock_base = os.getenv("MOCK_API_BASE_URL", "http://localhost:9001").rstrip('/')
+        if override_spec:
+            base_url = override_spec.rstrip('/'); logger.warning("Overriding base_url for %s -> %s", spec_name, base_url)
+        elif override_global:
+            base_url = override_global.rstrip('/'); logger.warning("Overriding base_url (global) for %s -> %s", spec_name, base_url)
+        elif mock_all:
+            base_url = mock_base; logger.warning("MOCK_ALL active: base_url for %s -> %s", spec_name, base_url)
+        return base_url.rstrip('/')
+
+    def _discover_spec_files(self) -> List[str]:
+        """Every spec file under openapi_dir exactly once, in a stable order."""
+        found = set()
+        for pattern in ("*.yaml", "*.yml", "*.json"):
+            # '**' with recursive=True also matches the top level
+            for file_path in glob.glob(os.path.join(self.openapi_dir, "**", pattern), recursive=True):
+                found.add(os.path.realpath(file_path))
+        return sorted(found)
+
+    def _compile_spec_file(self, sf: SpecFile) -> Dict[str, Any]:
+        """Parse a spec file and compile its tools into cacheable plain data."""
+        text = SpecCache.read(sf).decode("utf-8")
+        spec = json.loads(text) if sf.path.endswith(".json") else yaml.safe_load(text)
+        # self._validate_openapi_spec(spec)
+        spec_name = Path(sf.path).stem
+        probe = APISpec(name=spec_name, spec=spec, base_url=self._extract_base_url(spec), file_path=sf.path)
+        tools = self._compile_spec_tools(probe)
+        return {"spec": spec, "base_url": probe.base_url, "tools": [_tool_to_dict(t) for t in tools]}
+
+    def reload_specs(self) -> Dict[str, Any]:
+        """Diff the spec directory against the live registry and publish the result.
+
+        Unchanged files keep their compiled tools (and FastMCP registrations); new or
+        modified files go through the spec cache / compiler. A file that fails to parse
+        keeps serving its previous version. The new registry is published with a single
+        reference swap; pools (and their login cookies) survive for every spec that is still present.
+        """
+        with self._reload_lock:
+            logger.info("Scanning for OpenAPI specs in %s", self.openapi_dir)
+            started = time.perf_counter()
+            old = self.registry
+            openapi_files = self._discover_spec_files()
+            if not openapi_files:
+                logger.warning("No OpenAPI files found.")
+
+            states: Dict[str, SpecFileState] = {}
+            tools: Dict[str, APITool] = {}
+            pending = []
+            # pass 1: reuse unchanged files so they keep their tool names
+            for file_path in openapi_files:
+                try:
+                    sf = self.spec_cache.stat(file_path)
+                except OSError as e:
+                    logger.error("Failed to stat '%s': %s", file_path, e)
+                    continue
+                prev = old.files.get(sf.path)
+                if prev and prev.size == sf.size and prev.mtime_ns == sf.mtime_ns:
+                    states[sf.path] = prev
+                    tools.update((t.name, t) for t in prev.tools)
+                else:
+                    pending.append((sf, prev))
 
-        for file_path in openapi_files:
+            # pass 2: compile (or fetch from the on-disk cache) new and modified files
+            fresh: List[APITool] = []
+            cached = parsed = snapshotted = 0
+            snapshot, self._snapshot = self._snapshot, {}  # only the first load uses it
+            for sf, prev in pending:
+                try:
+                    snap = snapshot.get(sf.path)
+                    if snap and snap["size"] == sf.size and snap["mtime_ns"] == sf.mtime_ns:
+                        payload = snap["payload"]
+                        snapshotted += 1
+                    else:
+                        payload = self.spec_cache.get(sf)
+                        if payload is None:
+                            payload = self._compile_spec_file(sf)
+                            self.spec_cache.put(sf, payload)
+                            parsed += 1
+                        else:
+                            cached += 1
+                    spec_name = Path(sf.path).stem
+                    file_tools = [self._add_tool(tools, APITool(**data)) for data in payload["tools"]]
+                    fresh.extend(file_tools)
+                    states[sf.path] = SpecFileState(
+                        path=sf.path, spec_name=spec_name, size=sf.size, mtime_ns=sf.mtime_ns,
+                        spec=payload["spec"], declared_base_url=payload["base_url"], tools=file_tools)
+                    logger.info("Loaded spec %s (%d tools)", spec_name, len(file_tools))
+                except Exception as e:
+                    logger.error("Failed to load '%s': %s", sf.path, e)
+                    if prev:
+                        logger.warning("Keeping previous version of %s", prev.spec_name)
+                        states[sf.path] = prev
+                        for t in prev.tools:
+                            tools.setdefault(t.name, t)
+
+            specs: Dict[str, APISpec] = {}
+            for state in states.values():
+                specs[state.spec_name] = APISpec(
+                    name=state.spec_name, spec=state.spec, file_path=state.path,
+                    base_url=self._resolve_base_url(state.spec_name, state.declared_base_url))
+
+            new_registry = ToolRegistry(specs=specs, tools=tools, index=ToolIndex(tools), files=states)
+            for tool in fresh:
+                self._register_mcp_runner(tool)
+            self.registry = new_registry  # publish
+            for name in old.tools.keys() - tools.keys():
+                self._unregister_mcp_runner(name)
+                if self.breakers:
+                    self.breakers.forget(name)
+            self._sync_pools(specs)
+
+            self.spec_cache.save(openapi_files)
+            if new_registry.index.ambiguous:
+                logger.debug("Ambiguous tool aliases (first wins): %s", new_registry.index.ambiguous)
+            old_paths, new_paths = set(old.files), set(states)
+            summary = {
+                "added": sorted(states[p].spec_name for p in new_paths - old_paths),
+                "changed": sorted(states[p].spec_name for p in new_paths & old_paths if states[p] is not old.files[p]),
+                "removed": sorted(old.files[p].spec_name for p in old_paths - new_paths),
+                "unchanged": sum(1 for p in new_paths & old_paths if states[p] is old.files[p]),
+                "tools": len(tools),
+                "version": new_registry.version,
+            }
+            if self.response_cache is not None:
+                for spec_name in summary["changed"] + summary["removed"]:
+                    self.response_cache.invalidate_spec(spec_name)
+            for callback in list(self.on_reload):
+                try:
+                    callback(summary)
+                except Exception:
+                    logger.exception("on_reload callback failed")
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info("Spec load %s: %d files (%d reused, %d snapshot, %d cached, %d parsed), %d tools in %.1f ms",
+                        "warm" if parsed == 0 else "cold", len(openapi_files),
+                        len(states) - snapshotted - cached - parsed, snapshotted, cached, parsed, len(tools), elapsed_ms)
+            logger.debug("Registered tools: %s", list(tools.keys()))
+            return summary
+
+    def write_registry_snapshot(self, path: str):
+        """Write the current compiled registry for worker processes (see registry_snapshot)."""
+        entries = {
+            state.path: {
+                "size": state.size,
+                "mtime_ns": state.mtime_ns,
+                "payload": {"spec": state.spec, "base_url": state.declared_base_url,
+                            "tools": [_tool_to_dict(t) for t in state.tools]},
+            }
+            for state in self.registry.files.values()
+        }
+        write_snapshot(path, entries)
+        logger.info("Wrote registry snapshot %s (%d specs, %d tools)", path, len(entries), len(self.registry.tools))
+
+    def _add_tool(self, tools: Dict[str, APITool], tool: APITool) -> APITool:
+        """Give a freshly compiled tool a unique name in `tools` and compile its request plan."""
+        base_name = tool.name
+        i = 1
+        while tool.name in tools:
+            tool.name = f"{base_name}_{i}"
+            i += 1
+        tool._plan = compile_request_plan(tool)
+        tool._validator = compile_validator(tool.parameters)
+        tools[tool.name] = tool
+        return tool
+
+    # ---------------------- CONNECTION POOLS ----------------------
+    def _pool(self, spec_name: str) -> UpstreamPool:
+        pool = self.pools.get(spec_name)
+        if pool is None:
+            spec = self.registry.specs.get(spec_name)
+            pool = UpstreamPool(spec_name, PoolSettings.for_spec(spec_name, spec.spec if spec else None))
+            self.pools[spec_name] = pool
+        return pool
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """The event loop request coroutines run on; pool swaps from other threads go through it."""
+        self._loop = loop
+
+    def _sync_pools(self, specs: Dict[str, APISpec]):
+        """Apply _swap_pools on the serving loop (a reload may run on the spec-watcher thread)."""
+        loop = self._loop
+        if loop is not None and loop.is_running():
             try:
-                spec_name = Path(file_path).stem
-                with open(file_path, "r", encoding="utf-8") as f:
-                    spec = json.load(f) if file_path.endswith(".json") else yaml.safe_load(f)
-
-                # self._validate_openapi_spec(spec)
-                base_url = self._extract_base_url(spec)
-                # Allow environment variable override for local mock usage.
-                # FORCE_BASE_URL overrides all specs. FORCE_BASE_URL_<SPECNAME_UPPER> overrides by spec.
-                override_global = os.getenv("FORCE_BASE_URL")
-                override_spec = os.getenv(f"FORCE_BASE_URL_{spec_name.upper()}")
-                mock_all = os.getenv("MOCK_ALL")
-                mock_base = os.getenv("MOCK_API_BASE_URL", "http://localhost:9001").rstrip('/')
-                if override_spec:
-                    base_url = override_spec.rstrip('/'); logger.warning("Overriding base_url for %s -> %s", spec_name, base_url)
-                elif override_global:
-                    base_url = override_global.rstrip('/'); logger.warning("Overriding base_url (global) for %s -> %s", spec_name, base_url)
-                elif mock_all:
-                    base_url = mock_base; logger.warning("MOCK_ALL active: base_url for %s -> %s", spec_name, base_url)
-
-                api_spec = APISpec(name=spec_name, spec=spec, base_url=base_url, file_path=file_path)
-                self.api_specs[spec_name] = api_spec
-                self.sessions[spec_name] = requests.Session()
-
-                created = self._generate_tools_from_spec(api_spec)
-                logger.info("Loaded spec %s (%d tools)", spec_name, created)
-            except Exception as e:
-                logger.error("Failed to load '%s': %s", file_path, e)
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if not on_loop:
+                loop.call_soon_threadsafe(self._swap_pools, specs)
+                return
+        self._swap_pools(specs)
+
+    def _swap_pools(self, specs: Dict[str, APISpec]):
+        """Create pools for new specs, rebuild those whose settings changed, retire removed ones.
+
+        A replaced pool is closed only after the requests using it finish (POOL_RETIRE_GRACE).
+        """
+        retired: List[UpstreamPool] = []
+        for spec_name, spec in specs.items():
+            settings = PoolSettings.for_spec(spec_name, spec.spec)
+            pool = self.pools.get(spec_name)
+            if pool is None:
+                self.pools[spec_name] = UpstreamPool(spec_name, settings)
+            elif pool.settings != settings:
+                logger.info("Pool settings changed for %s; rebuilding", spec_name)
+                self.pools[spec_name] = pool.reconfigure(settings)
+                retired.append(pool)
+        for spec_name in set(self.pools) - specs.keys():
+            retired.append(self.pools.pop(spec_name))
+            self.tokens.forget(spec_name)
+            self.active_principals.pop(spec_name, None)
+        for pool in retired:
+            pool.retire(self.pool_retire_grace)
+
+    # ---------------------- SPEC WATCHER ----------------------
+    def _spec_dir_signature(self):
+        sig = []
+        for path in self._discover_spec_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            sig.append((path, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
 
-        logger.debug("Registered tools: %s", list(self.api_tools.keys()))
+    def start_spec_watcher(self, interval: float = 2.0):
+        """Poll openapi_dir and hot-reload changed specs (no-op if already running)."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watcher_stop.clear()
 
-    # ---------------------- TOOL REGISTRATION ----------------------
-    def execute_endpoint(self, endpoint_name: str, parameters: Dict[str, Any]):
-        if endpoint_name not in self.api_tools:
-            return {"status": "error", "message": f"Endpoint {endpoint_name} not found"}
-        tool = self.api_tools[endpoint_name]
-        spec = self.api_specs[tool.spec_name]
-        session = self.sessions[tool.spec_name]
+        def watch():
+            last = self._spec_dir_signature()
+            while not self._watcher_stop.wait(interval):
+                try:
+                    current = self._spec_dir_signature()
+                    if current != last:
+                        last = current
+                        summary = self.reload_specs()
+                        logger.info("Spec watcher reload: %s", summary)
+                except Exception as e:
+                    logger.warning("Spec watcher error: %s", e)
+
+        self._watcher = threading.Thread(target=watch, name="spec-watcher", daemon=True)
+        self._watcher.start()
+        logger.info("Watching %s for spec changes every %.1fs", self.openapi_dir, interval)
+
+    def stop_spec_watcher(self):
+        self._watcher_stop.set()
+
+    def resolve_tool(self, name: str) -> Optional[str]:
+        """Map an exact name, un-prefixed alias or operationId to a registered tool name."""
+        return self.tool_index.resolve(name)
+
+    # ---------------------- TOOL EXECUTION ----------------------
+    def _build_request(self, tool: APITool, spec: APISpec, parameters: Dict[str, Any]) -> BoundRequest:
+        """Bind call arguments onto the tool's precompiled request plan."""
+        return tool.request_plan.bind(spec.base_url, parameters)
+
+    def _connection_hint(self, url: str) -> Optional[str]:
+        if 'api.company.com' in url and not os.getenv('FORCE_BASE_URL'):
+            return "Set $env:FORCE_BASE_URL='http://localhost:9001' (PowerShell) before starting or set AUTO_MOCK_FALLBACK=1 for auto retry."
+        return None
 
-        url = f"{spec.base_url.rstrip('/')}{tool.path}"
-        query_params, header_params, body_data = {}, {}, {}
+    def _should_fallback(self, url: str) -> bool:
+        return bool(os.getenv('AUTO_MOCK_FALLBACK')) and 'api.company.com' in url
 
-        for name, value in parameters.items():
-            param_info = tool.parameters.get(name)
-            if not param_info:
-                continue
-            location = param_info.get("location")
-            if location == "path":
-                url = url.replace(f"{{{name}}}", str(value))
-            elif location == "query":
-                query_params[name] = value
-            elif location == "header":
-                header_params[name] = str(value)
-            elif location == "body":
-                body_data[name] = value
-
-        auto_mock = bool(os.getenv('AUTO_MOCK_FALLBACK'))
-        mock_base = os.getenv('MOCK_API_BASE_URL', 'http://localhost:9001').rstrip('/')
-        attempted_fallback = False
-        try:
-            logger.info("[API CALL] %s %s params=%s headers=%s bodyKeys=%s", tool.method, url, list(query_params.keys()), list(header_params.keys()), list(body_data.keys()))
-            resp = session.request(tool.method, url, params=query_params, headers=header_params,
-                                   json=body_data if body_data else None, verify=False, timeout=15)
-        except Exception as e:  # network / DNS / TLS
-            hint = None
-            if 'api.company.com' in url and not os.getenv('FORCE_BASE_URL'):
-                hint = "Set $env:FORCE_BASE_URL='http://localhost:9001' (PowerShell) before starting or set AUTO_MOCK_FALLBACK=1 for auto retry."
-            # Optional automatic fallback
-            if auto_mock and 'api.company.com' in url:
-                attempted_fallback = True
-                original = spec.base_url
-                spec.base_url = mock_base
-                new_url = f"{spec.base_url.rstrip('/')}{tool.path}"
-                try:
-                    logger.info("[API CALL:FALLBACK] %s %s", tool.method, new_url)
-                    resp = session.request(tool.method, new_url, params=query_params, headers=header_params,
-                                           json=body_data if body_data else None, verify=False, timeout=15)
-                except Exception as e2:
-                    return {"status": "error", "url": url, "message": f"Connection failed (and fallback failed): {e2}", "hint": hint}
-            else:
-                return {"status": "error", "url": url, "message": f"Connection failed: {e}", "hint": hint}
+    def _fallback_base_url(self) -> str:
+        # applied per request; the shared spec.base_url is never rewritten
+        return os.getenv('MOCK_API_BASE_URL', 'http://localhost:9001').rstrip('/')
 
+    def _upstream_error(self, req: BoundRequest, message: str, open_circuit: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Error result for a failed or rejected call, or None when the mock fallback should be tried."""
+        if self._should_fallback(req.url):
+            return None
+        result = {"status": "error", "url": req.url, "message": message, "hint": self._connection_hint(req.url)}
+        if open_circuit:
+            result["circuit"] = "open"
+        return result
+
+    # ---------------------- CIRCUIT BREAKERS ----------------------
+    def _admit(self, tool: APITool) -> Optional[str]:
+        """None if the call may go upstream, else the name of the open breaker."""
+        return self.breakers.admit(tool.spec_name, tool.name) if self.breakers else None
+
+    def _release(self, tool: APITool):
+        """An admitted call was abandoned before it could be recorded (cancellation)."""
+        if self.breakers:
+            self.breakers.release(tool.spec_name, tool.name)
+
+    def _record(self, tool: APITool, status_code: Optional[int], started: float):
+        """Account one upstream attempt (status_code None: connection error / timeout)."""
+        elapsed = time.perf_counter() - started
+        UPSTREAM_LATENCY.observe(elapsed, spec=tool.spec_name, operation=tool.name)
+        UPSTREAM_RESPONSES.inc(spec=tool.spec_name, status=status_code or "error")
+        if self.breakers:
+            ok = status_code is not None and status_code < 500
+            self.breakers.record(tool.spec_name, tool.name, ok, elapsed)
+
+    def _read_timeout(self, tool: APITool, pool: UpstreamPool) -> float:
+        configured = pool.settings.read_timeout
+        return self.breakers.timeout_for(tool.name, configured) if self.breakers else configured
+
+    def _format_response(self, resp, fallback_base: Optional[str] = None) -> Dict[str, Any]:
+        """Shape a requests/httpx response into the tool result dict."""
         try:
             data = resp.json()
         except Exception:
             data = {"text": resp.text}
-        result = {"status": "success", "url": resp.url, "status_code": resp.status_code, "response": data}
+        result = {"status": "success", "url": str(resp.url), "status_code": resp.status_code, "response": data}
+        next_link = (resp.links or {}).get("next")
+        if next_link and next_link.get("url"):
+            result["next_url"] = next_link["url"]  # Link: <...>; rel="next" (used by pagination)
         try:
             preview = data if isinstance(data, (str, list)) else (list(data.keys()) if isinstance(data, dict) else str(type(data)))
             logger.info("[API RESP] %s -> %s keys=%s", resp.url, resp.status_code, preview if isinstance(preview, list) else None)
         except Exception:
             pass
-        if attempted_fallback:
+        if fallback_base:
             result["note"] = "auto-mock-fallback"
-            result["base_url"] = spec.base_url
+            result["base_url"] = fallback_base
         return result
 
+    # ---------------------- RESPONSE CACHE ----------------------
+    @staticmethod
+    def _call_fingerprint(tool: APITool, parameters: Dict[str, Any]) -> str:
+        """Identity of a call: tool name plus the arguments the request plan actually binds."""
+        known = tool.request_plan.locations
+        return ResponseCache.make_key(tool.name, {k: v for k, v in parameters.items()
+                                                  if known.get(k, "projection") != "projection"})
+
+    def _cache_lookup(self, tool: APITool, parameters: Dict[str, Any]):
+        """Return (key, entry, fresh); key is None when the tool is not cacheable."""
+        if self.response_cache is None or tool.method != "GET" or tool.cache_ttl == 0:
+            return None, None, False
+        key = self._call_fingerprint(tool, parameters)
+        entry, fresh = self.response_cache.lookup(key)
+        return key, entry, fresh
+
+    @staticmethod
+    def _cached_result(entry: CacheEntry, state: str) -> Dict[str, Any]:
+        result = dict(entry.result)
+        result["cache"] = state
+        return result
+
+    def _cache_response(self, tool: APITool, key: Optional[str], entry: Optional[CacheEntry],
+                        resp, fallback_base: Optional[str] = None) -> Dict[str, Any]:
+        """Turn an upstream response into a result, updating the response cache on the way."""
+        cache = self.response_cache
+        configured = tool.cache_ttl if tool.cache_ttl is not None else self.default_cache_ttl
+        if entry is not None and resp.status_code == 304:
+            cache.revalidated(key, entry, upstream_ttl(configured, resp.headers) or 0.0)
+            return self._cached_result(entry, "revalidated")
+        result = self._format_response(resp, fallback_base)
+        if cache is None:
+            return result
+        if key is None:
+            # a successful write makes this spec's cached reads suspect
+            if tool.method != "GET" and 200 <= resp.status_code < 300:
+                cache.invalidate_spec(tool.spec_name)
+            return result
+        if entry is not None:
+            cache.revalidation_failed()
+        if resp.status_code != 200 or fallback_base:
+            return result
+        ttl = upstream_ttl(configured, resp.headers)
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if ttl is not None and (ttl > 0 or etag or last_modified):
+            cache.store(key, CacheEntry(spec_name=tool.spec_name, result=result,
+                                        expires_at=time.monotonic() + ttl,
+                                        etag=etag, last_modified=last_modified))
+        return result
+
+    # ---------------------- ARGUMENT VALIDATION ----------------------
+    def _validate(self, tool: APITool, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Error result when the arguments do not match the tool's spec, else None."""
+        if not self.validate_arguments:
+            return None
+        errors = tool.validator(parameters)
+        if not errors:
+            return None
+        ARGS_REJECTED.inc(tool=tool.name, spec=tool.spec_name)
+        with self._rejected_lock:
+            self.rejected_calls[tool.name] = self.rejected_calls.get(tool.name, 0) + 1
+        return {"status": "error", "error": "invalid_arguments", "tool": tool.name,
+                "message": "Invalid arguments: " + "; ".join(e["message"] for e in errors),
+                "errors": errors}
+
+    # ---------------------- PROJECTION ----------------------
+    @staticmethod
+    def _compile_projection(tool: APITool, parameters: Dict[str, Any]) -> Optional[Projection]:
+        """Compile the tool's select/where arguments (raises ProjectionError)."""
+        locations = tool.request_plan.locations
+        args = {k: parameters.get(k) for k in PROJECTION_PARAMS if locations.get(k) == "projection"}
+        return compile_projection(args.get("select"), args.get("where"))
+
+    @staticmethod
+    def _record_transform(projection: Projection):
+        """Per-record where/select for paginated streams (SKIP drops a record)."""
+        def transform(record):
+            if projection.apply_where(record) is None:
+                return SKIP
+            return projection.select_fn(record) if projection.select_fn is not None else record
+        return transform
+
+    @staticmethod
+    def _apply_projection(result: Dict[str, Any], projection: Optional[Projection]) -> Dict[str, Any]:
+        if projection is None or result.get("status") != "success":
+            return result
+        result = dict(result)  # may be a cached / shared result
+        result["response"] = projection.apply(result.get("response"))
+        result["projection"] = {"select": projection.select, "where": projection.where}
+        return result
+
+    @staticmethod
+    def _outcome(result: Dict[str, Any]) -> str:
+        if result.get("cache") == "hit":
+            return "cached"
+        if result.get("coalesced"):
+            return "coalesced"
+        return result.get("status") or "unknown"
+
+    def execute_endpoint(self, endpoint_name: str, parameters: Dict[str, Any]):
+        """Blocking execution path (used by the stdio FastMCP runners)."""
+        registry = self.registry  # one snapshot for the whole call
+        tool = registry.tools.get(endpoint_name)
+        if tool is None:
+            return {"status": "error", "message": f"Endpoint {endpoint_name} not found"}
+        invalid = self._validate(tool, parameters)
+        if invalid is not None:
+            return invalid
+        try:
+            projection = self._compile_projection(tool, parameters)
+        except ProjectionError as e:
+            return {"status": "error", "message": f"Invalid select/where expression: {e}"}
+        with TOOLS_IN_FLIGHT.track(spec=tool.spec_name), \
+                TOOL_LATENCY.time(tool=tool.name, spec=tool.spec_name, outcome="exception") as labels:
+            result = self._execute_sync(registry, tool, parameters)
+            labels["outcome"] = self._outcome(result)
+        return self._apply_projection(result, projection)
+
+    def _execute_sync(self, registry: ToolRegistry, tool: APITool, parameters: Dict[str, Any]):
+        spec = registry.specs[tool.spec_name]
+        key, entry, fresh = self._cache_lookup(tool, parameters)
+        if fresh:
+            return self._cached_result(entry, "hit")
+        pool = self._pool(tool.spec_name)
+
+        req = self._build_request(tool, spec, parameters)
+        if entry is not None:
+            req = req._replace(headers={**req.headers, **entry.validators()})
+        open_circuit = self._admit(tool)
+        if open_circuit is None:
+            timeout = pool.settings.requests_timeout(self._read_timeout(tool, pool))
+            started = time.perf_counter()
+            try:
+                logger.info("[API CALL] %s %s params=%s headers=%s bodyKeys=%s", req.method, req.url, list(req.params.keys()), list(req.headers.keys()), list(req.body_keys))
+                auth = self._session_token(tool.spec_name)
+                with pool.sync_slot():
+                    started = time.perf_counter()
+                    resp = pool.session.request(req.method, req.url, params=req.params, headers=req.headers,
+                                                data=req.body, timeout=timeout)
+                if resp.status_code == 401 and self._relogin(tool.spec_name, auth):
+                    logger.info("[API CALL:RETRY] %s %s after re-login", req.method, req.url)
+                    with pool.sync_slot():
+                        started = time.perf_counter()
+                        resp = pool.session.request(req.method, req.url, params=req.params, headers=req.headers,
+                                                    data=req.body, timeout=timeout)
+            except Exception as e:  # network / DNS / TLS / timeout
+                self._record(tool, None, started)
+                message = f"Connection failed: {e}"
+            else:
+                self._record(tool, resp.status_code, started)
+                return self._cache_response(tool, key, entry, resp)
+        else:
+            message = f"Circuit open for {open_circuit}; failing fast"
+        error = self._upstream_error(req, message, open_circuit)
+        if error is not None:
+            return error
+        # Optional automatic fallback, scoped to this request
+        fallback_base = self._fallback_base_url()
+        fb = tool.request_plan.bind(fallback_base, parameters)
+        try:
+            logger.info("[API CALL:FALLBACK] %s %s", fb.method, fb.url)
+            with pool.sync_slot():
+                resp = pool.session.request(fb.method, fb.url, params=fb.params, headers=fb.headers,
+                                            data=fb.body, timeout=pool.settings.requests_timeout())
+        except Exception as e2:
+            return {"status": "error", "url": req.url, "message": f"{message} (and fallback failed: {e2})", "hint": self._connection_hint(req.url)}
+        return self._cache_response(tool, key, entry, resp, fallback_base)
+
+    async def execute_endpoint_async(self, endpoint_name: str, parameters: Dict[str, Any]):
+        """Non-blocking execution path used by the FastAPI routes.
+
+        Mirrors execute_endpoint but awaits a pooled httpx client, so a slow upstream
+        does not stall other requests on the event loop. Concurrent identical calls for
+        SINGLEFLIGHT_METHODS share one upstream request; select/where are applied per caller.
+        """
+        registry = self.registry  # one snapshot for the whole call
+        tool = registry.tools.get(endpoint_name)
+        if tool is None:
+            return {"status": "error", "message": f"Endpoint {endpoint_name} not found"}
+        invalid = self._validate(tool, parameters)
+        if invalid is not None:
+            return invalid
+        try:
+            projection = self._compile_projection(tool, parameters)
+        except ProjectionError as e:
+            return {"status": "error", "message": f"Invalid select/where expression: {e}"}
+        with TOOLS_IN_FLIGHT.track(spec=tool.spec_name), \
+                TOOL_LATENCY.time(tool=tool.name, spec=tool.spec_name, outcome="exception") as labels:
+            if tool.method not in self.singleflight_methods:
+                result = await self._execute_async(registry, tool, parameters)
+            else:
+                result, shared = await self.singleflight.do(
+                    self._call_fingerprint(tool, parameters), lambda: self._execute_async(registry, tool, parameters))
+                if shared:
+                    result = dict(result)
+                    result["coalesced"] = True
+            labels["outcome"] = self._outcome(result)
+        return self._apply_projection(result, projection)
+
+    async def _execute_async(self, registry: ToolRegistry, tool: APITool, parameters: Dict[str, Any]):
+        spec = registry.specs[tool.spec_name]
+        key, entry, fresh = self._cache_lookup(tool, parameters)
+        if fresh:
+            return self._cached_result(entry, "hit")
+        pool = self._pool(tool.spec_name)
+        auth = self._session_token(tool.spec_name)  # before client(): it copies the session cookies
+        client = pool.client()
+
+        req = self._build_request(tool, spec, parameters)
+        if entry is not None:
+            req = req._replace(headers={**req.headers, **entry.validators()})
+        open_circuit = self._admit(tool)
+        if open_circuit is None:
+            timeout = pool.settings.httpx_timeout(self._read_timeout(tool, pool))
+            started = time.perf_counter()
+            try:
+                logger.info("[API CALL] %s %s params=%s headers=%s bodyKeys=%s", req.method, req.url, list(req.params.keys()), list(req.headers.keys()), list(req.body_keys))
+                async with pool.slot():
+                    started = time.perf_counter()
+                    resp = await client.request(req.method, req.url, params=req.params, headers=req.headers,
+                                                content=req.body, timeout=timeout)
+                if resp.status_code == 401 and await asyncio.to_thread(self._relogin, tool.spec_name, auth):
+                    logger.info("[API CALL:RETRY] %s %s after re-login", req.method, req.url)
+                    client = pool.client()  # picks up the new session cookie
+                    async with pool.slot():
+                        started = time.perf_counter()
+                        resp = await client.request(req.method, req.url, params=req.params, headers=req.headers,
+                                                    content=req.body, timeout=timeout)
+            except Exception as e:  # network / DNS / TLS / timeout
+                self._record(tool, None, started)
+                message = f"Connection failed: {e}"
+            except BaseException:  # cancelled: no outcome, but a half-open probe must not leak
+                self._release(tool)
+                raise
+            else:
+                self._record(tool, resp.status_code, started)
+                return self._cache_response(tool, key, entry, resp)
+        else:
+            message = f"Circuit open for {open_circuit}; failing fast"
+        error = self._upstream_error(req, message, open_circuit)
+        if error is not None:
+            return error
+        fallback_base = self._fallback_base_url()
+        fb = tool.request_plan.bind(fallback_base, parameters)
+        try:
+            logger.info("[API CALL:FALLBACK] %s %s", fb.method, fb.url)
+            async with pool.slot():
+                resp = await client.request(fb.method, fb.url, params=fb.params, headers=fb.headers, content=fb.body)
+        except Exception as e2:
+            return {"status": "error", "url": req.url, "message": f"{message} (and fallback failed: {e2})", "hint": self._connection_hint(req.url)}
+        return self._cache_response(tool, key, entry, resp, fallback_base)
+
+    async def open_endpoint_stream(self, endpoint_name: str, parameters: Dict[str, Any]):
+        """Send a tool's request and return (UpstreamStream, None) as soon as headers arrive.
+
+        The body is forwarded undecoded in raw chunks, so memory stays flat for large
+        payloads. The pool slot and the connection are held until the body iterator is
+        exhausted or closed. Streaming bypasses the response cache, single-flight and the
+        mock fallback; on failure returns (None, error_result).
+        """
+        registry = self.registry
+        tool = registry.tools.get(endpoint_name)
+        if tool is None:
+            return None, {"status": "error", "message": f"Endpoint {endpoint_name} not found"}
+        invalid = self._validate(tool, parameters)
+        if invalid is not None:
+            return None, invalid
+        spec = registry.specs[tool.spec_name]
+        pool = self._pool(tool.spec_name)
+        auth = self._session_token(tool.spec_name)  # before client(): it copies the session cookies
+        client = pool.client()
+        req = self._build_request(tool, spec, parameters)
+        open_circuit = self._admit(tool)
+        if open_circuit is not None:
+            return None, {"status": "error", "url": req.url, "circuit": "open",
+                          "message": f"Circuit open for {open_circuit}; failing fast"}
+        timeout = pool.settings.httpx_timeout(self._read_timeout(tool, pool))
+
+        async def send(client):
+            """(exit stack holding the slot and the response, response, start time) once headers arrive."""
+            stack = AsyncExitStack()
+            try:
+                await stack.enter_async_context(pool.slot())
+                sent_at = time.perf_counter()
+                request = client.build_request(req.method, req.url, params=req.params, headers=req.headers,
+                                               content=req.body, timeout=timeout)
+                resp = await client.send(request, stream=True)
+            except BaseException:
+                await stack.aclose()
+                raise
+            stack.push_async_callback(resp.aclose)
+            return stack, resp, sent_at
+
+        started = time.perf_counter()
+        try:
+            logger.info("[API CALL:STREAM] %s %s params=%s", req.method, req.url, list(req.params.keys()))
+            stack, resp, started = await send(client)
+            if resp.status_code == 401 and (auth is not None or tool.spec_name in self.active_principals):
+                # only headers were read: drop the rejected response (and its slot) while logging in
+                await stack.aclose()
+                await asyncio.to_thread(self._relogin, tool.spec_name, auth)
+                logger.info("[API CALL:STREAM:RETRY] %s %s after re-login", req.method, req.url)
+                client = pool.client()  # picks up the new session cookie
+                stack, resp, started = await send(client)  # once; a failed login gets the upstream 401 again
+        except Exception as e:  # network / DNS / TLS / timeout
+            self._record(tool, None, started)
+            return None, {"status": "error", "url": req.url, "message": f"Connection failed: {e}",
+                          "hint": self._connection_hint(req.url)}
+        except BaseException:  # cancelled while waiting for a slot or headers
+            self._release(tool)
+            raise
+        self._record(tool, resp.status_code, started)  # time to headers
+
+        async def body():
+            try:
+                async for chunk in resp.aiter_raw():
+                    yield chunk
+            finally:
+                await stack.aclose()
+
+        return UpstreamStream(tool.name, resp.status_code, str(resp.url), dict(resp.headers), body()), None
+
+    def iterate_pages(self, endpoint_name: str, parameters: Dict[str, Any], max_records: Optional[int] = None,
+                      max_bytes: Optional[int] = None, max_pages: Optional[int] = None,
+                      page_size: Optional[int] = None):
+        """NDJSON record iterator over every page of a paginated tool call.
+
+        Returns (tool, iterator, None) or (None, None, error_result). Pages go through
+        execute_endpoint_async (cache, breakers, fallback); `where` filters and `select`
+        projects each record rather than each page.
+        """
+        tool = self.registry.tools.get(endpoint_name)
+        if tool is None:
+            return None, None, {"status": "error", "message": f"Endpoint {endpoint_name} not found"}
+        if tool.pagination is None:
+            return None, None, {"status": "error", "message": f"{endpoint_name} is not paginated"}
+        invalid = self._validate(tool, parameters)
+        if invalid is not None:
+            return None, None, invalid
+        try:
+            projection = self._compile_projection(tool, parameters)
+        except ProjectionError as e:
+            return None, None, {"status": "error", "message": f"Invalid select/where expression: {e}"}
+        locations = tool.request_plan.locations
+        args = {k: v for k, v in parameters.items() if locations.get(k) != "projection"}
+
+        transform = self._record_transform(projection) if projection is not None else None
+        records = iterate_records(
+            lambda page_args: self.execute_endpoint_async(tool.name, page_args),
+            tool.pagination, args,
+            max_records=max_records or self.pagination_limits["max_records"],
+            max_bytes=max_bytes or self.pagination_limits["max_bytes"],
+            max_pages=max_pages or self.pagination_limits["max_pages"],
+            page_size=page_size, query_params=tool.request_plan.query_keys, transform=transform)
+        return tool, records, None
+
+    async def aclose(self):
+        """Close upstream pools (called on FastAPI shutdown)."""
+        for pool in list(self.pools.values()):
+            await pool.aclose()
+        self.pools.clear()
+
+    # ---------------------- TOOL REGISTRATION ----------------------
     def _register_core_tools(self):
         # internal reusable login logic (not decorated) so HTTP route can call real callable
         def _core_login(username: str, password: str, spec_name: Optional[str] = None,
@@ -282,27 +1036,33 @@ class OpenAPIMCPServer:
                 }
 
         self._core_login = _core_login  # store reference
+        self.core_tools: Dict[str, Any] = {}
+
+        def core_tool(description: str):
+            """Register with FastMCP and keep the plain callable for the HTTP routes."""
+            def register(fn):
+                self.mcp.tool(description=description)(fn)
+                self.core_tools[fn.__name__] = fn
+                return fn
+            return register
 
-        @self.mcp.tool(description="Log in and store configuration for API calls.")
+        @core_tool("Log in and store configuration for API calls.")
         def login(username: str, password: str, spec_name: Optional[str] = None,
                   api_key_name: Optional[str] = None, api_key_value: Optional[str] = None):
             return _core_login(username, password, spec_name, api_key_name, api_key_value)
 
-        @self.mcp.tool(description="Reload OpenAPI specifications from disk.")
+        @core_tool("Reload OpenAPI specifications from disk.")
         def reload_openapi_specs():
-            self.api_specs.clear()
-            self.api_tools.clear()
-            self.sessions.clear()
-            self._auto_load_openapi_specs()
-            return {"status": "success", "message": "Reloaded specs"}
+            summary = self.reload_specs()
+            return {"status": "success", "message": "Reloaded specs", **summary}
 
-        @self.mcp.tool(description="List loaded OpenAPI spec names.")
+        @core_tool("List loaded OpenAPI spec names.")
         def list_loaded_specs():
             return {"status": "success", "specs": [
                 {"name": spec.name, "base_url": spec.base_url} for spec in self.api_specs.values()
             ]}
 
-        @self.mcp.tool(description="List all generated API endpoint tools.")
+        @core_tool("List all generated API endpoint tools.")
         def list_api_endpoints():
             # group by spec prefix
             grouped: Dict[str, list] = {}
@@ -311,10 +1071,16 @@ class OpenAPIMCPServer:
             return {"status": "success", "count": len(self.api_tools), "grouped": grouped}
 
 
-    def _generate_tools_from_spec(self, api_spec: APISpec) -> int:
+    def _compile_spec_tools(self, api_spec: APISpec) -> List[APITool]:
+        """Build APITool definitions for one spec without touching the registry."""
         spec = api_spec.spec
-        tools_created = 0
+        tools: List[APITool] = []
+        names = set()
+        spec_ttl = spec.get("x-cache-ttl", (spec.get("info") or {}).get("x-cache-ttl"))
+        refs = RefResolver(spec)
         for path, methods in spec.get("paths", {}).items():
+            methods = refs.deref(methods) or {}
+            path_params = [refs.deref(p) for p in methods.get("parameters") or ()]
             for method, details in methods.items():
                 if method.lower() not in ("get", "post", "put", "delete", "patch"):
                     continue
@@ -330,43 +1096,65 @@ class OpenAPIMCPServer:
 
                 base_name = tool_name
                 i = 1
-                while tool_name in self.api_tools:
+                while tool_name in names:
                     tool_name = f"{base_name}_{i}"
                     i += 1
+                names.add(tool_name)
 
                 summary     = details.get("summary", "")
                 description = details.get("description", "")
                 tags        = details.get("tags", [])
                 full_desc   = (summary + " - " + description).strip(" - ") or f"{method.upper()} {path}"
 
-                parameters: Dict[str, Any] = {}
+                # path-level parameters apply to every operation; the operation overrides by (name, in)
+                declared = {(p.get("name"), p.get("in")): p for p in path_params}
                 for param in details.get("parameters", []):
+                    param = refs.deref(param)
+                    declared[(param.get("name"), param.get("in"))] = param
+
+                parameters: Dict[str, Any] = {}
+                body_schema: Dict[str, Any] = {}
+                for param in declared.values():
                     pname  = param.get("name")
-                    schema = param.get("schema", {}) or {}
+                    schema = refs.flatten(param.get("schema") or {})
                     if not pname:
                         continue
+                    if param.get("in") == "body":  # Swagger 2 body parameter
+                        body_schema = schema
+                        continue
                     parameters[pname] = {
-                        "type":        schema.get("type", "string"),
+                        "type":        schema.get("type", param.get("type", "string")),
                         "description": param.get("description", ""),
                         "required":    param.get("required", False),
-                        "location":    param.get("in", "query")
+                        "location":    param.get("in", "query"),
+                        **{k: schema[k] for k in CONSTRAINT_KEYS if k in schema}
                     }
 
                 if "requestBody" in details:
-                    rb      = details["requestBody"]
+                    rb      = refs.deref(details["requestBody"]) or {}
                     content = rb.get("content", {})
                     if "application/json" in content:
-                        schema = content["application/json"].get("schema", {}) or {}
-                        if schema.get("type") == "object" and "properties" in schema:
-                            for prop, prop_schema in schema["properties"].items():
-                                parameters[prop] = {
-                                    "type":        prop_schema.get("type", "string"),
-                                    "description": prop_schema.get("description", ""),
-                                    "required":    prop in schema.get("required", []),
-                                    "location":    "body"
-                                }
-
-                self.api_tools[tool_name] = APITool(
+                        body_schema = refs.flatten(content["application/json"].get("schema") or {})
+                if body_schema.get("type") == "object" and "properties" in body_schema:
+                    for prop, prop_schema in body_schema["properties"].items():
+                        prop_schema = prop_schema or {}
+                        parameters[prop] = {
+                            "type":        prop_schema.get("type", "string"),
+                            "description": prop_schema.get("description", ""),
+                            "required":    prop in body_schema.get("required", []),
+                            "location":    "body",
+                            **{k: prop_schema[k] for k in CONSTRAINT_KEYS if k in prop_schema}
+                        }
+
+                for reserved, reserved_desc in PROJECTION_PARAMS.items():
+                    parameters.setdefault(reserved, {
+                        "type":        "string",
+                        "description": reserved_desc,
+                        "required":    False,
+                        "location":    "projection"
+                    })
+
+                tool = APITool(
                     name        = tool_name,
                     description = full_desc,
                     method      = method.upper(),
@@ -375,24 +1163,37 @@ class OpenAPIMCPServer:
                     tags        = tags,
                     summary     = summary,
                     operation_id= operation_id,
+                    cache_ttl   = details.get("x-cache-ttl", spec_ttl),
+                    pagination  = detect_pagination(method, details, parameters, refs.flatten),
                     spec_name   = api_spec.name
                 )
+                tools.append(tool)
+        logger.debug("Resolved $refs for %s: %s", api_spec.name, refs.stats())
+        return tools
+
+    def _register_mcp_runner(self, tool: APITool):
+        """Expose a tool through FastMCP; the runner resolves the tool at call time."""
+        def make_runner(name: str, param_names: list):
+            def runner(**kwargs):
+                return self.execute_endpoint(name, kwargs)
+            sig_params = [Parameter(p, kind=Parameter.POSITIONAL_OR_KEYWORD) for p in param_names]
+            runner.__signature__ = Signature(sig_params)
+            runner.__name__ = f"{name}_runner"
+            return runner
+
+        runner_fn = make_runner(tool.name, list(tool.parameters.keys()))
+        self.mcp.tool(name=tool.name, description=tool.summary or tool.description)(runner_fn)
+
+    def _unregister_mcp_runner(self, name: str):
+        try:
+            self.mcp.remove_tool(name)
+        except Exception:
+            pass
 
-                def make_runner(name: str, param_names: list):
-                    def runner(**kwargs):
-                        return self.execute_endpoint(name, kwargs)
-                    sig_params = [Parameter(p, kind=Parameter.POSITIONAL_OR_KEYWORD) for p in param_names]
-                    runner.__signature__ = Signature(sig_params)
-                    runner.__name__ = f"{name}_runner"
-                    return runner
-
-                runner_fn = make_runner(tool_name, list(parameters.keys()))
-                self.mcp.tool(name=tool_name, description=summary or full_desc)(runner_fn)
-                tools_created += 1
-        return tools_created
-        
     def run(self, transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000):
         logger.info("Starting OpenAPI MCP Server")
+        if os.getenv("SPEC_WATCH"):
+            self.start_spec_watcher(float(os.getenv("SPEC_WATCH_INTERVAL", "2")))
         self.mcp.run(transport=transport)
 
 
@@ -403,16 +1204,81 @@ app = FastAPI(title="OpenAPI MCP Server")
 @app.middleware("http")
 async def access_log(request: Request, call_next):
     logger.info("HTTP %s %s", request.method, request.url.path)
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
     try:
         response = await call_next(request)
+        status = response.status_code
     except Exception as e:
         logger.exception("Request failed: %s %s -> %s", request.method, request.url.path, e)
         raise
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method,
+                             route=route_template(request), status=status)
     logger.info("HTTP %s %s -> %s", request.method, request.url.path, getattr(response, 'status_code', '?'))
     return response
 OPENAPI_DIR = os.getenv("OPENAPI_DIR", "./openapi_specs")
 server = OpenAPIMCPServer(openapi_dir=OPENAPI_DIR)
 
+
+
+
+def _server_metric_families():
+    """Scrape-time export of pool, cache, breaker and registry stats."""
+    pools = [p.stats() for p in list(server.pools.values())]
+    yield ("mcp_pool_in_flight", "gauge", "Upstream requests holding a pool slot",
+           [({"spec": p["spec"]}, p["in_flight"]) for p in pools])
+    yield ("mcp_pool_max_connections", "gauge", "Configured pool size",
+           [({"spec": p["spec"]}, p["settings"]["max_connections"]) for p in pools])
+    yield ("mcp_pool_requests_total", "counter", "Requests that acquired a pool slot",
+           [({"spec": p["spec"]}, p["requests"]) for p in pools])
+    yield ("mcp_pool_waited_total", "counter", "Slot acquisitions that had to queue",
+           [({"spec": p["spec"]}, p["waited"]) for p in pools])
+    yield ("mcp_pool_wait_seconds_total", "counter", "Time spent waiting for a pool slot",
+           [({"spec": p["spec"]}, p["wait_ms_total"] / 1000) for p in pools])
+    if server.response_cache is not None:
+        c = server.response_cache.stats()
+        yield ("mcp_response_cache_entries", "gauge", "Cached responses", [({}, c["entries"])])
+        for key in ("hits", "misses", "evictions", "revalidations"):
+            yield (f"mcp_response_cache_{key}_total", "counter", f"Response cache {key}", [({}, c[key])])
+    if server.breakers is not None:
+        states = {"closed": 0, "half_open": 1, "open": 2}
+        b = server.breakers.stats()
+        yield ("mcp_circuit_state", "gauge", "Circuit state (0 closed, 1 half-open, 2 open)",
+               [({"name": n}, states[v["state"]]) for n, v in b.items()])
+        yield ("mcp_circuit_rejected_total", "counter", "Calls rejected by an open circuit",
+               [({"name": n}, v["rejected"]) for n, v in b.items()])
+    sf = server.singleflight.stats()
+    yield ("mcp_singleflight_coalesced_total", "counter", "Calls that shared an in-flight request",
+           [({}, sf["coalesced"])])
+    yield ("mcp_singleflight_abandoned_total", "counter", "Shared calls cancelled after every caller went away",
+           [({}, sf["abandoned"])])
+    yield ("mcp_registered_tools", "gauge", "Tools in the live registry", [({}, len(server.api_tools))])
+
+
+REGISTRY.register_collector(_server_metric_families)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.on_event("startup")
+async def start_spec_watcher():
+    server.bind_loop(asyncio.get_running_loop())
+    # SPEC_WATCH=1 (or --watch) enables incremental hot reload of openapi_dir
+    if os.getenv("SPEC_WATCH"):
+        server.start_spec_watcher(float(os.getenv("SPEC_WATCH_INTERVAL", "2")))
+
+
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    server.stop_spec_watcher()
+    await server.aclose()
+
 # Optional LLM bridge router (safe if file absent)
 try:
     from llm_mcp_bridge import router as llm_router
@@ -426,8 +1292,14 @@ try:
 except Exception as _e:  # noqa
     logger.warning("LLM bridge not loaded: %s", _e)
 
+# /mcp/tools listing, rebuilt only when the tool index changes
+_tool_listing_cache: Dict[str, Any] = {"version": None, "tools": []}
+
 @app.get("/mcp/tools")
 async def list_tools():
+    version = server.tool_index.version
+    if _tool_listing_cache["version"] == version:
+        return {"tools": _tool_listing_cache["tools"]}
     tool_map = await server.mcp.get_tools()
     seen = set()
     tools = []
@@ -442,12 +1314,50 @@ async def list_tools():
             continue
         seen.add(base)
         tools.append({"name": name, "description": tool.description})
+    _tool_listing_cache.update(version=version, tools=tools)
     return {"tools": tools}
 
 @app.get("/mcp/endpoints")
 async def list_endpoints():
     return {"endpoints": list(server.api_tools.keys())}
 
+@app.get("/mcp/cache")
+async def response_cache_stats():
+    if server.response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "default_ttl": server.default_cache_ttl, **server.response_cache.stats()}
+
+@app.delete("/mcp/cache")
+async def clear_response_cache():
+    if server.response_cache is not None:
+        server.response_cache.clear()
+    return {"status": "success"}
+
+@app.get("/mcp/pools")
+async def pool_stats():
+    return {"pools": [pool.stats() for pool in server.pools.values()]}
+
+@app.get("/mcp/breakers")
+async def breaker_stats():
+    if server.breakers is None:
+        return {"enabled": False}
+    return {"enabled": True, "breakers": server.breakers.stats()}
+
+@app.get("/mcp/tokens")
+async def token_stats():
+    # expiry/refresh state only; token values and credentials are never returned
+    return {"active_principals": dict(server.active_principals), **server.tokens.stats()}
+
+@app.get("/mcp/validation")
+async def validation_stats():
+    with server._rejected_lock:
+        rejected = dict(server.rejected_calls)
+    return {"enabled": server.validate_arguments, "rejected": rejected, "total_rejected": sum(rejected.values())}
+
+@app.get("/mcp/singleflight")
+async def singleflight_stats():
+    return {"methods": sorted(server.singleflight_methods), **server.singleflight.stats()}
+
 @app.get("/mcp/prompts")
 async def mcp_prompts():
     """Return simple prompt templates a client can show for quick starts."""
@@ -470,24 +1380,18 @@ async def mcp_prompts():
 
 @app.get("/mcp/tool_meta/{tool_name}")
 async def tool_meta(tool_name: str):
-    # direct match
-    if tool_name in server.api_tools:
-        t = server.api_tools[tool_name]
-    else:
-        # suffix alias resolution
-        t = None
-        for name in server.api_tools.keys():
-            if name.endswith(f"_{tool_name}"):
-                t = server.api_tools[name]
-                break
-        if t is None:
-            raise HTTPException(status_code=404, detail="Tool not found")
+    # exact name, un-prefixed alias or operationId
+    resolved = server.resolve_tool(tool_name)
+    t = server.api_tools.get(resolved) if resolved else None
+    if t is None:
+        raise HTTPException(status_code=404, detail="Tool not found")
     return {
         "name": t.name,
         "description": t.description,
         "method": t.method,
         "path": t.path,
         "spec_name": t.spec_name,
+        "pagination": t.pagination.as_dict() if t.pagination else None,
         "parameters": [
             {
                 "name": pname,
@@ -496,10 +1400,44 @@ async def tool_meta(tool_name: str):
         ]
     }
 
+# upstream headers that still describe a raw (undecoded) body
+_STREAM_PASSTHROUGH_HEADERS = ("content-type", "content-encoding", "content-length", "content-disposition",
+                               "etag", "last-modified", "cache-control")
+
+
+async def _stream_tool(tool_name: str, args: Dict[str, Any]):
+    stream, error = await server.open_endpoint_stream(tool_name, args)
+    if stream is None:
+        return error
+    headers = {k: v for k, v in stream.headers.items() if k.lower() in _STREAM_PASSTHROUGH_HEADERS}
+    headers.update({"X-Upstream-Status": str(stream.status_code), "X-Upstream-URL": stream.url, "X-Tool": stream.tool})
+    logger.info("/mcp/tools stream <- %s code=%s", stream.tool, stream.status_code)
+    return StreamingResponse(stream.body, headers=headers, media_type=None)
+
+
+async def _paginate_tool(tool_name: str, args: Dict[str, Any], body: Dict[str, Any]):
+    def opt_int(key):
+        value = (body or {}).get(key)
+        return int(value) if value not in (None, "") else None
+    try:
+        caps = {k: opt_int(k) for k in ("max_records", "max_bytes", "max_pages", "page_size")}
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pagination limit: {e}")
+    tool, records, error = server.iterate_pages(tool_name, args, **caps)
+    if records is None:
+        return error
+    headers = {"X-Tool": tool.name, "X-Pagination-Style": tool.pagination.style}
+    return StreamingResponse(records, headers=headers, media_type="application/x-ndjson")
+
+
 @app.post("/mcp/tools/{tool_name}")
-async def call_tool(tool_name: str, body: dict):
+async def call_tool(tool_name: str, body: dict, stream: bool = False, paginate: bool = False):
     args = body.get("arguments", {}) if body else {}
-    logger.info("/mcp/tools call -> %s args=%s", tool_name, args)
+    # {"stream": true} (or ?stream=1) forwards the upstream body in chunks, metadata in X-Upstream-* headers
+    stream = stream or bool(body and body.get("stream"))
+    # {"paginate": true} (or ?paginate=1) streams every page's records as NDJSON
+    paginate = paginate or bool(body and body.get("paginate"))
+    logger.info("/mcp/tools call -> %s args=%s stream=%s", tool_name, args, stream)
     # explicit handling for core login tool via internal callable
     if tool_name == "login" and hasattr(server, "_core_login"):
         try:
@@ -508,36 +1446,123 @@ async def call_tool(tool_name: str, body: dict):
             raise HTTPException(status_code=400, detail=f"Argument error: {te}")
         return result if isinstance(result, dict) else {"result": result}
 
-    # direct dynamic tool name
-    if tool_name in server.api_tools:
-        result = server.execute_endpoint(tool_name, args)
-        logger.info("/mcp/tools result <- %s status=%s code=%s", tool_name, result.get('status'), result.get('status_code'))
-        return result
-
-    # allow alias without spec prefix e.g. 'get_banks' matching 'cash_api_get_banks'
-    dynamic_match = None
-    for name in server.api_tools.keys():
-        if name.endswith(f"_{tool_name}"):
-            dynamic_match = name
-            break
-    if dynamic_match:
-        result = server.execute_endpoint(dynamic_match, args)
-        logger.info("/mcp/tools result <- %s status=%s code=%s", dynamic_match, result.get('status'), result.get('status_code'))
+    # dynamic tool: exact name, alias without spec prefix (e.g. 'get_banks' -> 'cash_api_get_banks') or operationId
+    resolved = server.resolve_tool(tool_name)
+    if resolved and paginate:
+        return await _paginate_tool(resolved, args, body)
+    if resolved and stream:
+        return await _stream_tool(resolved, args)
+    if resolved:
+        result = await server.execute_endpoint_async(resolved, args)
+        logger.info("/mcp/tools result <- %s status=%s code=%s", resolved, result.get('status'), result.get('status_code'))
         return result
 
     # core MCP tool
-    if tool_name in server.mcp.tools:
-        tool_fn = server.mcp.tools[tool_name].callable  # FastMCP stores wrapper; .callable is underlying
+    core_fn = server.core_tools.get(tool_name)
+    if core_fn is not None:
         try:
-            result = tool_fn(**args)
+            result = core_fn(**args)
         except TypeError as te:
             raise HTTPException(status_code=400, detail=f"Argument error: {te}")
-    out = result if isinstance(result, dict) else {"result": result}
-    logger.info("/mcp/tools core result <- %s keys=%s", tool_name, list(out.keys()))
-    return out
+        out = result if isinstance(result, dict) else {"result": result}
+        logger.info("/mcp/tools core result <- %s keys=%s", tool_name, list(out.keys()))
+        return out
 
     raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found.")
 
+async def _dispatch_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one tool call for /mcp/batch; resolution mirrors POST /mcp/tools/{tool}."""
+    if tool_name == "login" and hasattr(server, "_core_login"):
+        return await asyncio.to_thread(server._core_login, **args)
+    resolved = server.resolve_tool(tool_name)
+    if resolved:
+        return await server.execute_endpoint_async(resolved, args)
+    core_fn = server.core_tools.get(tool_name)
+    if core_fn is not None:
+        result = await asyncio.to_thread(core_fn, **args)
+        return result if isinstance(result, dict) else {"result": result}
+    return {"status": "error", "message": f"Tool '{tool_name}' not found."}
+
+
+@app.post("/mcp/batch")
+async def batch_tools(body: dict):
+    """Run {"calls": [{"tool", "arguments"}, ...]} concurrently; results come back in call order.
+
+    Options: max_concurrency (default BATCH_MAX_CONCURRENCY), fail_fast (cancel the rest
+    after the first failed call) and deadline (seconds for the whole batch, default
+    BATCH_DEADLINE). Calls that did not finish are reported as "cancelled" or "timeout".
+    """
+    calls = (body or {}).get("calls")
+    if not isinstance(calls, list) or not all(isinstance(c, dict) and c.get("tool") for c in calls):
+        raise HTTPException(status_code=400, detail="'calls' must be a list of {\"tool\", \"arguments\"} objects")
+    max_calls = int(os.getenv("BATCH_MAX_CALLS", "100"))
+    if len(calls) > max_calls:
+        raise HTTPException(status_code=400, detail=f"At most {max_calls} calls per batch")
+    try:
+        concurrency = max(1, int(body.get("max_concurrency") or os.getenv("BATCH_MAX_CONCURRENCY", "8")))
+        deadline = float(body.get("deadline") or os.getenv("BATCH_DEADLINE", "0")) or None
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch option: {e}")
+    fail_fast = bool(body.get("fail_fast"))
+
+    sem = asyncio.Semaphore(concurrency)
+    t0 = time.perf_counter()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+
+    def ms() -> float:
+        return round((time.perf_counter() - t0) * 1000, 2)
+
+    async def run(index: int, call: Dict[str, Any]) -> bool:
+        async with sem:
+            started = ms()
+            try:
+                result = await _dispatch_tool(call["tool"], call.get("arguments") or {})
+            except TypeError as te:
+                result = {"status": "error", "message": f"Argument error: {te}"}
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            finished = ms()
+        ok = result.get("status", "success") == "success" and (result.get("status_code") or 200) < 400
+        results[index] = {"index": index, "tool": call["tool"], "status": "success" if ok else "error",
+                          "status_code": result.get("status_code"), "result": result,
+                          "start_ms": started, "end_ms": finished, "elapsed_ms": round(finished - started, 2)}
+        return ok
+
+    tasks = [asyncio.create_task(run(i, c)) for i, c in enumerate(calls)]
+    pending = set(tasks)
+    timed_out = aborted = False
+    give_up_at = time.monotonic() + deadline if deadline else None
+    while pending:
+        timeout = None if give_up_at is None else max(0.0, give_up_at - time.monotonic())
+        done, pending = await asyncio.wait(pending, timeout=timeout,
+                                           return_when=asyncio.FIRST_COMPLETED if fail_fast else asyncio.ALL_COMPLETED)
+        if fail_fast and any(not t.result() for t in done):
+            aborted = True
+            break
+        if pending and give_up_at is not None and time.monotonic() >= give_up_at:
+            timed_out = True
+            break
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    unfinished = "timeout" if timed_out else "cancelled"
+    for i, call in enumerate(calls):
+        if results[i] is None:
+            results[i] = {"index": i, "tool": call["tool"], "status": unfinished, "result": None}
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("success", "error", "cancelled", "timeout")}
+    logger.info("/mcp/batch calls=%d concurrency=%d %s total_ms=%s", len(calls), concurrency, counts, ms())
+    return {
+        "status": "success" if counts["success"] == len(calls) else ("error" if not counts["success"] else "partial"),
+        "results": results,
+        "counts": counts,
+        "fail_fast_triggered": aborted,
+        "deadline_exceeded": timed_out,
+        "max_concurrency": concurrency,
+        "total_ms": ms(),
+    }
+
 @app.post("/mcp/chat")
 async def chat_endpoint(body: dict):
     message = body.get("message", "")
@@ -563,11 +1588,9 @@ async def chat_endpoint(body: dict):
                 return {"response": result}
 
             # dynamic match
-            if tool_name in server.api_tools:
-                return {"response": server.execute_endpoint(tool_name, args)}
-            for name in server.api_tools.keys():
-                if name.endswith(f"_{tool_name}"):
-                    return {"response": server.execute_endpoint(name, args)}
+            resolved = server.resolve_tool(tool_name)
+            if resolved:
+                return {"response": await server.execute_endpoint_async(resolved, args)}
         except Exception as e:
             return {"response": {"status": "error", "message": f"tool execution failed: {e}"}}
     return {"response": f"Echo: {message}"}
@@ -577,12 +1600,27 @@ if __name__ == "__main__":
     parser.add_argument("--transport", type=str, default="stdio", choices=["stdio", "http"])
     parser.add_argument("--host", type=str, default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--watch", action="store_true", help="hot-reload specs when files in OPENAPI_DIR change")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "1")),
+                        help="HTTP worker processes sharing one compiled registry snapshot and token store")
     args = parser.parse_args()
-    if args.transport == "http":
+    if args.watch:
+        os.environ["SPEC_WATCH"] = "1"
+    if args.transport == "http" and args.workers > 1:
+        import uvicorn
+        # workers import this module afresh: hand them the registry compiled above and a shared token store
+        snapshot = os.path.abspath(os.getenv("REGISTRY_SNAPSHOT_FILE", ".registry_snapshot.pkl"))
+        server.write_registry_snapshot(snapshot)
+        os.environ[SNAPSHOT_ENV] = snapshot
+        os.environ.setdefault("TOKEN_STORE_FILE", os.path.abspath(".token_store.json"))
+        logger.info("Starting FastAPI HTTP server on http://%s:%d with %d workers", args.host, args.port, args.workers)
+        uvicorn.run("openapi_mcp_server:app", host=args.host, port=args.port, workers=args.workers, reload=False,
+                    log_level=LOG_LEVEL.lower())
+    elif args.transport == "http":
         # Serve FastAPI app (introspection + tool execution endpoints)
         import uvicorn
         logger.info("Starting FastAPI HTTP server on http://%s:%d", args.host, args.port)
         # Pass the app instance directly to avoid module re-import and double initialization
-        uvicorn.run(app, host=args.host, port=args.port, reload=False)
+        uvicorn.run(app, host=args.host, port=args.port, reload=False, log_level=LOG_LEVEL.lower())
     else:
         server.run(transport=args.transport, host=args.host, port=args.port)
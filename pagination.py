@@ -0,0 +1,293 @@
+"""Pagination detection and "fetch all" iteration for list operations.
+
+A GET operation is paginated when it declares `x-pagination` or when its query
+parameters match a known pattern (checked in this order):
+
+  cursor   a cursor/page_token parameter; the next cursor is read from the body
+  offset   offset (or skip/start) plus limit (or page_size/per_page/...)
+  page     a page number parameter, optionally with a page size
+  link     the 200 response declares a `Link` header (RFC 8288 rel="next")
+
+`x-pagination` overrides detection, e.g.
+
+  x-pagination: {style: cursor, cursor_param: after, next_cursor: meta.next, items: data, page_size: 100}
+
+or `x-pagination: false` to opt an operation out.
+
+iterate_records() walks the pages of one call and yields NDJSON lines, one per
+record, finishing with a `{"_pagination": {...}}` summary line. The next page is
+requested before the current page's records are emitted, so the upstream round
+trip overlaps with sending the previous page.
+"""
+import asyncio
+import json
+from dataclasses import asdict, dataclass, fields
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+STYLES = ("cursor", "offset", "page", "link")
+
+_LIMIT_NAMES = ("limit", "page_size", "pageSize", "per_page", "perPage", "size", "max_results", "maxResults")
+_OFFSET_NAMES = ("offset", "skip", "start")
+_PAGE_NAMES = ("page", "page_number", "pageNumber")
+_CURSOR_NAMES = ("cursor", "page_token", "pageToken", "next_token", "nextToken", "after", "starting_after")
+_NEXT_CURSOR_FIELDS = ("next_cursor", "nextCursor", "next_page_token", "nextPageToken", "next_token",
+                       "nextToken", "cursor")
+_TOTAL_FIELDS = ("total_count", "totalCount", "total")
+_ENVELOPES = ("meta", "pagination", "paging", "page_info", "pageInfo")
+
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+@dataclass(frozen=True)
+class Pagination:
+    style: str
+    items: Optional[str] = None          # dotted path to the record list (None: detect at runtime)
+    limit_param: Optional[str] = None
+    offset_param: Optional[str] = None   # offset style
+    page_param: Optional[str] = None     # page style
+    first_page: int = 1
+    cursor_param: Optional[str] = None   # cursor style
+    next_cursor: Optional[str] = None    # dotted path to the next cursor in the body
+    page_size: Optional[int] = None      # sent as limit_param when the caller does not set it
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+def _first(candidates, names) -> Optional[str]:
+    return next((n for n in candidates if n in names), None)
+
+
+def _success_response(details: Dict[str, Any]) -> Dict[str, Any]:
+    responses = details.get("responses") or {}
+    for code in ("200", 200, "2XX", "2xx", "default"):
+        if code in responses:
+            return responses[code] or {}
+    return {}
+
+
+def _response_schema(details: Dict[str, Any]) -> Dict[str, Any]:
+    content = _success_response(details).get("content") or {}
+    media = content.get("application/json") or next(iter(content.values()), {}) or {}
+    return media.get("schema") or {}
+
+
+def _items_path(schema: Dict[str, Any]) -> Optional[str]:
+    if schema.get("type") == "array":
+        return None
+    for name, prop in (schema.get("properties") or {}).items():
+        if (prop or {}).get("type") == "array":
+            return name
+    return None
+
+
+def _cursor_path(schema: Dict[str, Any]) -> Optional[str]:
+    props = schema.get("properties") or {}
+    found = _first(_NEXT_CURSOR_FIELDS, props)
+    if found:
+        return found
+    for env in _ENVELOPES:
+        inner = ((props.get(env) or {}).get("properties")) or {}
+        found = _first(_NEXT_CURSOR_FIELDS, inner)
+        if found:
+            return f"{env}.{found}"
+    return None
+
+
+def detect_pagination(method: str, details: Dict[str, Any], parameters: Dict[str, Any],
+                      resolve: Optional[Callable[[Any], Dict[str, Any]]] = None) -> Optional[Pagination]:
+    """Pagination for one operation from `x-pagination` or its parameters/response shape.
+
+    `resolve` flattens a response schema that uses `$ref`/`allOf` (RefResolver.flatten).
+    """
+    declared = details.get("x-pagination")
+    if declared is False or method.upper() != "GET":
+        return None
+    schema = _response_schema(details)
+    if resolve is not None:
+        schema = resolve(schema)
+    if isinstance(declared, dict):
+        known = {f.name for f in fields(Pagination)}
+        values = {k: v for k, v in declared.items() if k in known}
+        if values.get("style") not in STYLES:
+            return None
+        values.setdefault("items", _items_path(schema))
+        return Pagination(**values)
+
+    query = [n for n, info in parameters.items() if (info or {}).get("location") == "query"]
+    limit = _first(_LIMIT_NAMES, query)
+    cursor = _first(_CURSOR_NAMES, query)
+    if cursor:
+        return Pagination("cursor", _items_path(schema), limit_param=limit, cursor_param=cursor,
+                          next_cursor=_cursor_path(schema))
+    offset = _first(_OFFSET_NAMES, query)
+    if offset and limit:
+        return Pagination("offset", _items_path(schema), limit_param=limit, offset_param=offset)
+    page = _first(_PAGE_NAMES, query)
+    if page:
+        return Pagination("page", _items_path(schema), limit_param=limit, page_param=page)
+    headers = {h.lower() for h in (_success_response(details).get("headers") or {})}
+    if "link" in headers:
+        return Pagination("link", _items_path(schema), limit_param=limit)
+    return None
+
+
+# ---------------------- runtime ----------------------
+def _lookup(data: Any, path: Optional[str]) -> Any:
+    for part in (path or "").split("."):
+        if not part:
+            continue
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def extract_records(pagination: Pagination, data: Any) -> Optional[List[Any]]:
+    """The page's record list: the `items` path, the body itself, or its first list field."""
+    if pagination.items:
+        records = _lookup(data, pagination.items)
+        return records if isinstance(records, list) else None
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return next((v for v in data.values() if isinstance(v, list)), None)
+    return None
+
+
+def _next_cursor(pagination: Pagination, data: Any) -> Any:
+    if pagination.next_cursor:
+        return _lookup(data, pagination.next_cursor)
+    if not isinstance(data, dict):
+        return None
+    for scope in [data] + [data.get(env) for env in _ENVELOPES if isinstance(data.get(env), dict)]:
+        found = _first(_NEXT_CURSOR_FIELDS, scope)
+        if found:
+            return scope[found]
+    return None
+
+
+def _total(data: Any) -> Optional[int]:
+    if isinstance(data, dict):
+        for scope in [data] + [data.get(env) for env in _ENVELOPES if isinstance(data.get(env), dict)]:
+            found = _first(_TOTAL_FIELDS, scope)
+            if found and isinstance(scope[found], int):
+                return scope[found]
+    return None
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def next_arguments(pagination: Pagination, arguments: Dict[str, Any], result: Dict[str, Any],
+                   records: List[Any], query_params=frozenset()) -> Optional[Dict[str, Any]]:
+    """Arguments for the page after `result`, or None when this was the last page."""
+    data = result.get("response")
+    style = pagination.style
+    if style == "cursor":
+        cursor = _next_cursor(pagination, data)
+        if cursor in (None, "") or not records or cursor == arguments.get(pagination.cursor_param):
+            return None
+        return {**arguments, pagination.cursor_param: cursor}
+    if style == "link":
+        next_url = result.get("next_url")
+        if not next_url:
+            return None
+        # only parameters the operation declares can be bound; a link that changes none of them ends the walk
+        linked = {k: v for k, v in parse_qsl(urlsplit(next_url).query) if k in query_params}
+        nxt = {**arguments, **linked}
+        return nxt if nxt != arguments else None
+
+    if not records:
+        return None
+    limit = _int(arguments.get(pagination.limit_param), 0) if pagination.limit_param else 0
+    if limit and len(records) < limit:
+        return None  # short page
+    if style == "offset":
+        offset = _int(arguments.get(pagination.offset_param), 0) + len(records)
+        total = _total(data)
+        if total is not None and offset >= total:
+            return None
+        return {**arguments, pagination.offset_param: offset}
+    if style == "page":
+        page = _int(arguments.get(pagination.page_param), pagination.first_page)
+        total = _total(data)
+        if total is not None and limit and (page - pagination.first_page + 1) * limit >= total:
+            return None
+        return {**arguments, pagination.page_param: page + 1}
+    return None
+
+
+SKIP = object()  # returned by a transform to drop a record
+
+
+def _line(obj: Any) -> bytes:
+    return (_JSON_ENCODER.encode(obj) + "\n").encode("utf-8")
+
+
+async def iterate_records(fetch: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                          pagination: Pagination, arguments: Dict[str, Any], *,
+                          max_records: int, max_bytes: int, max_pages: int,
+                          page_size: Optional[int] = None, query_params=frozenset(),
+                          transform: Optional[Callable[[Any], Any]] = None) -> AsyncIterator[bytes]:
+    """Yield every record of a paginated call as NDJSON, then a `_pagination` summary line.
+
+    `fetch(arguments)` returns a tool result dict. `transform(record)` may return SKIP
+    to drop a record. Stops at the last page, an error, or a cap.
+    """
+    args = dict(arguments)
+    size = page_size or pagination.page_size
+    if pagination.limit_param and size and pagination.limit_param not in args:
+        args[pagination.limit_param] = size
+
+    summary: Dict[str, Any] = {"pages": 0, "records": 0, "bytes": 0, "complete": False}
+    pending: Optional[asyncio.Future] = asyncio.ensure_future(fetch(args))
+    try:
+        while pending is not None:
+            result = await pending
+            pending = None
+            summary["pages"] += 1
+            if result.get("status") != "success" or (result.get("status_code") or 200) >= 400:
+                summary["error"] = {k: result.get(k) for k in ("status_code", "message", "url") if result.get(k)}
+                break
+            records = extract_records(pagination, result.get("response"))
+            if records is None:
+                summary["error"] = {"message": "no record list in response", "url": result.get("url")}
+                break
+
+            nxt = next_arguments(pagination, args, result, records, query_params)
+            if nxt is not None:
+                if summary["pages"] < max_pages:
+                    pending = asyncio.ensure_future(fetch(nxt))  # prefetch while this page is emitted
+                else:
+                    summary["truncated"] = "max_pages"
+
+            for record in records:
+                if transform is not None:
+                    record = transform(record)
+                    if record is SKIP:
+                        continue
+                if summary["records"] >= max_records:
+                    summary["truncated"] = "max_records"
+                    break
+                line = _line(record)
+                if summary["bytes"] + len(line) > max_bytes:
+                    summary["truncated"] = "max_bytes"
+                    break
+                summary["records"] += 1
+                summary["bytes"] += len(line)
+                yield line
+            if summary.get("truncated") in ("max_records", "max_bytes"):
+                break
+            if nxt is None:
+                summary["complete"] = True
+            args = nxt
+    finally:
+        if pending is not None:
+            pending.cancel()
+    yield _line({"_pagination": summary})
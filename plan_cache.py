@@ -0,0 +1,85 @@
+"""TTL + LRU cache of LLM tool plans.
+
+Keyed by the normalized user message, the tool-registry version and the model, so
+the same question asked against the same tools skips the planner LLM. A registry
+reload changes the version (and clears the cache through the server's on_reload
+hook), so plans never outlive the tools they were made for. Callers still
+re-validate a cached plan against the live tools before using it.
+
+Thread-safe; stores plain step dicts ({tool, arguments, reason}).
+"""
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_SPACE_RE = re.compile(r"\s+")
+
+PlanKey = Tuple[str, int, str]
+
+
+def normalize_message(message: str) -> str:
+    """Case, surrounding punctuation and runs of whitespace do not change the plan."""
+    return _SPACE_RE.sub(" ", (message or "").strip().lower()).strip(" .!?")
+
+
+class PlanCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[PlanKey, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0   # hits dropped because the plan no longer validates
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(message: str, registry_version: int, model: str) -> PlanKey:
+        return normalize_message(message), registry_version, model
+
+    def get(self, key: PlanKey) -> Optional[List[Dict[str, Any]]]:
+        """A copy of the cached plan, or None (counted as a miss)."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(item[1])  # callers may resolve placeholders in place
+
+    def put(self, key: PlanKey, steps: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(steps))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def reject(self, key: PlanKey):
+        """Drop a hit whose plan failed re-validation (it is then re-planned)."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self.hits -= 1
+            self.misses += 1
+            self.rejected += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "rejected": self.rejected,
+                    "evictions": self.evictions, "invalidations": self.invalidations,
+                    "hit_ratio": round(self.hits / total, 3) if total else None}
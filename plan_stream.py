@@ -0,0 +1,78 @@
+"""Incremental parser for a planner reply streamed token by token.
+
+The planner answers with a JSON array of step objects, possibly wrapped in prose or
+a ```json fence. StepStreamParser.feed() takes each text delta and returns the step
+objects that became complete in it, so a step can be dispatched while the rest of
+the array is still being generated. It tracks string/escape state and nesting depth
+only; each complete top-level element is decoded with one json.loads.
+
+Anything before the first '[' or '{' is skipped. A bare object (no array) is also
+accepted as one step, as is a sequence of bare objects.
+"""
+import json
+from typing import Any, List
+
+
+class StepStreamParser:
+    def __init__(self):
+        self._buf: List[str] = []
+        self._capturing = False
+        self._array = False
+        self._started = False
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self.done = False     # the top-level array was closed
+        self.items = 0        # elements decoded
+        self.errors = 0       # complete elements that were not valid JSON
+
+    def feed(self, text: str) -> List[Any]:
+        """Decoded elements completed by `text`, in order."""
+        out: List[Any] = []
+        for ch in text:
+            if self.done:
+                break
+            if self._in_str:
+                if self._capturing:
+                    self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+            if not self._started:
+                if ch == "[":
+                    self._started, self._array, self._depth = True, True, 1
+                elif ch == "{":
+                    self._started, self._array, self._depth = True, False, 1
+                    self._capturing, self._buf = True, ["{"]
+                continue
+
+            if ch == '"':
+                self._in_str = True
+            elif ch in "[{":
+                self._depth += 1
+                if self._array and self._depth == 2 and ch == "{":
+                    self._capturing, self._buf = True, []
+            elif ch in "]}":
+                self._depth -= 1
+            if self._capturing:
+                self._buf.append(ch)
+
+            closed_element = self._array and self._depth == 1 and ch == "}" and self._capturing
+            closed_object = not self._array and self._depth == 0
+            if closed_element or closed_object:
+                self._capturing = False
+                try:
+                    out.append(json.loads("".join(self._buf)))
+                    self.items += 1
+                except ValueError:
+                    self.errors += 1
+                self._buf = []
+                if closed_object:
+                    self._started = False  # allow another bare object
+            elif self._array and self._depth == 0:
+                self.done = True
+        return out
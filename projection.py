@@ -0,0 +1,348 @@
+"""Server-side projection (`select`) and filtering (`where`) of tool responses.
+
+Expressions use a JMESPath subset and are compiled once into Python closures
+(cached by expression text):
+
+  a.b.c                 field access           payments[0] / payments[-1]   index
+  payments[*].id        list projection        payments[].items[]           flatten
+  summary.*             object values          payments[?status=='pending'] filter
+  {id: id, amt: amount} multiselect hash       [id, amount]                 multiselect list
+  ==  !=  <  <=  >  >=  &&  ||  !  ( )         a | b   pipe (stops a projection)
+  literals: 'text', `{"json": 1}`, 42, 1.5, @ (current node)
+
+`where` is a filter condition (e.g. "status=='pending' && amount > `100`") applied to the
+response list, or to every list of objects at the top level of a response object.
+`select` is then evaluated against the (filtered) response.
+"""
+import functools
+import json
+import re
+from typing import Any, Callable, List, NamedTuple, Optional
+
+Expr = Callable[[Any], Any]
+
+# Reserved arguments added to every generated tool (unless the operation defines them itself)
+PROJECTION_PARAMS = {
+    "select": "Optional JMESPath-style projection of the response, e.g. payments[*].{id: id, amount: amount}",
+    "where": "Optional filter applied to response rows before select, e.g. status=='pending' && amount > `100`",
+}
+
+
+class ProjectionError(ValueError):
+    pass
+
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<num>-?\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<qident>"(?:[^"\\]|\\.)*")
+  | (?P<str>'(?:[^'\\]|\\.)*')
+  | (?P<json>`(?:[^`\\]|\\.)*`)
+  | (?P<op>==|!=|<=|>=|&&|\|\||[<>!|.\[\]*?{}:,()@])
+)""", re.X)
+
+
+def _tokenize(text: str) -> List[tuple]:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise ProjectionError(f"unexpected character at {pos}: {text[pos:pos + 10]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        raw = m.group(kind)
+        if kind == "num":
+            value = float(raw) if "." in raw else int(raw)
+        elif kind == "qident":
+            kind, value = "ident", json.loads(raw)
+        elif kind == "str":
+            value = raw[1:-1].replace("\\'", "'")
+        elif kind == "json":
+            try:
+                value = json.loads(raw[1:-1].replace("\\`", "`"))
+            except ValueError:
+                raise ProjectionError(f"bad literal {raw}")
+        else:
+            value = raw
+        tokens.append((kind, value))
+    return tokens
+
+
+def _truthy(value: Any) -> bool:
+    if value is None or value is False:
+        return False
+    return not (isinstance(value, (list, dict, str)) and len(value) == 0)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _field(name: str) -> Expr:
+    return lambda d: d.get(name) if isinstance(d, dict) else None
+
+
+_COMPARE = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _ordering(op: str, left: Expr, right: Expr) -> Expr:
+    cmp = _COMPARE[op]
+
+    def compare(d):
+        a, b = left(d), right(d)
+        if op in ("==", "!="):
+            return cmp(a, b)
+        numeric = (int, float)
+        if isinstance(a, numeric) and isinstance(b, numeric) and not isinstance(a, bool) and not isinstance(b, bool):
+            return cmp(a, b)
+        if isinstance(a, str) and isinstance(b, str):
+            return cmp(a, b)  # e.g. ISO dates
+        return None
+    return compare
+
+
+def _project(base: Expr, rest: Expr, mode: str) -> Expr:
+    def projection(d):
+        value = base(d)
+        if mode == "values":
+            if not isinstance(value, dict):
+                return None
+            items = list(value.values())
+        else:
+            if not isinstance(value, list):
+                return None
+            items = value
+            if mode == "flatten":
+                items = [y for x in value for y in (x if isinstance(x, list) else [x])]
+        out = []
+        for item in items:
+            r = rest(item)
+            if r is not None:
+                out.append(r)
+        return out
+    return projection
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    # -- token helpers --
+    def peek(self, offset: int = 0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def accept(self, op: str) -> bool:
+        kind, value = self.peek()
+        if kind == "op" and value == op:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, op: str):
+        if not self.accept(op):
+            raise ProjectionError(f"expected {op!r} in {self.text!r}")
+
+    # -- grammar --
+    def parse(self) -> Expr:
+        expr = self.expression()
+        if self.pos != len(self.tokens):
+            raise ProjectionError(f"unexpected {self.peek()[1]!r} in {self.text!r}")
+        return expr
+
+    def expression(self) -> Expr:
+        left = self.or_expr()
+        while self.accept("|"):
+            right = self.or_expr()
+            left = (lambda l, r: lambda d: r(l(d)))(left, right)
+        return left
+
+    def or_expr(self) -> Expr:
+        left = self.and_expr()
+        while self.accept("||"):
+            right = self.and_expr()
+            left = (lambda l, r: lambda d: (lambda v: v if _truthy(v) else r(d))(l(d)))(left, right)
+        return left
+
+    def and_expr(self) -> Expr:
+        left = self.not_expr()
+        while self.accept("&&"):
+            right = self.not_expr()
+            left = (lambda l, r: lambda d: (lambda v: r(d) if _truthy(v) else v)(l(d)))(left, right)
+        return left
+
+    def not_expr(self) -> Expr:
+        if self.accept("!"):
+            inner = self.not_expr()
+            return lambda d: not _truthy(inner(d))
+        return self.comparison()
+
+    def comparison(self) -> Expr:
+        left = self.chain()
+        kind, value = self.peek()
+        if kind == "op" and value in _COMPARE:
+            self.pos += 1
+            return _ordering(value, left, self.chain())
+        return left
+
+    def chain(self) -> Expr:
+        return self.postfix(self.primary())
+
+    def primary(self) -> Expr:
+        kind, value = self.peek()
+        if kind is None:
+            raise ProjectionError(f"unexpected end of {self.text!r}")
+        if kind == "ident":
+            self.pos += 1
+            return _field(value)
+        if kind in ("str", "json", "num"):
+            self.pos += 1
+            return lambda d, v=value: v
+        if self.accept("@"):
+            return _identity
+        if self.accept("("):
+            inner = self.expression()
+            self.expect(")")
+            return inner
+        if self.accept("{"):
+            return self.multiselect_hash(_identity)
+        if self.accept("*"):
+            return _project(_identity, self.postfix(_identity), "values")
+        if kind == "op" and value == "[":
+            nxt_kind, nxt = self.peek(1)
+            if nxt_kind == "num" or (nxt_kind == "op" and nxt in ("*", "]", "?")):
+                return _identity  # bracket step on the current node; postfix() handles it
+            self.pos += 1
+            return self.multiselect_list(_identity)
+        raise ProjectionError(f"unexpected {value!r} in {self.text!r}")
+
+    def postfix(self, base: Expr, in_projection: bool = False) -> Expr:
+        """Apply trailing steps to `base`. A projection maps the remaining steps over its
+        elements; a flatten ('[]') ends the enclosing projection and applies to its result."""
+        while True:
+            kind, value = self.peek()
+            if in_projection and kind == "op" and value == "[" and self.peek(1) == ("op", "]"):
+                return base
+            if self.accept("."):
+                kind, value = self.peek()
+                if kind == "ident":
+                    self.pos += 1
+                    base = (lambda b, f: lambda d: f(b(d)))(base, _field(value))
+                elif self.accept("*"):
+                    base = _project(base, self.postfix(_identity, True), "values")
+                elif self.accept("{"):
+                    base = self.multiselect_hash(base)
+                elif self.accept("["):
+                    base = self.multiselect_list(base)
+                else:
+                    raise ProjectionError(f"unexpected {value!r} after '.' in {self.text!r}")
+            elif self.accept("["):
+                kind, value = self.peek()
+                if kind == "num" and isinstance(value, int):
+                    self.pos += 1
+                    self.expect("]")
+                    base = (lambda b, i: lambda d: (lambda v: v[i] if isinstance(v, list) and -len(v) <= i < len(v) else None)(b(d)))(base, value)
+                elif self.accept("*"):
+                    self.expect("]")
+                    base = _project(base, self.postfix(_identity, True), "list")
+                elif self.accept("]"):
+                    base = _project(base, self.postfix(_identity, True), "flatten")
+                elif self.accept("?"):
+                    cond = self.expression()
+                    self.expect("]")
+                    filtered = (lambda b, c: lambda d: (lambda v: [x for x in v if _truthy(c(x))] if isinstance(v, list) else None)(b(d)))(base, cond)
+                    base = _project(filtered, self.postfix(_identity, True), "list")
+                else:
+                    raise ProjectionError(f"unsupported bracket expression in {self.text!r}")
+            else:
+                return base
+
+    def multiselect_hash(self, base: Expr) -> Expr:
+        pairs = []
+        while True:
+            kind, key = self.peek()
+            if kind != "ident":
+                raise ProjectionError(f"expected a key in {self.text!r}")
+            self.pos += 1
+            self.expect(":")
+            pairs.append((key, self.expression()))
+            if self.accept("}"):
+                break
+            self.expect(",")
+
+        def select(d):
+            v = base(d)
+            return None if v is None else {k: f(v) for k, f in pairs}
+        return select
+
+    def multiselect_list(self, base: Expr) -> Expr:
+        items = [self.expression()]
+        while self.accept(","):
+            items.append(self.expression())
+        self.expect("]")
+
+        def select(d):
+            v = base(d)
+            return None if v is None else [f(v) for f in items]
+        return select
+
+
+@functools.lru_cache(maxsize=512)
+def compile_expression(text: str) -> Expr:
+    """Compile an expression once; repeated calls with the same text hit the cache."""
+    if not text or not text.strip():
+        raise ProjectionError("empty expression")
+    return _Parser(text).parse()
+
+
+def _filter_rows(data: Any, predicate: Expr) -> Any:
+    if isinstance(data, list):
+        return [row for row in data if _truthy(predicate(row))]
+    if isinstance(data, dict):
+        return {k: _filter_rows(v, predicate) if isinstance(v, list) and v and isinstance(v[0], dict) else v
+                for k, v in data.items()}
+    return data
+
+
+class Projection(NamedTuple):
+    select: Optional[str]
+    where: Optional[str]
+    select_fn: Optional[Expr]
+    where_fn: Optional[Expr]
+
+    def apply_where(self, record: Any) -> Any:
+        """The record if it passes `where` (or there is none), else None."""
+        if self.where_fn is None or _truthy(self.where_fn(record)):
+            return record
+        return None
+
+    def apply(self, data: Any) -> Any:
+        """Return projected data; the input is never mutated (it may be a cached response)."""
+        if self.where_fn is not None:
+            data = _filter_rows(data, self.where_fn)
+        if self.select_fn is not None:
+            data = self.select_fn(data)
+        return data
+
+
+def compile_projection(select: Optional[str], where: Optional[str]) -> Optional[Projection]:
+    """Compile select/where arguments (None when neither is given). Raises ProjectionError."""
+    for name, value in (("select", select), ("where", where)):
+        # checked before the lru_cache'd compile: lists are unhashable, numbers have no .strip()
+        if value is not None and not isinstance(value, str):
+            raise ProjectionError(f"{name} must be a string expression, got {type(value).__name__}")
+    if not select and not where:
+        return None
+    return Projection(select, where,
+                      compile_expression(select) if select else None,
+                      compile_expression(where) if where else None)
@@ -0,0 +1,131 @@
+"""Local `$ref` resolution for OpenAPI specs, done once when a spec is compiled.
+
+One RefResolver is created per spec. Every JSON pointer (`#/components/schemas/X`,
+`#/components/parameters/Y`, `#/components/requestBodies/Z`, Swagger 2
+`#/definitions/X`, ...) is looked up and flattened at most once; later operations
+that reference it reuse the memoized result, so resolution cost grows with the
+number of unique refs rather than refs x operations.
+
+flatten() also merges `allOf` compositions: properties and required are unioned and
+the composing schema's own keys win over those of its parts. A ref reached again
+while it is still being resolved (A -> B -> A) is a cycle: it is logged and resolves
+to an empty schema instead of recursing. Property schemas are dereferenced one level
+only, so self-referencing models (trees, linked lists) need no special casing.
+External refs (other files/URLs) are not fetched and resolve to an empty schema.
+"""
+import logging
+from typing import Any, Dict, List, Set
+
+logger = logging.getLogger("ref_resolver")
+
+_EMPTY: Dict[str, Any] = {}
+
+
+class RefResolver:
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self._targets: Dict[str, Any] = {}          # pointer -> referenced node (refs followed)
+        self._flat: Dict[str, Dict[str, Any]] = {}  # pointer -> flattened schema
+        self._following: Set[str] = set()          # chains of refs being followed by target()
+        self._flattening: Set[str] = set()         # refs being flattened by flatten()
+        self.lookups = 0
+        self.hits = 0
+        self.cycles = 0
+        self.unresolved = 0
+
+    # ---------------------- pointers ----------------------
+    def _pointer(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            self.unresolved += 1
+            logger.warning("External $ref %s is not resolved", ref)
+            return _EMPTY
+        node: Any = self.spec
+        for part in ref[1:].lstrip("/").split("/"):
+            if not part:
+                continue
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            elif isinstance(node, dict) and part in node:
+                node = node[part]
+            else:
+                self.unresolved += 1
+                logger.warning("Unresolvable $ref %s", ref)
+                return _EMPTY
+        return node
+
+    def target(self, ref: str) -> Any:
+        """The node `ref` points to, following chained refs (memoized per pointer)."""
+        self.lookups += 1
+        if ref in self._targets:
+            self.hits += 1
+            return self._targets[ref]
+        if ref in self._following:
+            self.cycles += 1
+            logger.warning("Cyclic $ref %s", ref)
+            return _EMPTY
+        self._following.add(ref)
+        try:
+            node = self._pointer(ref)
+            if isinstance(node, dict) and isinstance(node.get("$ref"), str):
+                node = self.target(node["$ref"])
+        finally:
+            self._following.discard(ref)
+        self._targets[ref] = node
+        return node
+
+    def deref(self, node: Any) -> Any:
+        """`node` itself, or what it references when it is a `{"$ref": ...}` object."""
+        if isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            return self.target(node["$ref"])
+        return node
+
+    # ---------------------- schemas ----------------------
+    def flatten(self, schema: Any) -> Dict[str, Any]:
+        """A schema with its top-level `$ref` and `allOf` merged in; property schemas are dereferenced."""
+        if not isinstance(schema, dict):
+            return _EMPTY
+        ref = schema.get("$ref")
+        if not isinstance(ref, str):
+            return self._merge(schema)
+        self.lookups += 1
+        if ref in self._flat:
+            self.hits += 1
+            return self._flat[ref]
+        if ref in self._flattening:
+            self.cycles += 1
+            logger.warning("Cyclic $ref %s", ref)
+            return _EMPTY
+        self._flattening.add(ref)
+        try:
+            flat = self._merge(self._pointer(ref))
+        finally:
+            self._flattening.discard(ref)
+        self._flat[ref] = flat
+        return flat
+
+    def _merge(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(schema.get("$ref"), str):
+            return self.flatten(schema)
+        parts: List[Dict[str, Any]] = [self.flatten(s) for s in schema.get("allOf") or ()]
+        props = schema.get("properties") or {}
+        if not parts and not any(isinstance(p, dict) and "$ref" in p for p in props.values()):
+            return schema  # nothing to resolve: share the spec's own dict
+        merged: Dict[str, Any] = {}
+        properties: Dict[str, Any] = {}
+        required: List[str] = []
+        for part in parts + [{k: v for k, v in schema.items() if k != "allOf"}]:
+            merged.update((k, v) for k, v in part.items() if k not in ("properties", "required"))
+            for name, prop in (part.get("properties") or {}).items():
+                properties[name] = self.deref(prop)
+            required.extend(r for r in part.get("required") or () if r not in required)
+        if properties:
+            merged["properties"] = properties
+            merged.setdefault("type", "object")
+        if required:
+            merged["required"] = required
+        return merged
+
+    def stats(self) -> Dict[str, int]:
+        return {"unique_refs": len(set(self._targets) | set(self._flat)), "lookups": self.lookups,
+                "hits": self.hits, "cycles": self.cycles, "unresolved": self.unresolved}
@@ -0,0 +1,47 @@
+"""Compiled-registry snapshot shared by worker processes.
+
+With `--workers N` the parent process loads the specs once and writes a snapshot of
+the compiled registry (parsed spec, declared base URL and tool dicts per file, the
+same payload the spec cache stores). Workers find it through REGISTRY_SNAPSHOT, map
+the file read-only (mmap) and unpickle straight from the mapping, so no worker
+reads, parses or compiles a spec file on startup.
+
+Entries carry the size/mtime of their source file, so each worker still stats every
+spec file once to check them; a spec edited after the snapshot was written misses
+and is compiled normally.
+"""
+import logging
+import mmap
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+from spec_cache import CACHE_FORMAT
+
+logger = logging.getLogger("registry_snapshot")
+
+SNAPSHOT_ENV = "REGISTRY_SNAPSHOT"
+
+
+def write_snapshot(path: str, entries: Dict[str, Dict[str, Any]]):
+    """entries: absolute spec path -> {"size", "mtime_ns", "payload"}; written atomically."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"format": CACHE_FORMAT, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Entries of a snapshot file, or {} if it is missing, unreadable or another format."""
+    if not path:
+        return {}
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            blob = pickle.loads(mm)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+        logger.warning("Ignoring registry snapshot %s: %s", path, e)
+        return {}
+    if blob.get("format") != CACHE_FORMAT:
+        logger.info("Registry snapshot %s has another format; compiling specs", path)
+        return {}
+    return blob.get("entries", {})
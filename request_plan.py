@@ -0,0 +1,133 @@
+"""Precompiled per-tool request templates.
+
+A RequestPlan is compiled once when an APITool is registered. It holds the pre-split
+path template, the parameter -> location table, default headers and the body
+serializer, so execute_endpoint only binds argument values per call.
+"""
+import json
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+
+class BoundRequest(NamedTuple):
+    method: str
+    url: str
+    params: Dict[str, Any]
+    headers: Dict[str, str]
+    body: Optional[bytes]      # already serialized
+    body_keys: Tuple[str, ...]
+
+
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _json_body(data: Dict[str, Any]) -> bytes:
+    return _JSON_ENCODER.encode(data).encode("utf-8")
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    """'/a/{x}/b' -> ('/a/', 'x', '/b'): literals at even, param names at odd positions."""
+    parts = []
+    rest = path
+    while True:
+        start = rest.find("{")
+        end = rest.find("}", start + 1) if start != -1 else -1
+        if start == -1 or end == -1:
+            parts.append(rest)
+            break
+        parts.append(rest[:start])
+        parts.append(rest[start + 1:end])
+        rest = rest[end + 1:]
+    return tuple(parts)
+
+
+def _path_format(parts: Tuple[str, ...]) -> str:
+    """('/a/', 'x', '/b') -> '/a/{0}/b' with literal braces escaped, for str.format binding."""
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.append("{%d}" % (i // 2))
+        else:
+            out.append(part.replace("{", "{{").replace("}", "}}"))
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class RequestPlan:
+    method: str
+    path: str
+    path_parts: Tuple[str, ...]
+    path_names: Tuple[str, ...]
+    path_format: str
+    path_getter: Optional[Callable[[Dict[str, str]], Tuple[str, ...]]]
+    locations: Dict[str, str]
+    query_keys: FrozenSet[str] = frozenset()
+    header_keys: FrozenSet[str] = frozenset()
+    body_keys: FrozenSet[str] = frozenset()
+    default_headers: Dict[str, str] = field(default_factory=dict)
+    body_headers: Dict[str, str] = field(default_factory=dict)
+
+    def bind(self, base_url: str, arguments: Dict[str, Any]) -> BoundRequest:
+        """Bind call arguments; unknown names are ignored, missing path params stay as {name}."""
+        locations = self.locations
+        path_values: Dict[str, str] = {}
+        params: Dict[str, Any] = {}
+        headers: Dict[str, str] = dict(self.default_headers)
+        body: Dict[str, Any] = {}
+        for name, value in arguments.items():
+            location = locations.get(name)
+            if location is None:
+                continue
+            if location == "query":
+                params[name] = value
+            elif location == "path":
+                path_values[name] = str(value)
+            elif location == "header":
+                headers[name] = str(value)
+            elif location == "body":
+                body[name] = value
+
+        if self.path_names:
+            try:
+                values = self.path_getter(path_values)
+            except KeyError:
+                values = tuple(path_values.get(n, "{" + n + "}") for n in self.path_names)
+            url = base_url + self.path_format.format(*values)
+        else:
+            url = base_url + self.path
+
+        payload = None
+        if body:
+            payload = _json_body(body)
+            headers.update(self.body_headers)
+        return BoundRequest(self.method, url, params, headers, payload, tuple(body))
+
+
+def compile_request_plan(tool: Any) -> RequestPlan:
+    """Compile an APITool (name/method/path/parameters) into a RequestPlan."""
+    locations = {name: (info or {}).get("location", "query") for name, info in tool.parameters.items()}
+
+    def keys(loc: str) -> FrozenSet[str]:
+        return frozenset(n for n, l in locations.items() if l == loc)
+
+    parts = _split_path(tool.path)
+    names = parts[1::2]
+    getter = None
+    if names:
+        # itemgetter of a single key returns a bare value; repeat it so the result is always a tuple
+        getter = operator.itemgetter(*names) if len(names) > 1 else operator.itemgetter(names[0], names[0])
+    return RequestPlan(
+        method=tool.method.upper(),
+        path=tool.path,
+        path_parts=parts,
+        path_names=names,
+        path_format=_path_format(parts),
+        path_getter=getter,
+        locations=locations,
+        query_keys=keys("query"),
+        header_keys=keys("header"),
+        body_keys=keys("body"),
+        default_headers={"Accept": "application/json"},
+        body_headers={"Content-Type": "application/json"},
+    )
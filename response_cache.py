@@ -0,0 +1,152 @@
+"""TTL + LRU response cache for idempotent (GET) tool calls.
+
+Keyed by tool name and normalized arguments. Entries keep the upstream validators
+(ETag / Last-Modified), so an expired entry can be revalidated with a conditional
+request instead of being refetched. Entries past their TTL stay in the LRU until
+evicted so they remain available for revalidation.
+
+Thread-safe: the blocking stdio path and the async HTTP path share one instance.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class CacheEntry:
+    spec_name: str
+    result: Dict[str, Any]
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """'max-age=60, no-cache' -> {'max-age': '60', 'no-cache': None}"""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def upstream_ttl(configured: Optional[float], headers) -> Optional[float]:
+    """Combine the configured TTL with upstream Cache-Control.
+
+    Returns None when the response must not be stored. no-store/private always win;
+    max-age caps the configured TTL (or supplies one when none is configured);
+    no-cache stores with TTL 0 so every use is revalidated.
+    """
+    cc = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in cc or "private" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0.0
+    max_age = cc.get("max-age") or cc.get("s-maxage")
+    if max_age is not None:
+        try:
+            age = float(max_age)
+        except ValueError:
+            age = None
+        if age is not None:
+            return min(configured, age) if configured is not None else age
+    return configured
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return tool_name + "|" + json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], bool]:
+        """Return (entry, fresh). A stale entry is returned for revalidation if it has validators."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry.fresh(now):
+                self.hits += 1
+                return entry, True
+            if entry.etag or entry.last_modified:
+                return entry, False
+            del self._entries[key]
+            self.misses += 1
+            return None, False
+
+    def store(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: str, entry: CacheEntry, ttl: float):
+        """Upstream answered 304: extend the entry and count it as a hit."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + ttl
+            self.revalidations += 1
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def revalidation_failed(self):
+        """A stale entry was revalidated but upstream sent a new body."""
+        with self._lock:
+            self.misses += 1
+
+    def invalidate_spec(self, spec_name: str) -> int:
+        with self._lock:
+            doomed = [k for k, e in self._entries.items() if e.spec_name == spec_name]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revalidations": self.revalidations,
+                "stores": self.stores,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
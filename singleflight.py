@@ -0,0 +1,61 @@
+"""Single-flight coalescing for concurrent identical upstream calls.
+
+The first caller for a key starts the work as a task; callers arriving while it is in
+flight await the same task instead of issuing their own request. Each caller awaits
+it through a shield, so one caller going away does not cancel the call for the
+others. The task counts its waiters, and once the last one is cancelled the task is
+cancelled too, so an abandoned call does not keep a pool slot and an upstream
+connection busy.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.leaders = 0
+        self.coalesced = 0  # callers that shared another caller's request
+        self.abandoned = 0  # calls cancelled because every caller went away
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn() once per key at a time. Returns (result, shared)."""
+        task = self._calls.get(key)
+        shared = task is not None and not task.done()
+        if shared:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda t: self._forget(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._leave(key, task)
+
+    def _leave(self, key: str, task: asyncio.Task):
+        left = self._waiters.get(task, 0) - 1
+        if left > 0:
+            self._waiters[task] = left
+            return
+        self._waiters.pop(task, None)
+        if not task.done():
+            # nobody wants the result any more: stop the upstream call, and make sure a
+            # caller arriving now starts a fresh one instead of joining the cancelled task
+            if self._calls.get(key) is task:
+                del self._calls[key]
+            task.cancel()
+            self.abandoned += 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller went away
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced,
+                "abandoned": self.abandoned}
@@ -0,0 +1,116 @@
+"""On-disk cache of compiled OpenAPI specs.
+
+Entries are keyed by absolute file path and validated against size, mtime and a
+sha256 of the content. An unchanged file is not even read: a matching size+mtime is
+enough. A touched file with identical content is re-validated through its hash. Only
+new or modified specs are parsed with yaml/json again.
+
+Each entry stores plain data (the parsed spec, its declared base URL and the compiled
+tool dicts), so the cache does not depend on class import paths. Bump CACHE_FORMAT
+whenever the compiled tool shape changes.
+"""
+import hashlib
+import logging
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger("spec_cache")
+
+CACHE_FORMAT = 6
+
+
+@dataclass
+class SpecFile:
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+    data: Optional[bytes] = None  # raw content, only read when the stat check misses
+
+
+class SpecCache:
+    def __init__(self, cache_file: Optional[str]):
+        self.cache_file = cache_file
+        self.enabled = bool(cache_file)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "rb") as f:
+                blob = pickle.load(f)
+            if blob.get("format") == CACHE_FORMAT:
+                self._entries = blob.get("entries", {})
+            else:
+                logger.info("Spec cache format changed; rebuilding %s", self.cache_file)
+        except Exception as e:
+            logger.warning("Ignoring unreadable spec cache %s: %s", self.cache_file, e)
+            self._entries = {}
+
+    def stat(self, path: str) -> SpecFile:
+        st = os.stat(path)
+        return SpecFile(path=os.path.abspath(path), size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+    @staticmethod
+    def read(sf: SpecFile) -> bytes:
+        if sf.data is None:
+            with open(sf.path, "rb") as f:
+                sf.data = f.read()
+            sf.sha256 = hashlib.sha256(sf.data).hexdigest()
+        return sf.data
+
+    def get(self, sf: SpecFile) -> Optional[Dict[str, Any]]:
+        """Return the cached payload if `sf` is unchanged, else None (sf.data is then loaded)."""
+        entry = self._entries.get(sf.path) if self.enabled else None
+        if entry and entry["size"] == sf.size and entry["mtime_ns"] == sf.mtime_ns:
+            sf.sha256 = entry["sha256"]
+            self.hits += 1
+            return entry["payload"]
+        self.read(sf)
+        if entry and entry["sha256"] == sf.sha256:
+            # touched but identical content: refresh the stat signature
+            entry.update(size=sf.size, mtime_ns=sf.mtime_ns)
+            self._dirty = True
+            self.hits += 1
+            return entry["payload"]
+        self.misses += 1
+        return None
+
+    def put(self, sf: SpecFile, payload: Dict[str, Any]):
+        if not self.enabled:
+            return
+        self.read(sf)
+        self._entries[sf.path] = {
+            "size": sf.size,
+            "mtime_ns": sf.mtime_ns,
+            "sha256": sf.sha256,
+            "payload": payload,
+        }
+        self._dirty = True
+
+    def save(self, live_paths: Iterable[str]):
+        """Drop entries for files no longer present and write atomically if anything changed."""
+        if not self.enabled:
+            return
+        live = {os.path.abspath(p) for p in live_paths}
+        stale = [p for p in self._entries if p not in live]
+        for p in stale:
+            del self._entries[p]
+        if not (self._dirty or stale):
+            return
+        tmp = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump({"format": CACHE_FORMAT, "entries": self._entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            logger.warning("Could not write spec cache %s: %s", self.cache_file, e)
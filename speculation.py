@@ -0,0 +1,90 @@
+"""Speculative prefetch of predicted read-only tool calls while the planner LLM runs.
+
+The rule-based intent parser can often guess the GET call a question needs
+("pending payments" -> getPayments(status=pending)) before the planner answers.
+A Prefetcher starts those calls as soon as the request arrives; when the final
+plan contains the same tool with the same arguments the running (or finished)
+call is claimed instead of issuing a new one. Whatever the plan does not claim is
+cancelled by settle() and counted as wasted.
+
+Only read-only calls are ever started. Cancelling one interrupts its upstream request,
+unless another caller is sharing that request through single-flight; then it runs on
+for that caller.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def call_key(tool: str, arguments: Optional[Dict[str, Any]]) -> str:
+    return json.dumps([tool, arguments or {}], sort_keys=True, default=str)
+
+
+class SpeculationStats:
+    """Process-wide totals across requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0   # requests that started at least one prefetch
+        self.started = 0
+        self.hits = 0       # prefetches reused by the final plan
+        self.wasted = 0     # prefetches the plan did not use
+        self.cancelled = 0  # wasted prefetches still in flight when cancelled
+
+    def record(self, started: int, hits: int, wasted: int, cancelled: int):
+        with self._lock:
+            self.requests += 1
+            self.started += started
+            self.hits += hits
+            self.wasted += wasted
+            self.cancelled += cancelled
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "started": self.started, "hits": self.hits,
+                    "wasted": self.wasted, "cancelled": self.cancelled,
+                    "hit_rate": round(self.hits / self.started, 3) if self.started else None}
+
+
+class Prefetcher:
+    """Prefetches for one request; must be used from the request's event loop."""
+
+    def __init__(self, execute: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+                 totals: Optional[SpeculationStats] = None):
+        self._execute = execute
+        self._totals = totals
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.hits = 0
+
+    def start(self, tool: str, arguments: Optional[Dict[str, Any]]) -> bool:
+        """Begin a predicted call; False if the same call is already running."""
+        key = call_key(tool, arguments)
+        if key in self._tasks:
+            return False
+        self._tasks[key] = asyncio.create_task(self._execute(tool, dict(arguments or {})))
+        self.started += 1
+        return True
+
+    def claim(self, tool: str, arguments: Optional[Dict[str, Any]]) -> Optional[asyncio.Task]:
+        """The prefetch for exactly this call, handed over to the caller (at most once)."""
+        task = self._tasks.pop(call_key(tool, arguments), None)
+        if task is not None:
+            self.hits += 1
+        return task
+
+    def settle(self) -> Dict[str, Any]:
+        """Cancel every unclaimed prefetch and return this request's summary."""
+        cancelled = 0
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+            elif not task.cancelled():
+                task.exception()  # mark retrieved; nobody awaits a wasted call
+        wasted = len(self._tasks)
+        self._tasks.clear()
+        if self._totals is not None and self.started:
+            self._totals.record(self.started, self.hits, wasted, cancelled)
+        return {"started": self.started, "hits": self.hits, "wasted": wasted, "cancelled": cancelled}
@@ -0,0 +1,57 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("SPEC_CACHE", "0")
+
+from circuit_breaker import HALF_OPEN, BreakerRegistry  # noqa: E402
+from openapi_mcp_server import server  # noqa: E402
+
+PAYMENT = {"amount": 10, "currency": "USD", "recipient": "ACME", "requester_id": "u1"}
+
+
+def _tripped_registry() -> BreakerRegistry:
+    breakers = BreakerRegistry()
+    breakers.failure_threshold, breakers.reset_timeout, breakers.half_open_probes = 1, 0.0, 1
+    return breakers
+
+
+def test_release_frees_half_open_probe():
+    breakers = _tripped_registry()
+    breakers.record("spec", "op", False, 0.1)
+    assert breakers.admit("spec", "op") is None   # the half-open probe
+    assert breakers.admit("spec", "op") == "spec"  # only one probe at a time
+    breakers.release("spec", "op")
+    assert breakers.admit("spec", "op") is None
+
+
+def test_cancelled_probe_does_not_wedge_breaker(monkeypatch):
+    tool = server.registry.tools["cash_api_createPayment"]
+    breakers = _tripped_registry()
+    breakers.record(tool.spec_name, tool.name, False, 0.1)
+    monkeypatch.setattr(server, "breakers", breakers)
+
+    async def hang(request):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        pool = server._pool(tool.spec_name)
+        pool.client()
+        monkeypatch.setattr(pool, "_client", httpx.AsyncClient(transport=httpx.MockTransport(hang)))
+        for call in (server.execute_endpoint_async(tool.name, dict(PAYMENT)),
+                     server.open_endpoint_stream(tool.name, dict(PAYMENT))):
+            task = asyncio.create_task(call)
+            await asyncio.sleep(0.05)
+            assert breakers._breaker(tool.spec_name).state == HALF_OPEN
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            # the probe slot came back, so the next call is admitted instead of failing fast
+            assert breakers.admit(tool.spec_name, tool.name) is None
+            breakers.release(tool.spec_name, tool.name)
+        await pool.aclose()
+
+    asyncio.run(scenario())
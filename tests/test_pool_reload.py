@@ -0,0 +1,47 @@
+import asyncio
+import os
+import threading
+
+import httpx
+
+os.environ.setdefault("SPEC_CACHE", "0")
+
+from openapi_mcp_server import server  # noqa: E402
+
+
+def test_watcher_thread_reload_drains_in_flight_requests(monkeypatch):
+    tool = server.registry.tools["cash_api_getPayments"]
+
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json={"payments": []})
+
+    async def scenario():
+        server.bind_loop(asyncio.get_running_loop())
+        old = server._pool(tool.spec_name)
+        old.client()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(slow))
+        monkeypatch.setattr(old, "_client", client)
+        call = asyncio.create_task(server.execute_endpoint_async(tool.name, {"status": "pending"}))
+        await asyncio.sleep(0.05)
+
+        # settings change -> the pool is rebuilt; the reload runs on another thread like the watcher
+        monkeypatch.setenv(f"UPSTREAM_MAX_CONNECTIONS_{tool.spec_name.upper()}", "7")
+        reload = threading.Thread(target=server._sync_pools, args=(server.registry.specs,))
+        reload.start()
+        await asyncio.to_thread(reload.join)
+        await asyncio.sleep(0.05)
+        assert server.pools[tool.spec_name] is not old
+        assert not client.is_closed  # still serving the in-flight call
+
+        result = await call
+        assert result["status"] == "success"
+        await asyncio.sleep(0.2)
+        assert client.is_closed
+        await server.pools[tool.spec_name].aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.bind_loop(None)
+        server.pools.pop(tool.spec_name, None)
@@ -0,0 +1,22 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("SPEC_CACHE", "0")
+
+from projection import ProjectionError, compile_projection  # noqa: E402
+from openapi_mcp_server import server  # noqa: E402
+
+
+@pytest.mark.parametrize("args", [{"select": ["id"]}, {"select": 5}, {"where": {"status": "pending"}}])
+def test_non_string_expressions_are_rejected(args):
+    with pytest.raises(ProjectionError):
+        compile_projection(args.get("select"), args.get("where"))
+
+
+@pytest.mark.parametrize("select", [["id"], 5])
+def test_server_reports_invalid_projection(select):
+    result = asyncio.run(server.execute_endpoint_async("cash_api_getPayments", {"select": select}))
+    assert result["status"] == "error"
+    assert "select must be a string" in result["message"]
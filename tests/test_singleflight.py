@@ -0,0 +1,48 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def test_shared_call_survives_one_caller_leaving():
+    async def scenario():
+        sf, calls = SingleFlight(), []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        first = asyncio.create_task(sf.do("k", fetch))
+        second = asyncio.create_task(sf.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == ("ok", True)
+        assert len(calls) == 1 and sf.abandoned == 0
+
+    asyncio.run(scenario())
+
+
+def test_call_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        sf, interrupted = SingleFlight(), asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                interrupted.set()
+                raise
+
+        callers = [asyncio.create_task(sf.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(interrupted.wait(), 1)
+        assert sf.abandoned == 1 and sf.stats()["in_flight"] == 0
+
+        async def fresh():
+            return "fresh"
+
+        assert await sf.do("k", fresh) == ("fresh", False)
+
+    asyncio.run(scenario())
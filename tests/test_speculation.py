@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("SPEC_CACHE", "0")
+
+from openapi_mcp_server import server  # noqa: E402
+from speculation import Prefetcher, SpeculationStats  # noqa: E402
+
+
+def test_wasted_prefetch_interrupts_upstream_request(monkeypatch):
+    tool = server.registry.tools["cash_api_getPayments"]
+    monkeypatch.setattr(server, "response_cache", None)
+
+    async def scenario():
+        started, interrupted = asyncio.Event(), asyncio.Event()
+
+        async def slow(request):
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                interrupted.set()
+                raise
+            return httpx.Response(200, json={"payments": []})
+
+        pool = server._pool(tool.spec_name)
+        pool.client()
+        monkeypatch.setattr(pool, "_client", httpx.AsyncClient(transport=httpx.MockTransport(slow)))
+        totals = SpeculationStats()
+        prefetch = Prefetcher(server.execute_endpoint_async, totals)
+        prefetch.start(tool.name, {"status": "approved"})
+        await asyncio.wait_for(started.wait(), 1)
+
+        summary = prefetch.settle()  # the plan never claimed it
+        assert summary == {"started": 1, "hits": 0, "wasted": 1, "cancelled": 1}
+        await asyncio.wait_for(interrupted.wait(), 1)
+        assert totals.stats()["cancelled"] == 1
+        await pool.aclose()
+
+    asyncio.run(scenario())
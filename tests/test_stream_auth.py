@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+import httpx
+
+os.environ.setdefault("SPEC_CACHE", "0")
+
+from openapi_mcp_server import server  # noqa: E402
+from token_manager import Token  # noqa: E402
+
+
+def test_stream_relogs_in_and_resends_after_401(monkeypatch):
+    tool = server.registry.tools["cash_api_getPayments"]
+    stale = Token(tool.spec_name, "alice", "old")
+    state = {"token": None, "sent": 0, "relogins": []}
+
+    async def upstream(request):
+        state["sent"] += 1
+        if state["token"] != "new":
+            return httpx.Response(401, json={"error": "expired"})
+        return httpx.Response(200, stream=httpx.ByteStream(b'{"payments": [{"id": "P1"}]}'))
+
+    def relogin(spec_name, sent):
+        state["relogins"].append(sent)
+        state["token"] = "new"
+        return True
+
+    session_lookups = []
+    monkeypatch.setattr(server, "_session_token", lambda spec: session_lookups.append(spec) or stale)
+    monkeypatch.setattr(server, "_relogin", relogin)
+
+    async def scenario():
+        pool = server._pool(tool.spec_name)
+        pool.client()
+        monkeypatch.setattr(pool, "_client", httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+        stream, error = await server.open_endpoint_stream(tool.name, {})
+        assert error is None and stream.status_code == 200
+        body = b"".join([chunk async for chunk in stream.body])
+        assert b"P1" in body
+        assert pool.in_flight == 0  # the rejected response released its slot
+        await pool.aclose()
+
+    asyncio.run(scenario())
+    assert session_lookups == [tool.spec_name]
+    assert state["relogins"] == [stale] and state["sent"] == 2
@@ -2,6 +2,16 @@ import os, json, time
 
 CACHE_FILE = os.path.join(os.path.dirname(__file__), ".token_cache.json")
 
+def is_valid(data: dict, now: float = None, margin: float = 0) -> bool:
+    """
+    True if a {"token", "expires_at"?} record holds a token that is not expired
+    (or about to expire within `margin` seconds).
+    """
+    if not data or not data.get("token"):
+        return False
+    expires_at = data.get("expires_at")
+    return expires_at is None or (time.time() if now is None else now) + margin < expires_at
+
 def save_token(token: str, expires_in: int = None):
     """
     Save token and optional expiration time (epoch seconds).
@@ -21,9 +31,7 @@ def load_token():
     try:
         with open(CACHE_FILE, "r") as f:
             data = json.load(f)
-        if "expires_at" in data and time.time() >= data["expires_at"]:
-            return None
-        return data.get("token")
+        return data.get("token") if is_valid(data) else None
     except Exception:
         return None
 
@@ -33,3 +41,25 @@ def clear_token():
     """
     if os.path.exists(CACHE_FILE):
         os.remove(CACHE_FILE)
+
+def save_tokens(path: str, records: dict):
+    """
+    Save several token records ({key: {"token", "expires_at"?, ...}}) atomically.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(records, f)
+    os.replace(tmp, path)
+
+def load_tokens(path: str) -> dict:
+    """
+    Load token records saved by save_tokens, dropping expired ones.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return {k: v for k, v in data.items() if isinstance(v, dict) and is_valid(v)}
+    except Exception:
+        return {}
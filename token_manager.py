@@ -0,0 +1,340 @@
+"""Per-spec, per-principal session tokens with proactive refresh.
+
+Tokens (e.g. JSESSIONID) are held in memory and keyed by (spec, principal). With
+TOKEN_STORE_FILE set they are also persisted through token_cache (token + expires_at
+only; credentials never leave memory), so a restart can reuse a still-valid token.
+The store is also how worker processes share tokens: logins hold a lock file (POSIX)
+and first adopt a newer token another process wrote, so only one of them logs in.
+
+A background thread re-runs the login for tokens expiring within `refresh_margin`
+seconds. relogin() is what callers use after a 401: concurrent callers holding the
+same stale token share one login, and callers arriving after it get the new token.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import token_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: store writes stay atomic, logins are not coordinated across processes
+    fcntl = None
+
+logger = logging.getLogger("token_manager")
+
+# a login returns (token, expires_at epoch seconds or None)
+LoginFn = Callable[[], Tuple[str, Optional[float]]]
+
+
+@dataclass(frozen=True)
+class Token:
+    spec_name: str
+    principal: str
+    value: str
+    expires_at: Optional[float] = None
+    obtained_at: float = 0.0
+
+    def record(self) -> Dict[str, Any]:
+        return {"token": self.value, "expires_at": self.expires_at, "obtained_at": self.obtained_at,
+                "spec": self.spec_name, "principal": self.principal}
+
+    @classmethod
+    def from_record(cls, rec: Dict[str, Any]) -> "Token":
+        return cls(rec.get("spec", ""), rec.get("principal", ""), rec["token"],
+                   rec.get("expires_at"), rec.get("obtained_at", 0.0))
+
+
+def _key(spec_name: str, principal: str) -> str:
+    return f"{spec_name}:{principal}"
+
+
+class TokenManager:
+    def __init__(self, store_file: Optional[str] = None, refresh_margin: float = 60.0,
+                 default_ttl: Optional[float] = None, refresh_interval: float = 15.0,
+                 on_token: Optional[Callable[[Token], None]] = None, store_check_interval: float = 1.0):
+        self.store_file = store_file
+        self.store_check_interval = store_check_interval
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.refresh_interval = refresh_interval
+        self.on_token = on_token  # called after every (re)login, e.g. to update pool cookies
+        self._tokens: Dict[str, Token] = {}
+        self._logins: Dict[str, LoginFn] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.logins = 0
+        self.relogins = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.adopted = 0
+        self._store_mtime: Optional[int] = None
+        self._store_checked = 0.0
+        self._store_tokens: Dict[str, Token] = {}
+        self._tokens.update(self._read_store(fresh=True))
+
+    @classmethod
+    def from_env(cls, on_token: Optional[Callable[[Token], None]] = None) -> "TokenManager":
+        ttl = os.getenv("TOKEN_DEFAULT_TTL")
+        return cls(store_file=os.getenv("TOKEN_STORE_FILE") or None,
+                   refresh_margin=float(os.getenv("TOKEN_REFRESH_MARGIN", "60")),
+                   default_ttl=float(ttl) if ttl else None,
+                   refresh_interval=float(os.getenv("TOKEN_REFRESH_INTERVAL", "15")),
+                   on_token=on_token,
+                   store_check_interval=float(os.getenv("TOKEN_STORE_CHECK_INTERVAL", "1")))
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, spec_name: str, principal: str) -> Optional[Token]:
+        """The current token if it is not expired."""
+        token = self._tokens.get(_key(spec_name, principal))
+        if token is None or not token_cache.is_valid(token.record()):
+            return None
+        return token
+
+    def current(self, spec_name: str, principal: str) -> Optional[Token]:
+        """get(), after adopting a newer token another process stored.
+
+        The store file is stat'ed at most every store_check_interval seconds, so the hot
+        path usually does no I/O at all.
+        """
+        key = _key(spec_name, principal)
+        if self.store_file:
+            stored = self._read_store().get(key)
+            held = self._tokens.get(key)
+            if stored is not None and (held is None or stored.obtained_at > held.obtained_at):
+                with self._key_lock(key):
+                    self._adopt(key)
+        return self.get(spec_name, principal)
+
+    def latest(self, spec_name: str) -> Optional[Token]:
+        """Most recently issued valid token for a spec, here or in the shared store."""
+        with self._lock:
+            held = list(self._tokens.values())
+        candidates = [t for t in held + list(self._read_store().values())
+                      if t.spec_name == spec_name and token_cache.is_valid(t.record())]
+        return max(candidates, key=lambda t: t.obtained_at, default=None)
+
+    # ---------------------- shared store ----------------------
+    @contextmanager
+    def _store_locked(self):
+        """Cross-process lock around login + store update (no-op without a store or fcntl)."""
+        if not self.store_file or fcntl is None:
+            yield
+            return
+        with open(f"{self.store_file}.lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read_store(self, fresh: bool = False) -> Dict[str, Token]:
+        """Tokens in the store file, re-read only when the file changed.
+
+        Between checks (store_check_interval) the last view is returned without a stat;
+        fresh=True always checks.
+        """
+        if not self.store_file:
+            return {}
+        now = time.monotonic()
+        if not fresh and now - self._store_checked < self.store_check_interval:
+            return self._store_tokens
+        self._store_checked = now
+        try:
+            mtime = os.stat(self.store_file).st_mtime_ns
+        except OSError:
+            self._store_tokens, self._store_mtime = {}, None
+            return self._store_tokens
+        if mtime != self._store_mtime:
+            records = token_cache.load_tokens(self.store_file)
+            self._store_tokens = {k: Token.from_record(r) for k, r in records.items()}
+            self._store_mtime = mtime
+        return self._store_tokens
+
+    def _adopt(self, key: str) -> Optional[Token]:
+        """Take a newer valid token another process stored for `key` (caller holds the locks)."""
+        stored = self._read_store(fresh=True).get(key)
+        current = self._tokens.get(key)
+        if stored is None or not token_cache.is_valid(stored.record()):
+            return None
+        if current is not None and stored.obtained_at <= current.obtained_at:
+            return None
+        with self._lock:
+            self._tokens[key] = stored
+            self.adopted += 1
+        if self.on_token is not None:
+            self.on_token(stored)
+        return stored
+
+    def _write_store(self, removed=()):
+        """Merge our tokens into the store file (caller holds the store lock)."""
+        if not self.store_file:
+            return
+        records = token_cache.load_tokens(self.store_file)
+        for key in removed:
+            records.pop(key, None)
+        with self._lock:
+            for k, t in self._tokens.items():
+                if t.obtained_at >= (records.get(k) or {}).get("obtained_at", 0.0):  # never clobber a newer token
+                    records[k] = t.record()
+        try:
+            token_cache.save_tokens(self.store_file, records)
+        except OSError as e:
+            logger.warning("Could not persist tokens to %s: %s", self.store_file, e)
+
+    # ---------------------- login ----------------------
+    def _login(self, key: str, spec_name: str, principal: str, login: LoginFn) -> Token:
+        """Run a login (caller holds the key and store locks) and store the result."""
+        value, expires_at = login()
+        now = time.time()
+        if expires_at is None and self.default_ttl:
+            expires_at = now + self.default_ttl
+        token = Token(spec_name, principal, value, expires_at, now)
+        with self._lock:
+            self._tokens[key] = token
+            self.logins += 1
+        self._write_store()
+        if self.on_token is not None:
+            self.on_token(token)
+        if expires_at is not None:
+            self._ensure_refresher()
+        return token
+
+    def acquire(self, spec_name: str, principal: str, login: LoginFn) -> Token:
+        """A valid token for (spec, principal), logging in only when none is held.
+
+        `login` is remembered for background refresh and relogin().
+        """
+        key = _key(spec_name, principal)
+        with self._key_lock(key), self._store_locked():
+            self._logins[key] = login
+            self._adopt(key)
+            token = self.get(spec_name, principal)
+            if token is not None:
+                if self.on_token is not None:
+                    self.on_token(token)
+                if token.expires_at is not None:
+                    self._ensure_refresher()
+                return token
+            return self._login(key, spec_name, principal, login)
+
+    def relogin(self, spec_name: str, principal: str, stale: Optional[str]) -> Optional[Token]:
+        """Replace a token the upstream rejected (401). Concurrent callers share one login.
+
+        Returns None when no login is known for the principal or the login fails.
+        """
+        key = _key(spec_name, principal)
+        with self._key_lock(key), self._store_locked():
+            self._adopt(key)
+            current = self.get(spec_name, principal)
+            if current is not None and current.value != stale:
+                with self._lock:
+                    self.coalesced += 1
+                return current  # someone already logged in again
+            login = self._logins.get(key)
+            if login is None:
+                return None
+            try:
+                token = self._login(key, spec_name, principal, login)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                logger.warning("Re-login for %s failed: %s", key, e)
+                return None
+            with self._lock:
+                self.relogins += 1
+            return token
+
+    def forget(self, spec_name: str, principal: Optional[str] = None):
+        """Drop tokens (and remembered logins) for a spec, or one principal of it."""
+        def matches(key: str) -> bool:
+            return key == _key(spec_name, principal) if principal is not None else key.startswith(f"{spec_name}:")
+        with self._lock:
+            removed = [k for k in self._tokens if matches(k)]
+            for key in removed:
+                self._tokens.pop(key, None)
+            for key in [k for k in self._logins if matches(k)]:
+                self._logins.pop(key, None)
+        if removed:
+            with self._store_locked():
+                self._write_store(removed)
+
+    # ---------------------- background refresh ----------------------
+    def _ensure_refresher(self):
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._stop.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+            self._refresher.start()
+
+    def _due(self):
+        now = time.time()
+        with self._lock:
+            return [(k, t) for k, t in self._tokens.items()
+                    if k in self._logins and t.expires_at is not None
+                    and now + self.refresh_margin >= t.expires_at]
+
+    def refresh_due(self) -> int:
+        """Log in again for every token close to expiry; returns how many were refreshed."""
+        refreshed = 0
+        for key, token in self._due():
+            with self._key_lock(key), self._store_locked():
+                if self._adopt(key) is not None or self._tokens.get(key) is not token:
+                    continue  # replaced meanwhile (here or by another process)
+                try:
+                    self._login(key, token.spec_name, token.principal, self._logins[key])
+                except Exception as e:
+                    with self._lock:
+                        self.failures += 1
+                    logger.warning("Token refresh for %s failed (will retry): %s", key, e)
+                    continue
+            refreshed += 1
+            with self._lock:
+                self.refreshes += 1
+        return refreshed
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh_due()
+            except Exception:
+                logger.exception("Token refresh loop error")
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            tokens = {
+                k: {
+                    "expires_in_s": round(t.expires_at - now, 1) if t.expires_at is not None else None,
+                    "age_s": round(now - t.obtained_at, 1) if t.obtained_at else None,
+                    "refreshable": k in self._logins,
+                }
+                for k, t in sorted(self._tokens.items())
+            }
+            return {
+                "tokens": tokens,
+                "logins": self.logins,
+                "relogins": self.relogins,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "adopted": self.adopted,
+                "persisted": bool(self.store_file),
+            }
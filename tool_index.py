@@ -0,0 +1,72 @@
+"""Tool name resolution index.
+
+Built once per registry load so that /mcp/tools/{tool}, /mcp/tool_meta, /mcp/chat and
+/llm/route resolve names with dict lookups instead of scanning every registered tool.
+
+Accepted names, in priority order:
+  1. exact tool name              cash_api_getPayments
+  2. un-prefixed alias            getPayments         (tool name without "<spec>_")
+  3. operationId                  getPayments
+  4. case-folded variants of 1-3  GETPAYMENTS, cash_api_getpayments, ...
+
+Ambiguity rule: within a level the first tool in (spec_name, tool_name) order wins, so a
+canonical tool beats its "_1" duplicate and results do not depend on file discovery
+order. Shadowed candidates are kept in `ambiguous` for diagnostics.
+"""
+import itertools
+from typing import Any, Dict, List, Optional
+
+_versions = itertools.count(1)
+
+
+class ToolIndex:
+    def __init__(self, tools: Dict[str, Any]):
+        self.version = next(_versions)
+        self._keys: Dict[str, str] = {}
+        self._folded: Dict[str, str] = {}
+        self.ambiguous: Dict[str, List[str]] = {}
+
+        ordered = sorted(tools.values(), key=lambda t: (t.spec_name, t.name))
+        levels = [
+            [(t.name, t.name) for t in ordered],
+            [(self._alias(t), t.name) for t in ordered],
+            [(t.operation_id, t.name) for t in ordered],
+        ]
+        for level in levels:
+            self._add_level(self._keys, level)
+        for level in levels:
+            self._add_level(self._folded, [(k.casefold(), n) for k, n in level if k])
+
+    @staticmethod
+    def _alias(tool: Any) -> Optional[str]:
+        prefix = f"{tool.spec_name}_"
+        if tool.spec_name and tool.name.startswith(prefix):
+            return tool.name[len(prefix):]
+        return None
+
+    def _add_level(self, table: Dict[str, str], pairs) -> None:
+        # keys already claimed by a higher-priority level are left alone
+        claimed_here: Dict[str, str] = {}
+        for key, name in pairs:
+            if not key:
+                continue
+            if key in claimed_here:
+                if claimed_here[key] != name:
+                    self.ambiguous.setdefault(key, [claimed_here[key]]).append(name)
+                continue
+            if key in table:
+                continue
+            table[key] = name
+            claimed_here[key] = name
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Return the registered tool name for `name`, or None."""
+        if not name:
+            return None
+        found = self._keys.get(name)
+        if found is None:
+            found = self._folded.get(name.casefold())
+        return found
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,134 @@
+"""Relevance-ranked tool shortlist for the planner prompt.
+
+Instead of sending every registered tool name to the planner LLM, tools are ranked
+against the user message with BM25 over a weighted bag of words per tool: name and
+operationId (x3), tags (x2), summary, description, parameter names and enum values
+(x1). camelCase / snake_case identifiers are split and plurals folded, so "pending
+payments" matches getPayments(status: pending|...). Only the top-K tools go to the
+planner, as compact one-line signatures, and the list stops early at a token budget.
+
+A ToolRanker is built once per registry version (see llm_mcp_bridge._ranker).
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOPWORDS = frozenset("a an and are all any by do for from get give i in is it me my of on or please show "
+                       "tell the to what which with".split())
+
+FIELD_WEIGHTS = {"name": 3, "tags": 2, "summary": 1, "description": 1, "params": 1}
+
+K1 = 1.2
+B = 0.75
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """'getPendingPayments status_code' -> ['pending', 'payment', 'status', 'code'] (get is a stopword)"""
+    words = (w.lower() for w in _WORD_RE.findall(text or ""))
+    return [_stem(w) for w in words if w not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def signature(tool: Any, max_params: int = 8) -> str:
+    """One compact line: name(param?: type|enum, ...) - summary."""
+    params = []
+    for pname, info in list((tool.parameters or {}).items()):
+        info = info or {}
+        if info.get("location") == "projection":
+            continue  # select/where are explained once in the system prompt
+        enum = info.get("enum")
+        ptype = "|".join(str(v) for v in enum[:6]) if isinstance(enum, list) and enum else info.get("type", "string")
+        params.append(f"{pname}{'' if info.get('required') else '?'}: {ptype}")
+    if len(params) > max_params:
+        params = params[:max_params] + ["..."]
+    summary = (tool.summary or tool.description or "").strip().splitlines()[0:1]
+    line = f"{tool.name}({', '.join(params)})"
+    return f"{line} - {summary[0][:100]}" if summary else line
+
+
+class ToolRanker:
+    def __init__(self, tools: Sequence[Any]):
+        self.tools = list(tools)
+        self._by_name = {t.name: t for t in self.tools}
+        docs = [self._document(tool) for tool in self.tools]
+        lengths = [sum(d.values()) for d in docs]
+        avg_len = (sum(lengths) / len(lengths)) if lengths else 0.0
+        # inverted index: term -> [(tool position, BM25 term weight without idf)]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, doc in enumerate(docs):
+            norm = K1 * (1 - B + B * lengths[i] / avg_len) if avg_len else K1
+            for term, tf in doc.items():
+                self._postings.setdefault(term, []).append((i, tf * (K1 + 1) / (tf + norm)))
+        n = len(self.tools)
+        self._idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self._postings.items()}
+        self._signatures: Dict[str, str] = {}
+
+    @staticmethod
+    def _document(tool: Any) -> Counter:
+        fields = {
+            "name": f"{tool.name} {getattr(tool, 'operation_id', None) or ''}",
+            "tags": " ".join(getattr(tool, "tags", None) or ()),
+            "summary": getattr(tool, "summary", None) or "",
+            "description": getattr(tool, "description", None) or "",
+            "params": " ".join(f"{n} {' '.join(str(v) for v in (i or {}).get('enum') or ())}"
+                               for n, i in (tool.parameters or {}).items()
+                               if (i or {}).get("location") != "projection"),
+        }
+        doc: Counter = Counter()
+        for field, text in fields.items():
+            for token in tokenize(text):
+                doc[token] += FIELD_WEIGHTS[field]
+        return doc
+
+    def rank(self, message: str, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(tool name, score) best first, ties in registry order; only tools sharing a term.
+
+        When nothing matches, the first top_k tools are returned with score 0 so the
+        planner still sees something.
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(message)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, weight in self._postings[term]:
+                scores[i] = scores.get(i, 0.0) + idf * weight
+        if not scores:
+            return [(t.name, 0.0) for t in self.tools[:top_k or None]]
+        key = lambda i: (-scores[i], i)
+        best = heapq.nsmallest(top_k, scores, key=key) if top_k else sorted(scores, key=key)
+        return [(self.tools[i].name, scores[i]) for i in best]
+
+    def signature(self, name: str) -> str:
+        sig = self._signatures.get(name)
+        if sig is None:
+            sig = self._signatures[name] = signature(self._by_name[name])
+        return sig
+
+    def shortlist(self, message: str, top_k: int, token_budget: int) -> List[str]:
+        """Signatures of the top_k tools for `message`, stopping before token_budget is exceeded."""
+        lines: List[str] = []
+        used = 0
+        for name, _ in self.rank(message, top_k):
+            line = self.signature(name)
+            cost = estimate_tokens(line)
+            if lines and used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        return lines
@@ -0,0 +1,283 @@
+"""Per-spec upstream connection pools.
+
+Each loaded spec gets one UpstreamPool holding a requests.Session (blocking stdio path)
+and an httpx.AsyncClient (FastAPI path) sized from the same PoolSettings. Settings are
+resolved per spec, first match wins:
+
+  1. env  UPSTREAM_<SETTING>_<SPEC>        e.g. UPSTREAM_MAX_CONNECTIONS_CASH_API=50
+  2. spec x-connection-pool: {<setting>: ...}   (top level of the OpenAPI document)
+  3. env  UPSTREAM_<SETTING>               e.g. UPSTREAM_READ_TIMEOUT=30
+  4. PoolSettings defaults
+
+Every call passes through slot()/sync_slot(), which bounds concurrency at
+max_connections and records occupancy and the time spent waiting for a slot.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("upstream_pool")
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 200
+    max_keepalive: int = 50
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 15.0
+    retries: int = 0            # connection-level retries (connect errors only)
+    http2: bool = False         # needs the optional 'h2' package
+    verify: Union[bool, str] = False  # False, True or a CA bundle path
+
+    @classmethod
+    def for_spec(cls, spec_name: str, spec: Optional[Dict[str, Any]] = None) -> "PoolSettings":
+        declared = (spec or {}).get("x-connection-pool") or {}
+        values: Dict[str, Any] = {}
+        for f in fields(cls):
+            env = f"UPSTREAM_{f.name.upper()}"
+            raw = os.getenv(f"{env}_{spec_name.upper()}")
+            if raw is None:
+                raw = declared.get(f.name)
+            if raw is None:
+                raw = os.getenv(env)
+            if raw is None:
+                continue
+            try:
+                values[f.name] = cls._coerce(f.name, raw)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring invalid pool setting %s=%r for %s", f.name, raw, spec_name)
+        return cls(**values)
+
+    @staticmethod
+    def _coerce(name: str, raw: Any) -> Any:
+        if name in ("max_connections", "max_keepalive", "retries"):
+            return int(raw)
+        if name in ("keepalive_expiry", "connect_timeout", "read_timeout"):
+            return float(raw)
+        if name == "http2":
+            return _as_bool(raw)
+        if name == "verify":
+            if isinstance(raw, bool):
+                return raw
+            text = str(raw).strip()
+            if text.lower() in ("0", "1", "true", "false", "yes", "no", "on", "off"):
+                return _as_bool(text)
+            return text  # CA bundle path
+        return raw
+
+    def httpx_timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        """Timeouts for httpx; a tighter `read` (adaptive timeout) also caps connect."""
+        read = self.read_timeout if read is None else read
+        return httpx.Timeout(read, connect=min(self.connect_timeout, read))
+
+    def requests_timeout(self, read: Optional[float] = None):
+        read = self.read_timeout if read is None else read
+        return (min(self.connect_timeout, read), read)
+
+
+class UpstreamPool:
+    def __init__(self, spec_name: str, settings: PoolSettings):
+        self.spec_name = spec_name
+        self.settings = settings
+        self.http2 = settings.http2 and HTTP2_AVAILABLE
+        if settings.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested for %s but 'h2' is not installed; using HTTP/1.1", spec_name)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.max_connections,
+                              max_retries=settings.retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.verify = settings.verify
+
+        # the async client and its semaphore are bound to the loop that created them
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._sync_slots = threading.BoundedSemaphore(settings.max_connections)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.queued = 0          # callers waiting for a slot
+        self.peak_in_flight = 0
+        self.waited = 0          # acquisitions that had to queue for a slot
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    # ---------------------- clients ----------------------
+    def client(self) -> httpx.AsyncClient:
+        """Async client for the running loop (recreated if the loop changed or it was closed)."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            s = self.settings
+            transport = httpx.AsyncHTTPTransport(
+                verify=s.verify, http2=self.http2, retries=s.retries,
+                limits=httpx.Limits(max_connections=s.max_connections,
+                                    max_keepalive_connections=s.max_keepalive,
+                                    keepalive_expiry=s.keepalive_expiry))
+            self._client = httpx.AsyncClient(transport=transport, timeout=s.httpx_timeout(), verify=s.verify)
+            self._client_loop = loop
+            self._slots = asyncio.Semaphore(s.max_connections)
+        # carry login cookies (JSESSIONID) from the sync session over to the async client
+        if self.session.cookies:
+            self._client.cookies.update(self.session.cookies.get_dict())
+        return self._client
+
+    # ---------------------- occupancy ----------------------
+    def _queue(self, delta: int):
+        with self._lock:
+            self.queued += delta
+
+    def _acquired(self, wait_ms: float):
+        with self._lock:
+            self.queued -= 1
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if wait_ms >= 1.0:
+                self.waited += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def _released(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots is None:
+            self.client()
+        started = time.perf_counter()
+        self._queue(1)
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self._queue(-1)
+            raise
+        try:
+            self._acquired((time.perf_counter() - started) * 1000)
+            try:
+                yield
+            finally:
+                self._released()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def sync_slot(self):
+        started = time.perf_counter()
+        self._queue(1)
+        try:
+            self._sync_slots.acquire()
+        except BaseException:
+            self._queue(-1)
+            raise
+        try:
+            self._acquired((time.perf_counter() - started) * 1000)
+            try:
+                yield
+            finally:
+                self._released()
+        finally:
+            self._sync_slots.release()
+
+    @property
+    def busy(self) -> bool:
+        """Requests hold or are waiting for a slot."""
+        with self._lock:
+            return self.in_flight > 0 or self.queued > 0
+
+    # ---------------------- lifecycle ----------------------
+    def reconfigure(self, settings: PoolSettings) -> "UpstreamPool":
+        """New pool with different settings that keeps this pool's login cookies (retire() this one)."""
+        pool = UpstreamPool(self.spec_name, settings)
+        pool.session.cookies.update(self.session.cookies)
+        return pool
+
+    def retire(self, grace: float = 30.0):
+        """Close the pool once the requests using it are done, waiting at most `grace` seconds.
+
+        Callable from any thread: the async client is drained and closed on the loop that
+        owns it. Without a running loop there is nothing in flight on it; close() now.
+        """
+        loop = self._client_loop
+        if self._client is None or loop is None or not loop.is_running():
+            self.close()
+            return None
+        return asyncio.run_coroutine_threadsafe(self._drain(grace), loop)
+
+    async def _drain(self, grace: float):
+        give_up_at = time.monotonic() + grace
+        while self.busy and time.monotonic() < give_up_at:
+            await asyncio.sleep(0.05)
+        if self.busy:
+            logger.warning("Closing pool %s with requests still in flight after %.1fs", self.spec_name, grace)
+        await self.aclose()
+
+    def close(self):
+        self.session.close()
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            try:
+                asyncio.get_running_loop().create_task(client.aclose())
+            except RuntimeError:
+                pass  # no loop in this thread; the client is garbage collected
+
+    async def aclose(self):
+        self.session.close()
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+    def _connection_counts(self) -> Optional[Dict[str, int]]:
+        # httpcore internals; best effort only
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        conns = getattr(pool, "connections", None)
+        if conns is None:
+            return None
+        idle = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+        return {"open": len(conns), "idle": idle, "active": len(conns) - idle}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {
+                "spec": self.spec_name,
+                "settings": {**asdict(self.settings), "http2_effective": self.http2},
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "peak_in_flight": self.peak_in_flight,
+                "utilization": round(self.in_flight / self.settings.max_connections, 4),
+                "waited": self.waited,
+                "wait_ms_total": round(self.wait_ms_total, 3),
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "wait_ms_avg": round(self.wait_ms_total / self.requests, 3) if self.requests else 0.0,
+            }
+        out["connections"] = self._connection_counts()
+        return out